@@ -0,0 +1,270 @@
+import json
+import os
+import threading
+import time
+from contextlib import suppress
+from datetime import timedelta
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from metricas import span
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+DATA_PATH = "data/datos_generados_Disponibilidad.parquet"
+CONFIABILIDAD_PATH = "data/metricas_confiabilidad.parquet"
+
+# Tamaño de cada row group: las estadísticas min/max por grupo permiten
+# descartar grupos completos sin decodificarlos al filtrar por fecha
+FILAS_POR_GRUPO = 4096
+
+# Cada lote ingerido se publica como un archivo propio en <nombre>_lotes/, junto al Parquet
+# base: agregar un lote cuesta lo que el lote y no lo que el histórico. Consolidar los lotes
+# en el base es un trabajo a pedido (ver consolidar)
+SUFIJO_LOTES = "_lotes"
+
+# Clave de los metadatos propios (JSON) en el esquema de los Parquet que escribe escribir_parquet
+CLAVE_METADATOS = b"flota"
+
+COLUMNAS_CATALOGO = ["Marca", "Modelo", "flota"]
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S"
+
+# Ventanas de los selectores de período, medidas hacia atrás desde el último registro
+PERIODOS = {
+    "Último Mes": timedelta(days=30),
+    "Última Semana": timedelta(days=7),
+    "Últimas 24 horas": timedelta(hours=24)
+}
+
+# ==============================
+# ESCRITURA
+# ==============================
+@span("datos.escribir")
+def ruta_temporal(ruta):
+    """Archivo temporal junto a `ruta`, propio de este proceso e hilo.
+
+    Las vistas, la API, el planificador y el generador reconstruyen los mismos archivos:
+    con un nombre fijo dos escrituras simultáneas se pisarían antes del rename.
+    """
+    return f"{ruta}.{os.getpid()}-{threading.get_ident()}.tmp"
+
+def escribir_parquet(df, ruta, orden=("Fecha",), metadatos=None):
+    """Escribe el parquet ordenado (por fecha, salvo que se indique otro orden) en row groups
+    acotados y lo publica con un rename atómico. `metadatos` (un diccionario) queda en el esquema"""
+    if set(orden) <= set(df.columns):
+        df = df.sort_values(list(orden), kind="stable", ignore_index=True)
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    if metadatos is not None:
+        tabla = tabla.replace_schema_metadata({**(tabla.schema.metadata or {}),
+                                               CLAVE_METADATOS: json.dumps(metadatos).encode("utf-8")})
+    ruta_tmp = ruta_temporal(ruta)
+    try:
+        pq.write_table(tabla, ruta_tmp, row_group_size=FILAS_POR_GRUPO)
+        os.replace(ruta_tmp, ruta)
+    finally:
+        with suppress(FileNotFoundError):
+            os.remove(ruta_tmp)
+
+def metadatos_esquema(esquema):
+    """Metadatos que escribir_parquet dejó en un esquema ({} si no tiene)"""
+    valor = (esquema.metadata or {}).get(CLAVE_METADATOS)
+    return json.loads(valor) if valor else {}
+
+def leer_metadatos(ruta):
+    """Metadatos que escribir_parquet dejó en el archivo ({} si no tiene o el archivo no existe)"""
+    if not os.path.exists(ruta):
+        return {}
+    return metadatos_esquema(pq.read_schema(ruta))
+
+# ==============================
+# LOTES
+# ==============================
+def directorio_lotes(ruta=DATA_PATH):
+    return os.path.splitext(ruta)[0] + SUFIJO_LOTES
+
+def archivos_datos(ruta=DATA_PATH):
+    """Archivos que forman la publicación: el Parquet base y los lotes agregados después, en orden de llegada.
+
+    Los lotes que el base ya absorbió al consolidarse se omiten aunque sigan en disco.
+    """
+    archivos = [ruta] if os.path.exists(ruta) else []
+    directorio = directorio_lotes(ruta)
+    if os.path.isdir(directorio):
+        absorbidos = set(leer_metadatos(ruta).get("lotes", []))
+        archivos += [os.path.join(directorio, nombre) for nombre in sorted(os.listdir(directorio))
+                     if nombre.endswith(".parquet") and nombre not in absorbidos]
+    return archivos
+
+def esquema_datos(archivos):
+    """Esquema común de los archivos: un lote parcial (p. ej. de laboratorio) no trae todas las columnas"""
+    esquemas = [pq.read_schema(archivo) for archivo in archivos]
+    return pa.unify_schemas(esquemas, promote_options="permissive").remove_metadata()
+
+def filas_datos(ruta=DATA_PATH, archivos=None):
+    """Registros publicados, sumados desde los pies de los archivos sin leer datos"""
+    archivos = archivos_datos(ruta) if archivos is None else archivos
+    return sum(pq.read_metadata(archivo).num_rows for archivo in archivos)
+
+def instantanea_datos(ruta=DATA_PATH):
+    """Archivos publicados y sus registros, fijados para construir una estructura derivada.
+
+    La estructura se lee de esos archivos y se sella con esa cantidad (ver version_derivado):
+    aunque llegue un lote mientras se construye, el sello describe exactamente lo que contiene.
+    """
+    archivos = archivos_datos(ruta)
+    return archivos, filas_datos(archivos=archivos)
+
+def version_derivado(ruta):
+    """Registros publicados a partir de los que se construyó una estructura derivada (None si falta)"""
+    return leer_metadatos(ruta).get("filas_datos")
+
+@span("datos.anexar")
+def anexar_lote(df, ruta=DATA_PATH, orden=("Fecha",), metadatos=None):
+    """Publica un lote como un archivo propio junto al Parquet base (o como el base, si aún no hay datos).
+
+    Antes de escribir se verifica que el lote sea compatible con el esquema publicado:
+    un tipo incompatible falla al ingerir y no al leer. Devuelve el archivo escrito.
+    """
+    if not os.path.exists(ruta):
+        escribir_parquet(df, ruta, orden, metadatos)
+        return ruta
+    pa.unify_schemas([pq.read_schema(ruta).remove_metadata(), pa.Schema.from_pandas(df, preserve_index=False)],
+                     promote_options="permissive")
+    directorio = directorio_lotes(ruta)
+    os.makedirs(directorio, exist_ok=True)
+    # El nombre ordena por llegada y no se repite entre procesos
+    destino = os.path.join(directorio, f"{time.time_ns():020d}-{os.getpid()}.parquet")
+    escribir_parquet(df, destino, orden, metadatos)
+    return destino
+
+@span("datos.consolidar")
+def consolidar(df, ruta=DATA_PATH, archivos=None, orden=("Fecha",), metadatos=None):
+    """Reescribe el Parquet base con `df`, que ya contiene los lotes de `archivos` (por defecto, los publicados).
+
+    Los lotes absorbidos quedan listados en el base, así ningún lector los cuenta dos veces
+    mientras sigan en disco; después se borran.
+    """
+    archivos = archivos_datos(ruta) if archivos is None else archivos
+    lotes = [archivo for archivo in archivos if archivo != ruta]
+    escribir_parquet(df, ruta, orden, {**(metadatos or {}), "lotes": [os.path.basename(lote) for lote in lotes]})
+    for lote in lotes:
+        with suppress(FileNotFoundError):
+            os.remove(lote)
+
+def compactar_datos(ruta=DATA_PATH):
+    """Consolida en el Parquet base todos los lotes publicados; devuelve cuántos se absorbieron"""
+    archivos = archivos_datos(ruta)
+    if len(archivos) > 1:
+        consolidar(leer_datos(archivos=archivos), ruta, archivos)
+    return len(archivos) - 1
+
+# ==============================
+# LECTURA
+# ==============================
+def version_datos(ruta=DATA_PATH):
+    """Versión de los datos, usada como clave de caché en las vistas: cambia al reescribir el
+    Parquet base y al agregar un lote (el directorio de lotes cambia de mtime)"""
+    directorio = directorio_lotes(ruta)
+    return max(os.path.getmtime(ruta), os.path.getmtime(directorio) if os.path.isdir(directorio) else 0.0)
+
+def _valor_fecha(valor, tipo_fecha):
+    """Adapta un límite de fecha al tipo con que está almacenada la columna"""
+    valor = pd.Timestamp(valor)
+    if tipo_fecha is not None and str(tipo_fecha) in ("string", "large_string"):
+        return valor.strftime(FORMATO_FECHA)
+    return valor.to_datetime64()
+
+def _condicion(columna, valor):
+    if isinstance(valor, (list, tuple, set)):
+        return (columna, "in", list(valor))
+    return (columna, "==", valor)
+
+def construir_filtros(esquema, marca=None, modelo=None, flota=None, fecha_desde=None, fecha_hasta=None):
+    """Construye los filtros en el formato que el lector Parquet aplica por row group"""
+    filtros = []
+    for columna, valor in (("Marca", marca), ("Modelo", modelo), ("flota", flota)):
+        if valor is not None:
+            filtros.append(_condicion(columna, valor))
+
+    tipo_fecha = esquema.field("Fecha").type if "Fecha" in esquema.names else None
+    if fecha_desde is not None:
+        filtros.append(("Fecha", ">=", _valor_fecha(fecha_desde, tipo_fecha)))
+    if fecha_hasta is not None:
+        filtros.append(("Fecha", "<=", _valor_fecha(fecha_hasta, tipo_fecha)))
+    return filtros or None
+
+@span("datos.leer")
+def leer_datos(columnas=None, marca=None, modelo=None, flota=None,
+               fecha_desde=None, fecha_hasta=None, ruta=DATA_PATH, archivos=None):
+    """Lee solo las columnas y filas pedidas, empujando proyección y filtros al lector Parquet.
+
+    Las columnas pedidas que no existen en el archivo se omiten, de modo que las
+    vistas pueden pedir columnas opcionales (por ejemplo Aluminio) sin fallar.
+    `archivos` fija qué archivos leer (ver archivos_datos); por defecto, la publicación vigente.
+    """
+    archivos = archivos_datos(ruta) if archivos is None else archivos
+    esquema = esquema_datos(archivos)
+    if columnas is not None:
+        columnas = [col for col in columnas if col in esquema.names]
+
+    filtros = construir_filtros(esquema, marca, modelo, flota, fecha_desde, fecha_hasta)
+    tabla = ds.dataset(archivos, schema=esquema, format="parquet").to_table(
+        columns=columnas, filter=pq.filters_to_expression(filtros) if filtros else None)
+    df = tabla.to_pandas()
+
+    if "Fecha" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["Fecha"]):
+        df["Fecha"] = pd.to_datetime(df["Fecha"])
+    return df
+
+def fecha_maxima(ruta=DATA_PATH):
+    """Última fecha registrada, tomada de las estadísticas de los row groups sin leer datos"""
+    maximos = []
+    for archivo in archivos_datos(ruta):
+        metadata = pq.ParquetFile(archivo).metadata
+        indice = metadata.schema.to_arrow_schema().get_field_index("Fecha")
+        if indice < 0:
+            continue
+        maximos += [
+            metadata.row_group(i).column(indice).statistics.max
+            for i in range(metadata.num_row_groups)
+            if metadata.row_group(i).column(indice).statistics is not None
+        ]
+    if not maximos:
+        return pd.Timestamp(leer_datos(["Fecha"], ruta=ruta)["Fecha"].max())
+    return pd.Timestamp(max(pd.Timestamp(valor) for valor in maximos))
+
+def rango_periodo(periodo, ruta=DATA_PATH):
+    """Límites (desde, hasta) de un período del selector, anclados al último registro.
+
+    Se ancla a la última fecha con datos y no a la hora actual, para que un
+    histórico que no se actualizó hoy no deje vacías las ventanas cortas.
+    """
+    hasta = fecha_maxima(ruta)
+    return hasta - PERIODOS[periodo], hasta
+
+@span("datos.catalogo")
+def leer_catalogo(ruta=DATA_PATH):
+    """Combinaciones Marca/Modelo/flota existentes, para poblar los selectores"""
+    df = leer_datos(COLUMNAS_CATALOGO, ruta=ruta)
+    return df.drop_duplicates().reset_index(drop=True)
+
+def enlazar_flota(flota, catalogo):
+    """Identificador con que la unidad ya existe en el almacén ('905' -> 905 o 'CAEX_905').
+
+    Si la flota del almacén es numérica, las unidades que no se pueden expresar como
+    número quedan nulas: mezclar tipos en la columna rompería la publicación.
+    """
+    if catalogo is None:
+        return flota
+    conocidas = pd.Series(catalogo["flota"].to_numpy(), index=catalogo["flota"].astype(str))
+    conocidas = conocidas[~conocidas.index.duplicated()]
+    por_digitos = pd.Series(conocidas.to_numpy(), index=conocidas.index.str.extract(r"(\d+)$")[0])
+    por_digitos = por_digitos[por_digitos.index.notna() & ~por_digitos.index.duplicated(keep=False)]
+    enlazada = flota.map(conocidas)
+    enlazada = enlazada.where(enlazada.notna(), flota.str.extract(r"(\d+)$")[0].map(por_digitos))
+    enlazada = enlazada.where(enlazada.notna(), flota)
+    if pd.api.types.is_numeric_dtype(catalogo["flota"]):
+        return pd.to_numeric(enlazada, errors="coerce")
+    return enlazada.astype(object)
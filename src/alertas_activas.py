@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+from acceso_datos import DATA_PATH, escribir_parquet, instantanea_datos, leer_datos, version_derivado
+from metricas import span
+from motor_sql import SQL_ALERTAS, consultar, motor_disponible
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+ALERTAS_PATH = "data/alertas_activas.parquet"
+
+# Profundidad máxima del historial de alertas que se conserva por (Marca, Modelo)
+MAX_ALERTAS_POR_MODELO = 500
+
+COLUMNAS_ALERTA = ["Fecha", "Marca", "Modelo", "flota", "Componente", "Criticidad"]
+
+# ==============================
+# ÍNDICE DE ALERTAS
+# ==============================
+def seleccionar_alertas(df, limite=MAX_ALERTAS_POR_MODELO):
+    """Alertas (criticidad distinta de Normal) más recientes por (Marca, Modelo), de la más nueva a la más antigua"""
+    alertas = df.loc[df["Criticidad"] != "Normal", COLUMNAS_ALERTA]
+    alertas = alertas.assign(Fecha=pd.to_datetime(alertas["Fecha"]))
+    alertas = alertas.sort_values("Fecha", ascending=False, kind="stable")
+    return alertas.groupby(["Marca", "Modelo"], sort=False).head(limite).reset_index(drop=True)
+
+@span("ingesta.alertas")
+def actualizar_indice_alertas(df_nuevos, filas_previas, ruta=ALERTAS_PATH):
+    """Incorpora las alertas de un lote al índice acotado existente.
+
+    Solo si el índice está sellado con los registros publicados antes del lote: si ya
+    incluye el lote, sus alertas quedarían repetidas. En otro caso cargar_indice_alertas
+    lo reconstruye completo la próxima vez que se lea.
+    """
+    if version_derivado(ruta) != filas_previas:
+        return
+    combinado = pd.concat([pd.read_parquet(ruta), df_nuevos[COLUMNAS_ALERTA]], ignore_index=True)
+    escribir_parquet(seleccionar_alertas(combinado), ruta, metadatos={"filas_datos": filas_previas + len(df_nuevos)})
+
+@span("alertas.cargar")
+def cargar_indice_alertas(ruta=ALERTAS_PATH, ruta_datos=DATA_PATH):
+    """Lee el índice de alertas, reconstruyéndolo desde los datos si falta o está sellado con otra versión"""
+    archivos, filas = instantanea_datos(ruta_datos)
+    if version_derivado(ruta) == filas:
+        return pd.read_parquet(ruta)
+    if motor_disponible():
+        alertas = consultar(SQL_ALERTAS, archivos, limite=MAX_ALERTAS_POR_MODELO)
+    else:
+        alertas = seleccionar_alertas(leer_datos(COLUMNAS_ALERTA, archivos=archivos))
+    escribir_parquet(alertas, ruta, metadatos={"filas_datos": filas})
+    return alertas
+
+@span("alertas.indexar")
+def indexar_alertas(alertas):
+    """Separa el índice por (Marca, Modelo), cada parte ordenada de la alerta más nueva a la más antigua"""
+    alertas = alertas.sort_values("Fecha", ascending=False, kind="stable")
+    return {
+        clave: grupo.drop(columns=["Marca", "Modelo"]).reset_index(drop=True)
+        for clave, grupo in alertas.groupby(["Marca", "Modelo"], sort=False)
+    }
+
+# ==============================
+# CONSULTAS
+# ==============================
+def contar_alertas(indice, marca, modelo, fecha_desde=None):
+    """Cantidad de alertas indexadas del modelo, opcionalmente desde una fecha"""
+    alertas = indice.get((marca, modelo))
+    if alertas is None:
+        return 0
+    if fecha_desde is None:
+        return len(alertas)
+    # El orden es descendente: se busca sobre las fechas invertidas
+    fechas = alertas["Fecha"].to_numpy()[::-1]
+    return len(fechas) - np.searchsorted(fechas, pd.Timestamp(fecha_desde).to_datetime64(), "left")
+
+def pagina_alertas(indice, marca, modelo, pagina=0, tamano=5, fecha_desde=None):
+    """Página de alertas más recientes del modelo; solo se materializan las filas pedidas"""
+    total = contar_alertas(indice, marca, modelo, fecha_desde)
+    inicio = pagina * tamano
+    fin = min(inicio + tamano, total)
+    if inicio >= fin:
+        return pd.DataFrame(columns=["Fecha", "flota", "Componente", "Criticidad"])
+    return indice[(marca, modelo)].iloc[inicio:fin]
@@ -0,0 +1,92 @@
+# ==============================
+# ALERTAS PREDICTIVAS
+# ==============================
+# Reglas de alerta sobre la última muestra de un camión
+
+# Función para calcular alertas predictivas
+def calcular_alertas(registro):
+    alertas = []
+    
+    # Verificar niveles de partículas
+    fe_ppm = get_safe_value(registro, "Hierro (Fe) ppm")
+    si_ppm = get_safe_value(registro, "Silicio (Si) ppm")
+    cu_ppm = get_safe_value(registro, "Cobre (Cu) ppm")
+    visc = get_safe_value(registro, "Viscosidad 100°C cSt(mm2/s)")
+    
+    # Predicción de días hasta falla basado en niveles
+    dias_estimados = None
+    nivel_critico = False
+    componente_afectado = None
+    
+    if fe_ppm > 120:
+        dias_estimados = max(1, int(15 - (fe_ppm - 120)/10))
+        nivel_critico = True
+        alertas.append({
+            'componente': 'Motor',
+            'nivel': fe_ppm,
+            'limite': 120,
+            'tipo': 'Crítico',
+            'mensaje': f'Nivel crítico de hierro: {fe_ppm:.1f} ppm',
+            'dias': dias_estimados
+        })
+        componente_afectado = "Motor"
+    elif fe_ppm > 80:
+        alertas.append({
+            'componente': 'Motor',
+            'nivel': fe_ppm,
+            'limite': 80,
+            'tipo': 'Advertencia',
+            'mensaje': f'Nivel elevado de hierro: {fe_ppm:.1f} ppm',
+            'dias': None
+        })
+    
+    if si_ppm > 30:
+        dias_temp = max(1, int(10 - (si_ppm - 30)/5))
+        if dias_estimados is None or dias_temp < dias_estimados:
+            dias_estimados = dias_temp
+            componente_afectado = "Sistema de Filtración"
+        alertas.append({
+            'componente': 'Sistema de Filtración',
+            'nivel': si_ppm,
+            'limite': 30,
+            'tipo': 'Crítico',
+            'mensaje': f'Nivel crítico de silicio: {si_ppm:.1f} ppm',
+            'dias': dias_temp
+        })
+    
+    if cu_ppm > 40:
+        dias_temp = max(1, int(12 - (cu_ppm - 40)/5))
+        if dias_estimados is None or dias_temp < dias_estimados:
+            dias_estimados = dias_temp
+            componente_afectado = "Cojinetes"
+        alertas.append({
+            'componente': 'Cojinetes',
+            'nivel': cu_ppm,
+            'limite': 40,
+            'tipo': 'Crítico',
+            'mensaje': f'Nivel crítico de cobre: {cu_ppm:.1f} ppm',
+            'dias': dias_temp
+        })
+    
+    if visc < 12:
+        dias_temp = max(1, int(5 + visc/2))
+        if dias_estimados is None or dias_temp < dias_estimados:
+            dias_estimados = dias_temp
+            componente_afectado = "Sistema de Lubricación"
+        alertas.append({
+            'componente': 'Sistema de Lubricación',
+            'nivel': visc,
+            'limite': 12,
+            'tipo': 'Crítico',
+            'mensaje': f'Viscosidad crítica: {visc:.1f} cSt',
+            'dias': dias_temp
+        })
+    
+    return alertas, dias_estimados, componente_afectado
+
+# Función auxiliar para obtener valor seguro del registro
+def get_safe_value(registro, key, default=0):
+    try:
+        return float(registro[key]) if key in registro else default
+    except (ValueError, TypeError):
+        return default
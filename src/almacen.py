@@ -0,0 +1,257 @@
+import argparse
+import os
+import sqlite3
+import time
+import pandas as pd
+from acceso_datos import DATA_PATH, CONFIABILIDAD_PATH, escribir_parquet, leer_datos, ruta_temporal
+from metricas import contar, span
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+# Almacén transaccional de registros y métricas diarias: fuente de verdad del histórico.
+# El Parquet que leen las vistas es una publicación derivada de él
+ALMACEN_PATH = "data/flota.db"
+
+TABLA_REGISTROS = "registros"
+TABLA_METRICAS = "metricas_diarias"
+
+# Claves naturales de un registro: el número de muestra del laboratorio y, para los
+# registros que no lo traen, la unidad, el instante y el componente
+CLAVES_MUESTRA = ["Numero Muestra", "Numero Registro"]
+CLAVES_UNIDAD = ["flota", "Fecha", "Componente"]
+
+# Índices de la tabla de registros: (nombre, columnas, único); se crean cuando las columnas existen.
+# Los únicos hacen idempotente la ingesta: un registro ya guardado no vuelve a entrar
+INDICES_REGISTROS = [
+    ("ux_registros_muestra", CLAVES_MUESTRA, True),
+    ("ux_registros_unidad", CLAVES_UNIDAD, True),
+    ("idx_registros_numero_registro", ["Numero Registro"], False)
+]
+
+FORMATO_FECHA = "%Y-%m-%d %H:%M:%S.%f"
+
+# Columnas que se guardan como texto aunque sus valores parezcan números
+COLUMNAS_TEXTO = ["Numero Registro", "Numero Muestra", "Numero Serie Equipo"]
+
+# ==============================
+# CONEXIÓN Y ESQUEMA
+# ==============================
+def conectar(ruta=ALMACEN_PATH):
+    """Conexión con WAL: los lectores no bloquean al generador mientras escribe un lote"""
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    conexion = sqlite3.connect(ruta, timeout=30)
+    conexion.execute("PRAGMA journal_mode=WAL")
+    conexion.execute("PRAGMA synchronous=NORMAL")
+    return conexion
+
+def _q(nombre):
+    return '"{}"'.format(str(nombre).replace('"', '""'))
+
+def _tipo_sql(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+def _asegurar_tabla(conexion, tabla, df, clave=None):
+    """Crea la tabla con las columnas del lote y agrega las que falten en una tabla existente"""
+    existentes = [fila[1] for fila in conexion.execute(f"PRAGMA table_info({_q(tabla)})")]
+    if not existentes:
+        columnas = [f"{_q(c)} {_tipo_sql(df[c].dtype)}" for c in df.columns]
+        if clave:
+            columnas.append(f"PRIMARY KEY ({', '.join(_q(c) for c in clave)})")
+        conexion.execute(f"CREATE TABLE {_q(tabla)} ({', '.join(columnas)})")
+        return
+    for columna in df.columns:
+        if columna not in existentes:
+            conexion.execute(f"ALTER TABLE {_q(tabla)} ADD COLUMN {_q(columna)} {_tipo_sql(df[columna].dtype)}")
+
+def _asegurar_indices(conexion):
+    columnas = {fila[1] for fila in conexion.execute(f"PRAGMA table_info({_q(TABLA_REGISTROS)})")}
+    existentes = {fila[1] for fila in conexion.execute(f"PRAGMA index_list({_q(TABLA_REGISTROS)})")}
+    for nombre, claves, unico in INDICES_REGISTROS:
+        if nombre in existentes or not set(claves) <= columnas:
+            continue
+        lista = ", ".join(_q(c) for c in claves)
+        if unico:
+            # Un almacén creado antes de estos índices puede tener duplicados: se conserva la primera
+            # copia. Las claves con NULL no chocan en el índice único, así que esas filas no se tocan
+            completas = " AND ".join(f"{_q(c)} IS NOT NULL" for c in claves)
+            conexion.execute(f"DELETE FROM {_q(TABLA_REGISTROS)} WHERE {completas} AND rowid NOT IN "
+                             f"(SELECT min(rowid) FROM {_q(TABLA_REGISTROS)} WHERE {completas} GROUP BY {lista})")
+        conexion.execute(f"CREATE {'UNIQUE ' if unico else ''}INDEX {_q(nombre)} ON {_q(TABLA_REGISTROS)} ({lista})")
+
+def _claves_lote(df, columnas):
+    """Claves únicas aplicables al lote: las que tienen todas sus columnas en el lote y en la tabla"""
+    return [claves for _, claves, unico in INDICES_REGISTROS
+            if unico and set(claves) <= set(df.columns) and set(claves) <= columnas]
+
+def _ya_guardados(conexion, df, claves):
+    """Posiciones del lote cuya clave ya está en el almacén.
+
+    Las claves del lote van a una tabla temporal y se cruzan con el índice único:
+    el costo es proporcional al lote, no al histórico.
+    """
+    conexion.execute("DROP TABLE IF EXISTS temp.lote_claves")
+    conexion.execute(f"CREATE TEMP TABLE lote_claves (posicion INTEGER, "
+                     f"{', '.join(_q(c) for c in claves)})")
+    conexion.executemany(f"INSERT INTO temp.lote_claves VALUES ({', '.join('?' * (len(claves) + 1))})",
+                         ((posicion, *fila) for posicion, fila in enumerate(_filas(df[claves]))))
+    condicion = " AND ".join(f"r.{_q(c)} = l.{_q(c)}" for c in claves)
+    posiciones = {fila[0] for fila in conexion.execute(
+        f"SELECT l.posicion FROM temp.lote_claves l JOIN {_q(TABLA_REGISTROS)} r ON {condicion}")}
+    conexion.execute("DROP TABLE temp.lote_claves")
+    return posiciones
+
+def _filas(df):
+    """Filas como tuplas de tipos nativos: sqlite3 no adapta escalares de numpy ni Timestamp"""
+    df = df.copy()
+    for columna in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[columna]):
+            df[columna] = df[columna].dt.strftime(FORMATO_FECHA)
+    df = df.astype(object).where(df.notna(), None)
+    return df.itertuples(index=False, name=None)
+
+def _insertar(conexion, tabla, df, reemplazar=False):
+    columnas = ", ".join(_q(c) for c in df.columns)
+    marcas = ", ".join("?" * len(df.columns))
+    verbo = "INSERT OR REPLACE" if reemplazar else "INSERT"
+    conexion.executemany(f"{verbo} INTO {_q(tabla)} ({columnas}) VALUES ({marcas})", _filas(df))
+
+def _normalizar(df):
+    df = df.copy()
+    for columna in COLUMNAS_TEXTO:
+        if columna in df.columns:
+            df[columna] = df[columna].where(df[columna].isna(), df[columna].astype(str))
+    if "Fecha" in df.columns:
+        df["Fecha"] = pd.to_datetime(df["Fecha"])
+    return df
+
+# ==============================
+# ESCRITURA
+# ==============================
+@span("almacen.insertar")
+def insertar_lote(df_registros, df_metricas=None, ruta=ALMACEN_PATH):
+    """Inserta un lote de registros y, opcionalmente, sus métricas del día en una sola transacción.
+
+    Si algo falla a mitad de camino no queda nada del lote: el histórico nunca
+    queda a medio escribir. Los registros cuya clave natural ya está guardada (o
+    repetida dentro del lote) se descartan, así que reingestar un lote no duplica
+    nada. Las métricas se reemplazan por Fecha. Devuelve los registros insertados.
+    """
+    df_registros = _normalizar(df_registros).reset_index(drop=True)
+    conexion = conectar(ruta)
+    try:
+        with conexion:
+            _asegurar_tabla(conexion, TABLA_REGISTROS, df_registros)
+            _asegurar_indices(conexion)
+            columnas = {fila[1] for fila in conexion.execute(f"PRAGMA table_info({_q(TABLA_REGISTROS)})")}
+            descartados = set()
+            for claves in _claves_lote(df_registros, columnas):
+                completas = df_registros[claves].notna().all(axis=1)
+                repetidos = df_registros[completas].duplicated(claves)
+                descartados |= set(repetidos[repetidos].index)
+                # Las claves con NULL nunca cruzan en el JOIN, igual que en el índice único
+                descartados |= _ya_guardados(conexion, df_registros, claves)
+            nuevos = df_registros.drop(index=sorted(descartados)).reset_index(drop=True)
+            _insertar(conexion, TABLA_REGISTROS, nuevos)
+            if df_metricas is not None and not df_metricas.empty:
+                _asegurar_tabla(conexion, TABLA_METRICAS, df_metricas, clave=["Fecha"])
+                _insertar(conexion, TABLA_METRICAS, df_metricas, reemplazar=True)
+    finally:
+        conexion.close()
+    contar("flota_registros_descartados_total", len(descartados))
+    return nuevos
+
+def importar_parquet(ruta_parquet=DATA_PATH, ruta_metricas=CONFIABILIDAD_PATH, ruta=ALMACEN_PATH):
+    """Carga lo publicado (el Parquet base y sus lotes) en el almacén; los registros ya guardados se descartan"""
+    metricas = None
+    if ruta_metricas and os.path.exists(ruta_metricas):
+        metricas = pd.read_parquet(ruta_metricas)
+        # El arranque publica métricas por equipo, no diarias: esas no se migran
+        if "Fallas Totales" not in metricas.columns:
+            metricas = None
+    insertar_lote(leer_datos(ruta=ruta_parquet), metricas, ruta)
+
+# ==============================
+# LECTURA Y EXPORTACIÓN
+# ==============================
+def contar_registros(ruta=ALMACEN_PATH):
+    """Cantidad de registros en el almacén (0 si aún no existe)"""
+    if not os.path.exists(ruta):
+        return 0
+    conexion = conectar(ruta)
+    try:
+        existe = conexion.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                  (TABLA_REGISTROS,)).fetchone()
+        return conexion.execute(f"SELECT count(*) FROM {_q(TABLA_REGISTROS)}").fetchone()[0] if existe else 0
+    finally:
+        conexion.close()
+
+def ultimo_numero_registro(ruta=ALMACEN_PATH):
+    """Mayor Numero Registro guardado (0 si no hay), para continuar la numeración correlativa"""
+    if not contar_registros(ruta):
+        return 0
+    conexion = conectar(ruta)
+    try:
+        columnas = {fila[1] for fila in conexion.execute(f"PRAGMA table_info({_q(TABLA_REGISTROS)})")}
+        if "Numero Registro" not in columnas:
+            return 0
+        ultimo = conexion.execute(f'SELECT max(CAST("Numero Registro" AS INTEGER)) '
+                                  f"FROM {_q(TABLA_REGISTROS)}").fetchone()[0]
+        return int(ultimo or 0)
+    finally:
+        conexion.close()
+
+def leer_tabla(tabla=TABLA_REGISTROS, ruta=ALMACEN_PATH):
+    """Tabla completa con Fecha como datetime y los identificadores como texto"""
+    conexion = conectar(ruta)
+    try:
+        df = pd.read_sql_query(f"SELECT * FROM {_q(tabla)}", conexion)
+    finally:
+        conexion.close()
+    if tabla == TABLA_REGISTROS:
+        return _normalizar(df)
+    return df
+
+@span("almacen.exportar")
+def exportar(tabla=TABLA_REGISTROS, formato="parquet", salida=None, ruta=ALMACEN_PATH):
+    """Exporta una tabla a Parquet o CSV con un rename atómico; es un trabajo a pedido, no diario"""
+    if salida is None:
+        salida = os.path.join(os.path.dirname(ruta), f"{tabla}.{formato}")
+    df = leer_tabla(tabla, ruta)
+    if formato == "parquet":
+        escribir_parquet(df, salida)
+    elif formato == "csv":
+        ruta_tmp = ruta_temporal(salida)
+        df.to_csv(ruta_tmp, index=False)
+        os.replace(ruta_tmp, salida)
+    else:
+        raise ValueError(f"Formato no soportado: {formato}")
+    return salida
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Almacén transaccional del histórico de la flota")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    exportacion = subcomandos.add_parser("exportar", help="Exporta una tabla a Parquet o CSV")
+    exportacion.add_argument("--tabla", choices=[TABLA_REGISTROS, TABLA_METRICAS], default=TABLA_REGISTROS)
+    exportacion.add_argument("--formato", choices=["parquet", "csv"], default="parquet")
+    exportacion.add_argument("--salida", default=None, help="Archivo de salida (por defecto data/<tabla>.<formato>)")
+
+    importacion = subcomandos.add_parser("importar", help="Carga un Parquet existente en el almacén")
+    importacion.add_argument("--parquet", default=DATA_PATH)
+    importacion.add_argument("--metricas", default=CONFIABILIDAD_PATH)
+
+    args = parser.parse_args()
+    inicio = time.time()
+    if args.comando == "exportar":
+        salida = exportar(args.tabla, args.formato, args.salida)
+        print(f"💾 {args.tabla} exportada a {salida} en {round(time.time() - inicio, 2)} segundos")
+    else:
+        importar_parquet(args.parquet, args.metricas)
+        print(f"📥 {args.parquet} importado en {ALMACEN_PATH} en {round(time.time() - inicio, 2)} segundos")
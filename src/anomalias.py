@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+from acceso_datos import DATA_PATH, escribir_parquet, filas_datos, version_derivado
+from metricas import contar, span
+from series_tiempo import instantanea_series, unir_series
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+ESTADO_ANOMALIAS_PATH = "data/estado_anomalias.parquet"
+ANOMALIAS_PATH = "data/anomalias.parquet"
+
+# Elementos vigilados: se detectan cambios respecto de la historia propia de cada
+# (flota, Componente), sin esperar a que el valor cruce un límite fijo
+ELEMENTOS_VIGILADOS = ["Hierro (Fe) ppm", "Cobre (Cu) ppm", "Silicio (Si) ppm", "Aluminio (Al) ppm"]
+CLAVES_ANOMALIA = ["flota", "Componente", "Elemento"]
+
+# Parámetros del detector
+ALFA = 0.2              # peso de la última muestra en la media y varianza exponenciales (EWMA)
+HOLGURA = 0.5           # k del CUSUM, en desvíos: cambios menores se consideran ruido
+UMBRAL_CUSUM = 5.0      # h del CUSUM: desvío acumulado que marca una deriva
+UMBRAL_SALTO = 4.0      # desvíos de una sola muestra que marcan un salto
+CALENTAMIENTO = 5       # muestras necesarias antes de emitir banderas
+DESVIO_MINIMO = 1.0     # piso del desvío (ppm) y, relativo a la media, para series casi constantes
+DESVIO_RELATIVO = 0.05
+
+TIPOS_ANOMALIA = {1: "Salto", 2: "Deriva al alza", 3: "Deriva a la baja"}
+
+# Profundidad máxima del historial de anomalías que se conserva por (Marca, Modelo)
+MAX_ANOMALIAS_POR_MODELO = 500
+
+COLUMNAS_ANOMALIA = ["Fecha", "Marca", "Modelo", "flota", "Componente", "Elemento", "Valor", "Media", "Desvios", "Tipo"]
+
+# ==============================
+# DETECTOR
+# ==============================
+def _estado_vacio():
+    return {
+        "n": np.zeros(0, dtype=np.int32),
+        "media": np.zeros(0, dtype=np.float64),
+        "varianza": np.zeros(0, dtype=np.float64),
+        "cusum_alto": np.zeros(0, dtype=np.float64),
+        "cusum_bajo": np.zeros(0, dtype=np.float64),
+        "Fecha": np.zeros(0, dtype="datetime64[ns]")
+    }
+
+def _paso(estado, filas, valores, fechas):
+    """Incorpora una muestra a cada serie de `filas` (sin repetir filas): O(1) por muestra.
+
+    Devuelve la media previa, los desvíos estandarizados y el código de anomalía (0 si no hay)
+    de cada muestra.
+    """
+    n, media, varianza = estado["n"][filas], estado["media"][filas], estado["varianza"][filas]
+    desvio = np.maximum(np.sqrt(varianza), np.maximum(DESVIO_RELATIVO * np.abs(media), DESVIO_MINIMO))
+    z = np.where(n > 0, (valores - media) / desvio, 0.0)
+
+    activo = n >= CALENTAMIENTO
+    alto = np.where(activo, np.maximum(0.0, estado["cusum_alto"][filas] + z - HOLGURA), 0.0)
+    bajo = np.where(activo, np.maximum(0.0, estado["cusum_bajo"][filas] - z - HOLGURA), 0.0)
+    codigo = np.select([activo & (np.abs(z) > UMBRAL_SALTO), activo & (alto > UMBRAL_CUSUM),
+                        activo & (bajo > UMBRAL_CUSUM)], [1, 2, 3], 0)
+    # Tras una bandera el CUSUM vuelve a cero para no repetir la misma deriva en cada muestra
+    alto[codigo > 0] = 0.0
+    bajo[codigo > 0] = 0.0
+
+    delta = valores - media
+    estado["media"][filas] = np.where(n > 0, media + ALFA * delta, valores)
+    estado["varianza"][filas] = np.where(n > 0, (1 - ALFA) * (varianza + ALFA * delta ** 2), 0.0)
+    estado["cusum_alto"][filas] = alto
+    estado["cusum_bajo"][filas] = bajo
+    estado["n"][filas] = n + 1
+    estado["Fecha"][filas] = fechas
+    return media, z, codigo
+
+def _muestras(df):
+    """Una fila por (muestra, elemento) con valor, en orden cronológico dentro de cada serie"""
+    elementos = [c for c in ELEMENTOS_VIGILADOS if c in df.columns]
+    largo = df.melt(id_vars=["Fecha", "Marca", "Modelo", "flota", "Componente"], value_vars=elementos,
+                    var_name="Elemento", value_name="Valor").dropna(subset=["Valor"])
+    largo["Fecha"] = pd.to_datetime(largo["Fecha"])
+    largo["Valor"] = largo["Valor"].astype(np.float64)
+    return largo.sort_values(CLAVES_ANOMALIA + ["Fecha"], kind="stable", ignore_index=True)
+
+@span("anomalias.detectar")
+def detectar(df, claves=None, estado=None):
+    """Aplica el detector a las muestras de `df` partiendo de un estado previo.
+
+    Las series avanzan en oleadas: la oleada i toma la i-ésima muestra nueva de cada
+    serie, así que todas las series se actualizan juntas con operaciones vectoriales
+    y cada muestra se procesa una sola vez. Las muestras no posteriores a la última ya
+    incorporada a su serie se ignoran. Devuelve (claves, estado, anomalías).
+    """
+    if claves is None:
+        claves, estado = pd.DataFrame(columns=CLAVES_ANOMALIA), _estado_vacio()
+    largo = _muestras(df)
+
+    # Fila de estado de cada muestra; las series nuevas se agregan al final
+    posiciones = pd.MultiIndex.from_frame(claves[CLAVES_ANOMALIA].astype(object)) if len(claves) else None
+    filas = posiciones.get_indexer(pd.MultiIndex.from_frame(largo[CLAVES_ANOMALIA].astype(object))) \
+        if posiciones is not None else np.full(len(largo), -1)
+    nuevas = largo.loc[filas < 0, CLAVES_ANOMALIA].drop_duplicates()
+    if len(nuevas):
+        codigos = pd.MultiIndex.from_frame(nuevas.astype(object))
+        filas[filas < 0] = len(claves) + codigos.get_indexer(
+            pd.MultiIndex.from_frame(largo.loc[filas < 0, CLAVES_ANOMALIA].astype(object)))
+        claves = pd.concat([claves, nuevas], ignore_index=True)
+        for columna, valores in _estado_vacio().items():
+            estado[columna] = np.concatenate([estado[columna], np.zeros(len(nuevas), dtype=valores.dtype)])
+
+    fechas = largo["Fecha"].to_numpy(dtype="datetime64[ns]")
+    vigentes = (estado["n"][filas] == 0) | (fechas > estado["Fecha"][filas])
+    largo, filas, fechas = largo[vigentes].reset_index(drop=True), filas[vigentes], fechas[vigentes]
+
+    valores = largo["Valor"].to_numpy(dtype=np.float64)
+    oleada = largo.groupby(CLAVES_ANOMALIA, sort=False).cumcount().to_numpy()
+    media, z, codigo = np.zeros(len(largo)), np.zeros(len(largo)), np.zeros(len(largo), dtype=np.int8)
+    orden = np.argsort(oleada, kind="stable")
+    cortes = np.flatnonzero(np.diff(oleada[orden])) + 1
+    for tramo in np.split(orden, cortes) if len(orden) else []:
+        media[tramo], z[tramo], codigo[tramo] = _paso(estado, filas[tramo], valores[tramo], fechas[tramo])
+
+    marcadas = codigo > 0
+    anomalias = largo.loc[marcadas, ["Fecha", "Marca", "Modelo", "flota", "Componente", "Elemento", "Valor"]]
+    anomalias = anomalias.assign(
+        Media=np.round(media[marcadas], 1),
+        Desvios=np.round(z[marcadas], 2),
+        Tipo=pd.Series(codigo[marcadas]).map(TIPOS_ANOMALIA).to_numpy()
+    )
+    contar("flota_anomalias_total", int(marcadas.sum()))
+    return claves, estado, anomalias.reset_index(drop=True)
+
+# ==============================
+# PERSISTENCIA
+# ==============================
+def _leer_estado(ruta):
+    df = pd.read_parquet(ruta)
+    estado = {columna: df[columna].to_numpy(dtype=valores.dtype).copy()
+              for columna, valores in _estado_vacio().items()}
+    return df[CLAVES_ANOMALIA].reset_index(drop=True), estado
+
+def _escribir_estado(claves, estado, ruta, filas):
+    """Estado compacto: una fila por serie, claves como diccionario y números en 32 bits.
+
+    Queda sellado con los registros de datos que el detector ya procesó.
+    """
+    df = claves[CLAVES_ANOMALIA].reset_index(drop=True).assign(
+        n=estado["n"],
+        **{columna: estado[columna].astype(np.float32)
+           for columna in ("media", "varianza", "cusum_alto", "cusum_bajo")},
+        Fecha=estado["Fecha"]
+    )
+    df["Componente"] = df["Componente"].astype("category")
+    df["Elemento"] = df["Elemento"].astype("category")
+    escribir_parquet(df, ruta, orden=CLAVES_ANOMALIA, metadatos={"filas_datos": filas})
+
+def seleccionar_anomalias(df, limite=MAX_ANOMALIAS_POR_MODELO):
+    """Anomalías más recientes por (Marca, Modelo), de la más nueva a la más antigua"""
+    df = df.sort_values("Fecha", ascending=False, kind="stable")
+    return df.groupby(["Marca", "Modelo"], sort=False).head(limite).reset_index(drop=True)
+
+def _vigentes(filas, ruta, ruta_estado):
+    """Estado y anomalías están sellados con la misma versión `filas` de los datos"""
+    return version_derivado(ruta_estado) == filas and version_derivado(ruta) == filas
+
+@span("ingesta.anomalias")
+def actualizar_anomalias(df_nuevos, filas_previas, ruta_estado=ESTADO_ANOMALIAS_PATH, ruta=ANOMALIAS_PATH):
+    """Avanza el detector con un lote recién ingerido, sin volver a leer la historia.
+
+    Igual que el resto de los índices, solo si estado y anomalías están sellados con los
+    registros publicados antes del lote; si no, cargar_anomalias los reconstruye completos
+    la próxima vez que se lean.
+    """
+    if not _vigentes(filas_previas, ruta, ruta_estado):
+        return
+    filas = filas_previas + len(df_nuevos)
+    claves, estado, anomalias = detectar(df_nuevos, *_leer_estado(ruta_estado))
+    _escribir_estado(claves, estado, ruta_estado, filas)
+    if len(anomalias):
+        anomalias = pd.concat([pd.read_parquet(ruta), anomalias], ignore_index=True)
+    else:
+        anomalias = pd.read_parquet(ruta)
+    escribir_parquet(seleccionar_anomalias(anomalias), ruta, metadatos={"filas_datos": filas})
+
+@span("anomalias.cargar")
+def cargar_anomalias(ruta=ANOMALIAS_PATH, ruta_estado=ESTADO_ANOMALIAS_PATH, ruta_datos=DATA_PATH):
+    """Lee las anomalías detectadas, reprocesando la historia si faltan o están selladas con otra versión"""
+    if _vigentes(filas_datos(ruta_datos), ruta, ruta_estado):
+        return pd.read_parquet(ruta)
+    # El almacén de series ya está ordenado por (flota, Componente, Fecha); el sello es
+    # la versión de las series procesadas, aunque llegue un lote mientras se detecta
+    segmentos, filas = instantanea_series(ruta_datos=ruta_datos)
+    claves, estado, anomalias = detectar(unir_series(segmentos))
+    _escribir_estado(claves, estado, ruta_estado, filas)
+    anomalias = seleccionar_anomalias(anomalias.reindex(columns=COLUMNAS_ANOMALIA))
+    escribir_parquet(anomalias, ruta, metadatos={"filas_datos": filas})
+    return anomalias
@@ -0,0 +1,350 @@
+import argparse
+import json
+import math
+import os
+import threading
+import traceback
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+import joblib
+import numpy as np
+import pandas as pd
+from acceso_datos import DATA_PATH, PERIODOS, rango_periodo, version_datos
+from rollups import cargar_cubo, indexar_cubo, kpis_cubo
+from criticidad import cargar_estado_criticidad, ETIQUETAS_CODIGO
+from alertas_activas import cargar_indice_alertas, indexar_alertas, contar_alertas, pagina_alertas
+from cache_figuras import CacheFiguras
+from entrenamiento import MODEL_PATH
+from explicaciones import TOP_FACTORES, cargar_predicciones
+from metricas import REGISTRO, contar, span
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+HOST = "127.0.0.1"
+PUERTO = 8600
+
+TAMANO_PAGINA = 50
+TAMANO_MAXIMO = 500
+
+# Respuestas ya serializadas por (ruta, parámetros, versión): una petición repetida
+# sobre los mismos datos no vuelve a consultar los índices ni a codificar JSON
+CAPACIDAD_RESPUESTAS = 1024
+
+class ErrorApi(Exception):
+    """Error de una petición, con el código HTTP que debe devolverse"""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+# ==============================
+# ÍNDICES POR VERSIÓN DE DATOS
+# ==============================
+class Indices:
+    """Estructuras derivadas que consultan los endpoints, recargadas al cambiar la versión de datos.
+
+    Son las mismas que usan los dashboards (cubo de KPIs, estado de criticidad e
+    índice de alertas); se construyen una vez por versión y se comparten entre
+    todos los hilos del servidor.
+    """
+
+    def __init__(self, ruta_datos=DATA_PATH):
+        self.ruta_datos = ruta_datos
+        self.version = None
+        self._lock = threading.Lock()
+        self._lock_predicciones = threading.Lock()
+        self._predicciones = {}
+        self._version_modelo = None
+
+    def actualizar(self):
+        """Devuelve la versión vigente, recargando los índices si los datos cambiaron"""
+        if not os.path.exists(self.ruta_datos):
+            raise ErrorApi(503, "Aún no hay datos generados")
+        version = version_datos(self.ruta_datos)
+        if version == self.version:
+            return version
+        with self._lock:
+            if version != self.version:
+                self.cubo = indexar_cubo(cargar_cubo(ruta_datos=self.ruta_datos))
+                self.estado = _indexar_estado(cargar_estado_criticidad(ruta_datos=self.ruta_datos))
+                self.alertas = indexar_alertas(cargar_indice_alertas(ruta_datos=self.ruta_datos))
+                self._predicciones = {}
+                self.version = version
+        return version
+
+    def predicciones(self, marca, modelo):
+        """Predicción del modelo entrenado sobre la última muestra de cada flota × Componente.
+
+        Se guardan por versión de datos y de modelo: un reentrenamiento descarta las anteriores.
+        """
+        clave = (marca, modelo)
+        with self._lock_predicciones:
+            pipeline = cargar_modelo()
+            if _modelo["mtime"] != self._version_modelo:
+                self._predicciones = {}
+                self._version_modelo = _modelo["mtime"]
+            if clave not in self._predicciones:
+                self._predicciones[clave] = _predecir(pipeline, marca, modelo, self.ruta_datos)
+            return self._predicciones[clave]
+
+def _indexar_estado(estado):
+    """Último estado de cada camión como lista ordenada por flota, con el peor código de sus componentes"""
+    estado = estado.sort_values(["flota", "Componente"])
+    camiones = []
+    for (marca, modelo, flota), grupo in estado.groupby(["Marca", "Modelo", "flota"], sort=False):
+        camiones.append({
+            "Marca": marca,
+            "Modelo": modelo,
+            "flota": flota,
+            "Fecha": grupo["Fecha"].max(),
+            "Criticidad": ETIQUETAS_CODIGO[int(grupo["Codigo"].max())],
+            "Componentes": [
+                {"Componente": componente, "Fecha": fecha, "Criticidad": ETIQUETAS_CODIGO[int(codigo)]}
+                for componente, fecha, codigo in grupo[["Componente", "Fecha", "Codigo"]].itertuples(index=False)
+            ]
+        })
+    camiones.sort(key=lambda camion: str(camion["flota"]))
+    return camiones
+
+# ==============================
+# PREDICCIONES
+# ==============================
+_modelo = {"mtime": None, "pipeline": None}
+
+def cargar_modelo(ruta=MODEL_PATH):
+    """Modelo de criticidad entrenado, recargado solo si el archivo cambió"""
+    if not os.path.exists(ruta):
+        raise ErrorApi(503, "No hay un modelo entrenado")
+    mtime = os.path.getmtime(ruta)
+    if _modelo["mtime"] != mtime:
+        try:
+            _modelo["pipeline"] = joblib.load(ruta)
+        except Exception as e:
+            raise ErrorApi(503, f"No se pudo cargar el modelo: {e}")
+        _modelo["mtime"] = mtime
+    return _modelo["pipeline"]
+
+def _predecir(pipeline, marca, modelo, ruta_datos):
+    """Predicciones guardadas por el lote de explicaciones, con los factores de cada una"""
+    df = cargar_predicciones(ruta_datos=ruta_datos, pipeline=pipeline)
+    if marca:
+        df = df[df["Marca"] == marca]
+    if modelo:
+        df = df[df["Modelo"] == modelo]
+    probabilidades = [c for c in df.columns if c.startswith("Prob ")]
+    factores = [i for i in range(1, TOP_FACTORES + 1) if f"Factor {i}" in df.columns]
+    return [
+        {
+            "Marca": fila["Marca"],
+            "Modelo": fila["Modelo"],
+            "flota": fila["flota"],
+            "Componente": fila["Componente"],
+            "Fecha": fila["Fecha"],
+            "Prediccion": fila["Prediccion"],
+            "Probabilidades": {c[len("Prob "):]: float(fila[c]) for c in probabilidades},
+            "Factores": [
+                {"Variable": fila[f"Factor {i}"], "Valor": fila[f"Valor {i}"], "Aporte": float(fila[f"Aporte {i}"])}
+                for i in factores
+            ]
+        }
+        for fila in df.sort_values(["flota", "Componente"]).to_dict("records")
+    ]
+
+# ==============================
+# ENDPOINTS
+# ==============================
+def _paginar(filas, parametros):
+    pagina, tamano = _pagina(parametros)
+    inicio = pagina * tamano
+    return {"pagina": pagina, "tamano": tamano, "total": len(filas), "datos": filas[inicio:inicio + tamano]}
+
+def _pagina(parametros):
+    try:
+        pagina = int(parametros.get("pagina", 0))
+        tamano = int(parametros.get("tamano", TAMANO_PAGINA))
+    except ValueError:
+        raise ErrorApi(400, "pagina y tamano deben ser enteros")
+    if pagina < 0 or not 1 <= tamano <= TAMANO_MAXIMO:
+        raise ErrorApi(400, f"pagina debe ser >= 0 y tamano estar entre 1 y {TAMANO_MAXIMO}")
+    return pagina, tamano
+
+def _fecha(parametros, nombre):
+    if nombre not in parametros:
+        return None
+    try:
+        return pd.Timestamp(parametros[nombre])
+    except ValueError:
+        raise ErrorApi(400, f"Fecha inválida en {nombre}")
+
+def _ventana(parametros, ruta_datos):
+    """Ventana (desde, hasta) pedida con periodo=<selector> o con desde/hasta explícitos"""
+    if "periodo" in parametros:
+        if parametros["periodo"] not in PERIODOS:
+            raise ErrorApi(400, f"periodo debe ser uno de: {', '.join(PERIODOS)}")
+        return rango_periodo(parametros["periodo"], ruta_datos)
+    return _fecha(parametros, "desde"), _fecha(parametros, "hasta")
+
+def _filtrar(filas, parametros):
+    for columna, nombre in (("Marca", "marca"), ("Modelo", "modelo"), ("flota", "flota")):
+        if nombre in parametros:
+            filas = [fila for fila in filas if str(fila[columna]) == parametros[nombre]]
+    return filas
+
+def endpoint_kpis(indices, parametros):
+    """KPIs por Marca × Modelo en la ventana pedida, recompuestos desde el cubo"""
+    desde, hasta = _ventana(parametros, indices.ruta_datos)
+    modelos = _filtrar([{"Marca": marca, "Modelo": modelo} for marca, modelo in sorted(indices.cubo)], parametros)
+    filas = [{**fila, **kpis_cubo(indices.cubo, fila["Marca"], fila["Modelo"], desde, hasta)} for fila in modelos]
+    return _paginar(filas, parametros)
+
+def endpoint_estado(indices, parametros):
+    """Último estado de criticidad de cada camión y de sus componentes"""
+    return _paginar(_filtrar(indices.estado, parametros), parametros)
+
+def endpoint_alertas(indices, parametros):
+    """Alertas más recientes de un modelo, de la más nueva a la más antigua"""
+    if "marca" not in parametros or "modelo" not in parametros:
+        raise ErrorApi(400, "Las alertas requieren marca y modelo")
+    marca, modelo = parametros["marca"], parametros["modelo"]
+    pagina, tamano = _pagina(parametros)
+    desde = _fecha(parametros, "desde")
+    alertas = pagina_alertas(indices.alertas, marca, modelo, pagina, tamano, desde)
+    return {
+        "pagina": pagina,
+        "tamano": tamano,
+        "total": int(contar_alertas(indices.alertas, marca, modelo, desde)),
+        "datos": alertas.to_dict("records")
+    }
+
+def endpoint_predicciones(indices, parametros):
+    """Criticidad predicha para la última muestra de cada componente"""
+    filas = indices.predicciones(parametros.get("marca"), parametros.get("modelo"))
+    return _paginar(_filtrar(filas, parametros), parametros)
+
+ENDPOINTS = {
+    "/kpis": endpoint_kpis,
+    "/estado": endpoint_estado,
+    "/alertas": endpoint_alertas,
+    "/predicciones": endpoint_predicciones
+}
+
+# ==============================
+# SERIALIZACIÓN
+# ==============================
+def _valor_json(valor):
+    if isinstance(valor, (pd.Timestamp, datetime)):
+        return valor.isoformat()
+    if isinstance(valor, np.integer):
+        return int(valor)
+    if isinstance(valor, np.floating):
+        return float(valor)
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+def _sin_nan(valor):
+    # JSON no admite NaN: los KPIs sin registros se publican como null
+    if isinstance(valor, dict):
+        return {clave: _sin_nan(v) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [_sin_nan(v) for v in valor]
+    if isinstance(valor, float) and math.isnan(valor):
+        return None
+    return valor
+
+def serializar(cuerpo):
+    return json.dumps(_sin_nan(cuerpo), default=_valor_json, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
+# ==============================
+# SERVIDOR
+# ==============================
+class ManejadorApi(BaseHTTPRequestHandler):
+    """Atiende GET sobre los endpoints; responde 304 si el cliente ya tiene la versión vigente"""
+
+    # HTTP/1.1 mantiene la conexión abierta entre peticiones del mismo cliente
+    protocol_version = "HTTP/1.1"
+    # Cabeceras y cuerpo se escriben por separado: sin TCP_NODELAY el cuerpo espera el ACK diferido (~40 ms)
+    disable_nagle_algorithm = True
+    indices = None
+    respuestas = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == "/metrics":
+            # Exposición para Prometheus de los spans y contadores de este proceso
+            self._responder(200, REGISTRO.texto_prometheus("api").encode("utf-8"),
+                            tipo="text/plain; version=0.0.4; charset=utf-8")
+            return
+        endpoint = ENDPOINTS.get(url.path)
+        if endpoint is None:
+            self._responder(404, serializar({"error": f"Ruta desconocida: {url.path}",
+                                             "rutas": sorted(ENDPOINTS)}))
+            return
+        try:
+            with span(f"api{url.path}"):
+                self._atender(url, endpoint)
+        except ErrorApi as e:
+            contar("flota_api_errores_total", ruta=url.path, estado=e.estado)
+            self._responder(e.estado, serializar({"error": str(e)}))
+        except ConnectionError:
+            # El cliente cerró la conexión: no hay a quién responder
+            raise
+        except Exception as e:
+            # Un error inesperado también responde JSON, en lugar de cortar la conexión sin cuerpo
+            traceback.print_exc()
+            contar("flota_api_errores_total", ruta=url.path, estado=500)
+            self._responder(500, serializar({"error": f"Error interno: {type(e).__name__}: {e}"}))
+
+    def _atender(self, url, endpoint):
+        version = self.indices.actualizar()
+        etag = f'"{version:.6f}"'
+        if url.path == "/predicciones":
+            etag = f'"{version:.6f}-{os.path.getmtime(MODEL_PATH) if os.path.exists(MODEL_PATH) else 0:.6f}"'
+        if self.headers.get("If-None-Match") == etag:
+            self._responder(304, b"", etag)
+            return
+
+        parametros = dict(parse_qsl(url.query))
+        cuerpo = self.respuestas.obtener(
+            url.path, sorted(parametros.items()), etag,
+            lambda: serializar({"version": version, **endpoint(self.indices, parametros)}))
+        self._responder(200, cuerpo, etag)
+
+    def _responder(self, estado, cuerpo, etag=None, tipo="application/json; charset=utf-8"):
+        self.send_response(estado)
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if estado != 304:
+            self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, format, *args):
+        # El log por petición en stderr limita el throughput; se omite
+        pass
+
+def crear_servidor(host=HOST, puerto=PUERTO, ruta_datos=DATA_PATH):
+    """Servidor HTTP listo para serve_forever(), con índices y caché de respuestas propios"""
+    manejador = type("Manejador", (ManejadorApi,), {
+        "indices": Indices(ruta_datos),
+        "respuestas": CacheFiguras(CAPACIDAD_RESPUESTAS, nombre="respuesta")
+    })
+    servidor = ThreadingHTTPServer((host, puerto), manejador)
+    servidor.daemon_threads = True
+    return servidor
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API JSON de KPIs, estado, alertas y predicciones de la flota")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--puerto", type=int, default=PUERTO)
+    args = parser.parse_args()
+
+    servidor = crear_servidor(args.host, args.puerto)
+    print(f"🌐 API disponible en http://{args.host}:{args.puerto} ({', '.join(sorted(ENDPOINTS))})")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        servidor.server_close()
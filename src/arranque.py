@@ -0,0 +1,61 @@
+import os
+import threading
+import time
+import streamlit as st
+from acceso_datos import DATA_PATH, CONFIABILIDAD_PATH
+from data_generator import bootstrap_datos
+
+# ==============================
+# ARRANQUE NO BLOQUEANTE
+# ==============================
+# Indica si este proceso lanzó la generación inicial de datos
+_bootstrap_lanzado = False
+
+class TareaBootstrap:
+    """Hilo de generación de datos iniciales compartido por todas las sesiones"""
+
+    def __init__(self):
+        self.error = None
+        self.hilo = threading.Thread(target=self._ejecutar, name="bootstrap-datos", daemon=True)
+        self.hilo.start()
+
+    def _ejecutar(self):
+        try:
+            bootstrap_datos()
+        except Exception as e:
+            self.error = e
+
+    @property
+    def en_curso(self):
+        return self.hilo.is_alive()
+
+@st.cache_resource
+def _tarea_bootstrap():
+    return TareaBootstrap()
+
+def datos_disponibles():
+    """Indica si ya se publicó al menos una partición de datos"""
+    return os.path.exists(DATA_PATH) and os.path.exists(CONFIABILIDAD_PATH)
+
+def esperar_datos_iniciales(intervalo=1.0):
+    """Lanza la generación en segundo plano si no hay datos y muestra un estado de carga.
+
+    La página se vuelve a ejecutar sola hasta que aparece la primera partición;
+    desde ese momento se renderiza normalmente aunque el histórico siga generándose.
+    """
+    global _bootstrap_lanzado
+    if datos_disponibles():
+        if _bootstrap_lanzado and _tarea_bootstrap().en_curso:
+            st.caption("⏳ Completando la generación del histórico en segundo plano...")
+        return
+
+    _bootstrap_lanzado = True
+    tarea = _tarea_bootstrap()
+    if tarea.error is not None:
+        st.error(f"Error al generar datos: {tarea.error}")
+        _tarea_bootstrap.clear()
+        st.stop()
+
+    with st.spinner("Generando datos iniciales, el panel se activará en unos segundos..."):
+        time.sleep(intervalo)
+    st.rerun()
@@ -0,0 +1,168 @@
+import argparse
+import itertools
+import time
+import numpy as np
+import pandas as pd
+from acceso_datos import DATA_PATH, leer_datos
+from metricas import exportar_metricas, span
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+# Reglas de calcular_alertas: (columna, sentido, límite vigente). Una muestra genera
+# alerta si cualquiera de las reglas se cumple (para Fe cuenta ya la advertencia)
+REGLAS = [
+    ("Hierro (Fe) ppm", ">", 80),
+    ("Silicio (Si) ppm", ">", 30),
+    ("Cobre (Cu) ppm", ">", 40),
+    ("Viscosidad 100°C cSt(mm2/s)", "<", 12)
+]
+OPCIONES_REGLA = {"Hierro (Fe) ppm": "fe", "Silicio (Si) ppm": "si", "Cobre (Cu) ppm": "cu",
+                  "Viscosidad 100°C cSt(mm2/s)": "visc"}
+
+# Una alerta acierta si la unidad tiene un evento Critico posterior dentro del horizonte
+HORIZONTE_DIAS = 14
+
+# Celdas muestras × configuraciones evaluadas a la vez: acota la memoria de la matriz de alertas
+CELDAS_POR_TRAMO = 20_000_000
+
+NANOS_POR_DIA = 86_400 * 10**9
+
+# ==============================
+# EVENTOS
+# ==============================
+def preparar_muestras(df, horizonte_dias=HORIZONTE_DIAS):
+    """Ordena las muestras por unidad y fecha y asocia cada una al próximo evento Critico de su unidad.
+
+    Devuelve las muestras con dos columnas nuevas: `evento` (posición del próximo Critico
+    estrictamente posterior dentro del horizonte, -1 si no hay) y `dias_al_evento`; y la
+    tabla de eventos Critico.
+    """
+    df = df.assign(Fecha=pd.to_datetime(df["Fecha"])).sort_values(["flota", "Fecha"], kind="stable",
+                                                                   ignore_index=True)
+    fechas = df["Fecha"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    unidad = pd.factorize(df["flota"])[0]
+    critico = (df["Criticidad"] == "Critico").to_numpy()
+    eventos = np.flatnonzero(critico)
+
+    # Próximo Critico estrictamente posterior de la misma unidad: como las muestras ya están
+    # ordenadas por (unidad, fecha), es el primer evento después de la última muestra con la
+    # misma unidad y fecha; una búsqueda binaria sobre las posiciones de los eventos
+    cambio = np.r_[True, (unidad[1:] != unidad[:-1]) | (fechas[1:] != fechas[:-1])]
+    fin_tramo = np.r_[np.flatnonzero(cambio)[1:], len(df)] - 1
+    siguiente = np.searchsorted(eventos, fin_tramo[np.cumsum(cambio) - 1], side="right")
+    evento = np.full(len(df), -1, dtype=np.int64)
+    valido = siguiente < len(eventos)
+    candidato = eventos[np.minimum(siguiente, len(eventos) - 1)]
+    dias = (fechas[candidato] - fechas) / NANOS_POR_DIA
+    valido &= (unidad[candidato] == unidad) & (dias <= horizonte_dias)
+    evento[valido] = np.searchsorted(eventos, candidato[valido])
+    df["evento"] = evento
+    df["dias_al_evento"] = np.where(valido, dias, np.nan)
+    return df, df.iloc[eventos].reset_index(drop=True)
+
+# ==============================
+# BARRIDO
+# ==============================
+def grilla(limites):
+    """Producto cartesiano de los límites a probar por regla: {columna: [límites]} -> DataFrame"""
+    columnas = list(limites)
+    return pd.DataFrame(list(itertools.product(*(limites[c] for c in columnas))), columns=columnas)
+
+def _alertas(muestras, configuraciones):
+    """Matriz booleana muestras × configuraciones: difusión de NumPy sobre ambos ejes"""
+    alerta = np.zeros((len(muestras), len(configuraciones)), dtype=bool)
+    for columna, sentido, _ in REGLAS:
+        if columna not in configuraciones or columna not in muestras:
+            continue
+        valores = muestras[columna].to_numpy(dtype=np.float64)[:, None]
+        limites = configuraciones[columna].to_numpy(dtype=np.float64)[None, :]
+        # Los valores faltantes comparan como False: no generan alerta
+        alerta |= valores > limites if sentido == ">" else valores < limites
+    return alerta
+
+def _evaluar_tramo(alerta, evento, dias, total_eventos):
+    acierto = evento >= 0
+    alertas = alerta.sum(axis=0)
+    aciertos = (alerta & acierto[:, None]).sum(axis=0)
+
+    # Por evento: detectado si alguna muestra previa en el horizonte alertó; la anticipación
+    # es la de la primera de ellas. Las muestras se agrupan por evento con reduceat
+    orden = np.flatnonzero(acierto)
+    orden = orden[np.argsort(evento[orden], kind="stable")]
+    detectados = np.zeros(alerta.shape[1])
+    anticipacion = np.full(alerta.shape[1], np.nan)
+    if len(orden):
+        inicios = np.flatnonzero(np.r_[True, np.diff(evento[orden]) != 0])
+        previas = np.where(alerta[orden], dias[orden][:, None], -np.inf)
+        maxima = np.maximum.reduceat(previas, inicios, axis=0)
+        detectado = np.isfinite(maxima)
+        detectados = detectado.sum(axis=0)
+        suma = np.where(detectado, maxima, 0).sum(axis=0)
+        anticipacion = np.divide(suma, detectados, out=np.full(alerta.shape[1], np.nan), where=detectados > 0)
+
+    return pd.DataFrame({
+        "Alertas": alertas,
+        "Precision": np.divide(aciertos, alertas, out=np.zeros(alerta.shape[1]), where=alertas > 0),
+        "Recall": detectados / total_eventos if total_eventos else np.zeros(alerta.shape[1]),
+        "Anticipacion (dias)": anticipacion
+    })
+
+@span("backtest.evaluar")
+def evaluar(muestras, eventos, configuraciones):
+    """Precision, recall y anticipación media de cada configuración sobre toda la historia"""
+    evento = muestras["evento"].to_numpy()
+    dias = muestras["dias_al_evento"].to_numpy()
+    por_tramo = max(1, CELDAS_POR_TRAMO // max(1, len(muestras)))
+    resultados = []
+    for inicio in range(0, len(configuraciones), por_tramo):
+        tramo = configuraciones.iloc[inicio:inicio + por_tramo]
+        resultados.append(_evaluar_tramo(_alertas(muestras, tramo), evento, dias, len(eventos)))
+    resultado = pd.concat([configuraciones.reset_index(drop=True)] + [pd.concat(resultados, ignore_index=True)],
+                          axis=1)
+    suma = resultado["Precision"] + resultado["Recall"]
+    resultado["F1"] = np.divide(2 * resultado["Precision"] * resultado["Recall"], suma,
+                                out=np.zeros(len(resultado)), where=suma > 0)
+    return resultado
+
+def cargar_muestras(ruta=DATA_PATH, horizonte_dias=HORIZONTE_DIAS):
+    columnas = ["Fecha", "flota", "Criticidad"] + [columna for columna, _, _ in REGLAS]
+    return preparar_muestras(leer_datos(columnas, ruta=ruta), horizonte_dias)
+
+# ==============================
+# LÍNEA DE COMANDOS
+# ==============================
+def _rango(texto):
+    """'60:160:10' (inicio:fin:paso, fin incluido) o '60,80,120'"""
+    if ":" in texto:
+        inicio, fin, paso = (float(parte) for parte in texto.split(":"))
+        return list(np.round(np.arange(inicio, fin + paso / 2, paso), 6))
+    return [float(valor) for valor in texto.split(",")]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evalúa sobre la historia una grilla de límites de alerta")
+    for columna, sentido, limite in REGLAS:
+        parser.add_argument(f"--{OPCIONES_REGLA[columna]}", type=_rango, default=[limite],
+                            help=f"Límites de '{columna}' ({sentido}); vigente: {limite}")
+    parser.add_argument("--horizonte", type=float, default=HORIZONTE_DIAS,
+                        help="Días hacia adelante en que un Critico cuenta como acierto")
+    parser.add_argument("--top", type=int, default=10, help="Configuraciones a mostrar, ordenadas por F1")
+    parser.add_argument("--salida", default=None, help="CSV con el resultado de todas las configuraciones")
+    args = parser.parse_args()
+
+    inicio = time.time()
+    muestras, eventos = cargar_muestras(horizonte_dias=args.horizonte)
+    configuraciones = grilla({columna: getattr(args, OPCIONES_REGLA[columna]) for columna, _, _ in REGLAS})
+    resultado = evaluar(muestras, eventos, configuraciones)
+    print(f"🧮 {len(configuraciones)} configuraciones × {len(muestras)} muestras ({len(eventos)} eventos Critico) "
+          f"en {round(time.time() - inicio, 2)} segundos")
+
+    vigente = evaluar(muestras, eventos, grilla({columna: [limite] for columna, _, limite in REGLAS}))
+    print("Límites vigentes:")
+    print(vigente.round(3).to_string(index=False))
+    print(f"Mejores {args.top} por F1:")
+    print(resultado.sort_values("F1", ascending=False).head(args.top).round(3).to_string(index=False))
+    if args.salida:
+        resultado.to_csv(args.salida, index=False)
+        print(f"💾 Resultado guardado en {args.salida}")
+    exportar_metricas("backtest")
@@ -0,0 +1,297 @@
+import argparse
+import io
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import generdor
+import entrenamiento
+from acceso_datos import DATA_PATH, escribir_parquet, leer_catalogo, leer_datos, rango_periodo
+from alertas_predictivas import calcular_alertas
+from rollups import CUBO_PATH, cargar_cubo, indexar_cubo, kpis_cubo, tendencia_cubo
+from criticidad import ESTADO_CRITICIDAD_PATH, cargar_estado_criticidad, indexar_matrices
+from alertas_activas import ALERTAS_PATH, cargar_indice_alertas, indexar_alertas
+from almacen import insertar_lote
+from series_tiempo import cargar_series, indexar_series, historial_unidad
+from proyeccion_costos import estadisticas_fallas, proyectar_estadisticas
+from motor_sql import estadisticas_economicas, motor_disponible
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+ESCALAS = [1, 10, 100]
+DIAS = 14
+REPETICIONES = 3
+SEMILLA = 42
+FECHA_INICIO = datetime(2025, 1, 1)
+
+# Una regresión es un tiempo mediano que crece más que este margen respecto de la base
+UMBRAL_REGRESION = 0.2
+
+# Números de flota de las réplicas: rangos disjuntos de los originales (500-568 y 900-939)
+INICIO_REPLICAS_CATERPILLAR = 20000
+INICIO_REPLICAS_KOMATSU = 40000
+
+# Columnas que lee cada dashboard (ver COLUMNAS_* en cada app)
+COLUMNAS_PRINCIPAL = [
+    "Fecha", "flota", "Marca", "Modelo", "Criticidad", "Disponibilidad",
+    "Tiempo Parada", "TBF", "Confiabilidad", "Hierro (Fe) ppm",
+    "Silicio (Si) ppm", "Cobre (Cu) ppm", "Viscosidad 100°C cSt(mm2/s)"
+]
+COLUMNAS_TECNICO = [
+    "Fecha", "Componente", "Criticidad",
+    "Hierro (Fe) ppm", "Cobre (Cu) ppm", "Silicio (Si) ppm", "Aluminio (Al) ppm"
+]
+COLUMNAS_ECONOMICO = ["Fecha", "Tiempo Parada", "Criticidad"]
+
+ETAPAS = ["generacion", "guardado", "alertas_flota", "principal", "tecnico",
+          "ejecutivo", "economico", "entrenamiento"]
+
+# ==============================
+# DATOS
+# ==============================
+@contextmanager
+def flota_escalada(escala):
+    """Multiplica la flota del generador por `escala` mientras dura el bloque"""
+    nombres = ["num_caterpillar", "num_komatsu", "num_registros", "flota_caterpillar",
+               "flota_komatsu", "NUM_MUESTRA_DIGITOS", "NUM_REGISTRO"]
+    originales = {nombre: getattr(generdor, nombre) for nombre in nombres}
+    replicas = escala - 1
+
+    generdor.flota_caterpillar = originales["flota_caterpillar"] + list(range(
+        INICIO_REPLICAS_CATERPILLAR, INICIO_REPLICAS_CATERPILLAR + len(originales["flota_caterpillar"]) * replicas))
+    generdor.flota_komatsu = originales["flota_komatsu"] + list(range(
+        INICIO_REPLICAS_KOMATSU, INICIO_REPLICAS_KOMATSU + len(originales["flota_komatsu"]) * replicas))
+    generdor.num_caterpillar = originales["num_caterpillar"] * escala
+    generdor.num_komatsu = originales["num_komatsu"] * escala
+    generdor.num_registros = generdor.num_caterpillar + generdor.num_komatsu
+    generdor.NUM_MUESTRA_DIGITOS = 0
+    generdor.NUM_REGISTRO = 0
+    try:
+        yield
+    finally:
+        for nombre, valor in originales.items():
+            setattr(generdor, nombre, valor)
+
+@contextmanager
+def sin_guardado():
+    """Desactiva el guardado por día de generar_datos_historicos (y la exportación de métricas de la
+    corrida): se mide aparte en su propia etapa"""
+    guardar_datos, exportar = generdor.guardar_datos, generdor.exportar
+    generdor.guardar_datos = lambda *args, **kwargs: None
+    generdor.exportar = lambda *args, **kwargs: None
+    try:
+        yield
+    finally:
+        generdor.guardar_datos, generdor.exportar = guardar_datos, exportar
+
+def _fecha_como_datetime(df):
+    return df.assign(Fecha=pd.to_datetime(df["Fecha"]))
+
+# ==============================
+# MEDICIÓN
+# ==============================
+def _medir(funcion, repeticiones=1, preparar=None):
+    """Mediana y mínimo en segundos de `repeticiones` ejecuciones; `preparar` corre antes de cada una sin medirse"""
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar is not None:
+            preparar()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return {"mediana_s": round(statistics.median(tiempos), 4), "min_s": round(min(tiempos), 4)}
+
+def _borrar_derivados():
+    for ruta in (CUBO_PATH, ESTADO_CRITICIDAD_PATH, ALERTAS_PATH):
+        if os.path.exists(ruta):
+            os.remove(ruta)
+
+def medir_escala(escala, dias=DIAS, repeticiones=REPETICIONES, semilla=SEMILLA, etapas=ETAPAS):
+    """Genera el histórico de una escala en el directorio actual y mide las etapas pedidas"""
+    random.seed(semilla)
+    np.random.seed(semilla)
+    fecha_fin = FECHA_INICIO + timedelta(days=dias - 1)
+    resultados = {}
+
+    with flota_escalada(escala):
+        # Generación: siempre se ejecuta, porque produce los datos de las demás etapas
+        with sin_guardado():
+            inicio = time.perf_counter()
+            df, _ = generdor.generar_datos_historicos(FECHA_INICIO, fecha_fin)
+            tiempo = round(time.perf_counter() - inicio, 4)
+        if "generacion" in etapas:
+            resultados["generacion"] = {"mediana_s": tiempo, "min_s": tiempo}
+
+        # Histórico previo al último día, con sus estructuras derivadas, para medir
+        # el guardado incremental de un día tal como ocurre en producción
+        ultimo_dia = df["Fecha"].str[:10] == fecha_fin.strftime("%Y-%m-%d")
+        os.makedirs(os.path.dirname(DATA_PATH), exist_ok=True)
+        insertar_lote(df[~ultimo_dia])
+        escribir_parquet(_fecha_como_datetime(df[~ultimo_dia]), DATA_PATH)
+        cargar_cubo()
+        cargar_estado_criticidad()
+        cargar_indice_alertas()
+        cargar_series()
+        if "guardado" in etapas:
+            resultados["guardado"] = _medir(
+                lambda: generdor.guardar_datos(df[ultimo_dia].reset_index(drop=True), fecha_dia=fecha_fin.date()))
+        else:
+            escribir_parquet(_fecha_como_datetime(df), DATA_PATH)
+
+    catalogo = leer_catalogo().sort_values(["Marca", "Modelo", "flota"]).reset_index(drop=True)
+    marca, modelo, flota = catalogo.iloc[0][["Marca", "Modelo", "flota"]]
+
+    if "alertas_flota" in etapas:
+        df_principal = leer_datos(COLUMNAS_PRINCIPAL)
+        ultimos = df_principal.sort_values("Fecha").drop_duplicates("flota", keep="last").to_dict("records")
+        resultados["alertas_flota"] = _medir(lambda: [calcular_alertas(registro) for registro in ultimos],
+                                             repeticiones)
+
+    if "principal" in etapas:
+        def principal():
+            leer_catalogo()
+            df_camion = leer_datos(COLUMNAS_PRINCIPAL, marca=marca, modelo=modelo, flota=flota)
+            calcular_alertas(df_camion.iloc[-1])
+        resultados["principal"] = _medir(principal, repeticiones)
+
+    if "tecnico" in etapas:
+        # El índice de series se construye una vez por versión de datos; por rerun solo se toma el slice
+        series = indexar_series(cargar_series())
+        resultados["tecnico"] = _medir(
+            lambda: historial_unidad(series, flota, marca=marca, modelo=modelo, columnas=COLUMNAS_TECNICO),
+            repeticiones)
+
+    if "ejecutivo" in etapas:
+        # Reconstrucción en frío de las estructuras derivadas y consultas de la vista
+        def ejecutivo():
+            cubo = indexar_cubo(cargar_cubo())
+            for clave in cubo:
+                kpis_cubo(cubo, *clave)
+                tendencia_cubo(cubo, "Disponibilidad", *clave)
+            indexar_matrices(cargar_estado_criticidad())
+            indexar_alertas(cargar_indice_alertas())
+        resultados["ejecutivo"] = _medir(ejecutivo, repeticiones, preparar=_borrar_derivados)
+
+    if "economico" in etapas:
+        def economico():
+            desde, hasta = rango_periodo("Último Mes")
+            if motor_disponible():
+                estadisticas = estadisticas_economicas(marca, modelo, desde, hasta)
+            else:
+                estadisticas = estadisticas_fallas(leer_datos(COLUMNAS_ECONOMICO, marca=marca, modelo=modelo,
+                                                              fecha_desde=desde, fecha_hasta=hasta))
+            proyectar_estadisticas(estadisticas, 850, 15000)
+        resultados["economico"] = _medir(economico, repeticiones)
+
+    if "entrenamiento" in etapas:
+        with redirect_stdout(io.StringIO()):
+            resultados["entrenamiento"] = _medir(entrenamiento.entrenar_modelo)
+
+    return {
+        "camiones": generdor.num_registros * escala,
+        "filas": len(df),
+        "etapas": resultados
+    }
+
+def _commit_actual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def ejecutar_suite(escalas=ESCALAS, dias=DIAS, repeticiones=REPETICIONES, semilla=SEMILLA, etapas=ETAPAS):
+    """Mide cada escala en un directorio de trabajo temporal propio"""
+    resultado = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit_actual(),
+        "python": sys.version.split()[0],
+        "dias": dias,
+        "repeticiones": repeticiones,
+        "semilla": semilla,
+        "escalas": {}
+    }
+    directorio_original = os.getcwd()
+    for escala in escalas:
+        directorio = tempfile.mkdtemp(prefix=f"benchmark_escala_{escala}x_")
+        os.chdir(directorio)
+        try:
+            print(f"⏱️ Escala {escala}×...")
+            resultado["escalas"][str(escala)] = medir_escala(escala, dias, repeticiones, semilla, etapas)
+            for etapa, tiempos in resultado["escalas"][str(escala)]["etapas"].items():
+                print(f"   {etapa:<15} {tiempos['mediana_s']:>10.4f} s")
+        finally:
+            os.chdir(directorio_original)
+            shutil.rmtree(directorio, ignore_errors=True)
+    return resultado
+
+# ==============================
+# COMPARACIÓN
+# ==============================
+def comparar(base, nuevo, umbral=UMBRAL_REGRESION):
+    """Compara dos resultados por escala y etapa; devuelve las filas y las regresiones encontradas"""
+    filas, regresiones = [], []
+    for escala in sorted(set(base["escalas"]) & set(nuevo["escalas"]), key=int):
+        etapas_base = base["escalas"][escala]["etapas"]
+        etapas_nuevo = nuevo["escalas"][escala]["etapas"]
+        for etapa in [e for e in ETAPAS if e in etapas_base and e in etapas_nuevo]:
+            antes = etapas_base[etapa]["mediana_s"]
+            despues = etapas_nuevo[etapa]["mediana_s"]
+            razon = despues / antes if antes else float("inf")
+            fila = (escala, etapa, antes, despues, razon)
+            filas.append(fila)
+            if razon > 1 + umbral:
+                regresiones.append(fila)
+    return filas, regresiones
+
+def imprimir_comparacion(filas, umbral=UMBRAL_REGRESION):
+    print(f"{'Escala':>7} {'Etapa':<15} {'Base (s)':>10} {'Nuevo (s)':>10} {'Razón':>7}")
+    for escala, etapa, antes, despues, razon in filas:
+        marca = "⚠️ regresión" if razon > 1 + umbral else ("✅ mejora" if razon < 1 - umbral else "")
+        print(f"{escala + '×':>7} {etapa:<15} {antes:>10.4f} {despues:>10.4f} {razon:>7.2f} {marca}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de generación, guardado, entrenamiento, alertas y dashboards por escala de flota")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    ejecutar = subcomandos.add_parser("ejecutar", help="Ejecuta la suite y guarda los resultados en JSON")
+    ejecutar.add_argument("--escalas", type=int, nargs="+", default=ESCALAS)
+    ejecutar.add_argument("--dias", type=int, default=DIAS)
+    ejecutar.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    ejecutar.add_argument("--semilla", type=int, default=SEMILLA)
+    ejecutar.add_argument("--etapas", nargs="+", choices=ETAPAS, default=ETAPAS)
+    ejecutar.add_argument("--salida", default="benchmark_escala.json")
+
+    comparacion = subcomandos.add_parser("comparar", help="Compara dos resultados y falla si hay regresiones")
+    comparacion.add_argument("base")
+    comparacion.add_argument("nuevo")
+    comparacion.add_argument("--umbral", type=float, default=UMBRAL_REGRESION,
+                             help="Aumento relativo tolerado del tiempo mediano (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.comando == "ejecutar":
+        resultado = ejecutar_suite(args.escalas, args.dias, args.repeticiones, args.semilla, args.etapas)
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        print(f"💾 Resultados guardados en {args.salida}")
+    else:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.nuevo, encoding="utf-8") as f:
+            nuevo = json.load(f)
+        filas, regresiones = comparar(base, nuevo, args.umbral)
+        imprimir_comparacion(filas, args.umbral)
+        if regresiones:
+            print(f"\n❌ {len(regresiones)} regresiones por sobre {args.umbral:.0%}")
+            sys.exit(1)
+        print("\n✅ Sin regresiones")
@@ -0,0 +1,271 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+from acceso_datos import DATA_PATH, CONFIABILIDAD_PATH, escribir_parquet
+from cache_figuras import CACHE_FIGURAS
+from metricas import REGISTRO
+from data_generator import generar_dia_disponibilidad, generar_datos_confiabilidad
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+DIRECTORIO_SRC = os.path.dirname(os.path.abspath(__file__))
+
+# Todas las vistas son páginas de la misma app (app.py); se mide cada una por separado
+# ejecutando su script, que carga sus recursos y valida las versiones por sí mismo
+APPS = {
+    "principal": "paginas/principal.py",
+    "tecnico": "paginas/tecnico.py",
+    "ejecutivo": "paginas/ejecutivo.py",
+    "economico": "paginas/economico.py"
+}
+
+SESIONES = 8
+ACCIONES_POR_SESION = 10
+DIAS_DATOS = 31
+TIMEOUT_EJECUCION = 120
+PERCENTILES = [50, 90, 95, 99]
+
+# AppTest reemplaza objetos globales de Streamlit (Runtime, configuración) en cada
+# ejecución, por lo que dos ejecuciones no pueden solaparse en el mismo proceso: cada
+# sesión corre en su propio proceso y todas arrancan juntas tras una barrera. Cada
+# proceso tiene sus propios cachés, como una réplica del servidor por sesión.
+
+# Avisos esperables al usar Streamlit fuera de un servidor real
+for _logger in ("streamlit.runtime.scriptrunner.script_run_context", "streamlit.runtime.caching.cache_data_api"):
+    logging.getLogger(_logger).setLevel(logging.ERROR)
+
+# ==============================
+# DATOS DE PRUEBA
+# ==============================
+def preparar_datos(directorio, escala=1, dias=DIAS_DATOS, semilla=42):
+    """Genera un histórico reproducible de `dias` días con la flota multiplicada por `escala`.
+
+    Cada réplica de la flota es una copia con los camiones renombrados
+    (CAEX_901 → CAEX_901_R1, ...), así las distribuciones se mantienen y el
+    volumen crece linealmente. Los datos quedan en directorio/data con las
+    mismas rutas relativas que usan los dashboards.
+    """
+    random.seed(semilla)
+    np.random.seed(semilla)
+    fecha_fin = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    base = pd.concat([generar_dia_disponibilidad(fecha_fin - timedelta(days=dia)) for dia in range(dias)],
+                     ignore_index=True)
+    df = pd.concat([base] + [base.assign(flota=base["flota"] + f"_R{replica}") for replica in range(1, escala)],
+                   ignore_index=True)
+
+    os.makedirs(os.path.join(directorio, os.path.dirname(DATA_PATH)), exist_ok=True)
+    escribir_parquet(generar_datos_confiabilidad(df), os.path.join(directorio, CONFIABILIDAD_PATH))
+    escribir_parquet(df, os.path.join(directorio, DATA_PATH))
+    return len(df)
+
+# ==============================
+# MEDICIÓN
+# ==============================
+def _contadores_recursos():
+    """Pedidos y cargas de cada recurso compartido, de los contadores públicos de recursos.py"""
+    return REGISTRO.valores("flota_recursos_pedidos_total"), REGISTRO.valores("flota_recursos_cargas_total")
+
+def _uso_recursos(antes):
+    """Pedidos y cargas de cada recurso compartido desde `antes`: un pedido que no carga es un acierto"""
+    (pedidos_antes, cargas_antes), (pedidos, cargas) = antes, _contadores_recursos()
+    uso = {}
+    for etiquetas, total in pedidos.items():
+        total -= pedidos_antes.get(etiquetas, 0)
+        if total:
+            recurso = dict(etiquetas)["recurso"]
+            fallos = cargas.get(etiquetas, 0) - cargas_antes.get(etiquetas, 0)
+            previo = uso.get(recurso, (0, 0))
+            uso[recurso] = (previo[0] + total, previo[1] + fallos)
+    return uso
+
+def _tasa(aciertos, fallos):
+    total = aciertos + fallos
+    return {"aciertos": aciertos, "fallos": fallos, "tasa_aciertos": round(aciertos / total, 4) if total else 0.0}
+
+def _memoria_mb():
+    """Memoria residente máxima del proceso en MB (ru_maxrss está en KB en Linux y en bytes en macOS)"""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+def _percentiles(latencias):
+    if not latencias:
+        return {}
+    valores = np.percentile(np.array(latencias) * 1000, PERCENTILES)
+    return {f"p{p}_ms": round(float(v), 1) for p, v in zip(PERCENTILES, valores)}
+
+# ==============================
+# SESIONES
+# ==============================
+def _accion_aleatoria(at, rng):
+    """Cambia un selector al azar, como lo haría un usuario; devuelve una descripción o None si no hay selectores"""
+    selectores = [sb for sb in at.selectbox if len(sb.options) > 1] + list(at.number_input)
+    if not selectores:
+        return None
+    selector = rng.choice(selectores)
+    if hasattr(selector, "options"):
+        indice = rng.randrange(len(selector.options))
+        selector.select_index(indice)
+        return f"{selector.label}={selector.options[indice]}"
+    minimo = int(selector.min if selector.min is not None else 1)
+    maximo = int(selector.max if selector.max is not None else minimo)
+    valor = rng.randint(minimo, maximo)
+    selector.set_value(valor)
+    return f"{selector.label}={valor}"
+
+def _ejecutar(at):
+    """Ejecuta un rerun y devuelve su duración"""
+    inicio = time.perf_counter()
+    at.run()
+    return time.perf_counter() - inicio
+
+def abrir_pagina(pagina):
+    """AppTest del script de `pagina` (ruta relativa a src/), tal como lo ejecuta st.navigation en app.py"""
+    return AppTest.from_file(os.path.join(DIRECTORIO_SRC, pagina), default_timeout=TIMEOUT_EJECUCION)
+
+def simular_sesion(pagina, acciones, semilla):
+    """Una sesión: carga inicial y `acciones` cambios de selector al azar"""
+    rng = random.Random(semilla)
+    at = abrir_pagina(pagina)
+    resultado = {"inicial": _ejecutar(at), "reruns": [], "errores": []}
+    resultado["errores"].extend(str(e.value) for e in at.exception)
+
+    for _ in range(acciones):
+        if _accion_aleatoria(at, rng) is None:
+            break
+        resultado["reruns"].append(_ejecutar(at))
+        resultado["errores"].extend(str(e.value) for e in at.exception)
+    return resultado
+
+def _sesion_concurrente(pagina, acciones, semilla, barrera, cola):
+    """Proceso de una sesión: espera a las demás en `barrera`, simula la sesión y envía sus mediciones a `cola`"""
+    figuras_antes = CACHE_FIGURAS.estadisticas()
+    recursos_antes = _contadores_recursos()
+    try:
+        barrera.wait(TIMEOUT_EJECUCION)
+        inicio = time.time()
+        resultado = simular_sesion(pagina, acciones, semilla)
+        resultado["intervalo"] = (inicio, time.time())
+    except Exception as e:
+        resultado = {"inicial": None, "reruns": [], "errores": [f"{type(e).__name__}: {e}"], "intervalo": None}
+
+    figuras = CACHE_FIGURAS.estadisticas()
+    resultado["figuras"] = (figuras["aciertos"] - figuras_antes["aciertos"], figuras["fallos"] - figuras_antes["fallos"],
+                            figuras["tamano"])
+    resultado["recursos"] = _uso_recursos(recursos_antes)
+    resultado["memoria_mb"] = _memoria_mb()
+    cola.put(resultado)
+
+def _recibir(cola, acciones):
+    """Mediciones de la próxima sesión que termine, o un error si ninguna responde a tiempo"""
+    try:
+        return cola.get(timeout=TIMEOUT_EJECUCION * (acciones + 2))
+    except queue.Empty:
+        return {"inicial": None, "reruns": [], "errores": ["Sesión sin respuesta"], "intervalo": None,
+                "figuras": (0, 0, 0), "recursos": {}, "memoria_mb": 0.0}
+
+def medir_app(nombre, sesiones=SESIONES, acciones=ACCIONES_POR_SESION, semilla=42):
+    """Ejecuta `sesiones` sesiones simultáneas de una página, una por proceso, y resume latencias, memoria y cachés"""
+    contexto = multiprocessing.get_context("spawn")
+    barrera, cola = contexto.Barrier(sesiones), contexto.Queue()
+    procesos = [contexto.Process(target=_sesion_concurrente, args=(APPS[nombre], acciones, semilla + i, barrera, cola))
+                for i in range(sesiones)]
+    for proceso in procesos:
+        proceso.start()
+    resultados = [_recibir(cola, acciones) for _ in procesos]
+    for proceso in procesos:
+        proceso.join(TIMEOUT_EJECUCION)
+        if proceso.is_alive():
+            proceso.terminate()
+
+    # Las sesiones arrancan juntas: la duración va del primer inicio al último término
+    intervalos = [r["intervalo"] for r in resultados if r["intervalo"]]
+    duracion = max(fin for _, fin in intervalos) - min(inicio for inicio, _ in intervalos) if intervalos else 0.0
+    reruns = [latencia for r in resultados for latencia in r["reruns"]]
+    errores = [error for r in resultados for error in r["errores"]]
+    memoria = [r["memoria_mb"] for r in resultados]
+
+    recursos = {}
+    for r in resultados:
+        for recurso, (pedidos, cargas) in r["recursos"].items():
+            previo = recursos.get(recurso, (0, 0))
+            recursos[recurso] = (previo[0] + pedidos, previo[1] + cargas)
+    return {
+        "app": APPS[nombre],
+        "sesiones": sesiones,
+        "reruns": len(reruns),
+        "duracion_s": round(duracion, 2),
+        "carga_inicial": _percentiles([r["inicial"] for r in resultados if r["inicial"] is not None]),
+        "rerun": _percentiles(reruns),
+        "memoria_pico_mb": round(max(memoria), 1),
+        "memoria_por_sesion_mb": round(sum(memoria) / sesiones, 2),
+        "cache_figuras": {
+            **_tasa(sum(r["figuras"][0] for r in resultados), sum(r["figuras"][1] for r in resultados)),
+            "tamano": max(r["figuras"][2] for r in resultados)
+        },
+        "cache_recursos": {recurso: _tasa(pedidos - cargas, cargas) for recurso, (pedidos, cargas) in sorted(recursos.items())},
+        "errores": sorted(set(errores))[:10]
+    }
+
+def ejecutar_benchmark(apps, sesiones=SESIONES, acciones=ACCIONES_POR_SESION, escala=1,
+                       dias=DIAS_DATOS, semilla=42, directorio=None):
+    """Prepara los datos en un directorio de trabajo y mide cada app en orden"""
+    directorio = directorio or tempfile.mkdtemp(prefix="benchmark_sesiones_")
+    directorio_original = os.getcwd()
+    filas = preparar_datos(directorio, escala, dias, semilla)
+    # Los dashboards leen rutas relativas a data/: se ejecutan desde el directorio de trabajo
+    os.chdir(directorio)
+    try:
+        resultados = {nombre: medir_app(nombre, sesiones, acciones, semilla) for nombre in apps}
+    finally:
+        os.chdir(directorio_original)
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "escala": escala,
+        "dias": dias,
+        "filas": filas,
+        "acciones_por_sesion": acciones,
+        "apps": resultados
+    }
+
+def imprimir_resumen(resultado):
+    print(f"📊 {resultado['filas']} filas (escala {resultado['escala']}×, {resultado['dias']} días)")
+    for nombre, r in resultado["apps"].items():
+        print(f"\n▶️ {r['app']}: {r['sesiones']} sesiones, {r['reruns']} reruns en {r['duracion_s']} s")
+        print(f"   Carga inicial: {r['carga_inicial']}")
+        print(f"   Rerun: {r['rerun']}")
+        print(f"   Memoria: pico {r['memoria_pico_mb']} MB, {r['memoria_por_sesion_mb']} MB por sesión (proceso)")
+        print(f"   Caché de figuras: {r['cache_figuras']}")
+        print(f"   Caché de recursos: {r['cache_recursos']}")
+        if r["errores"]:
+            print(f"   ❌ Errores: {r['errores']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prueba de carga de los dashboards con sesiones headless concurrentes")
+    parser.add_argument("--apps", nargs="+", choices=list(APPS), default=list(APPS))
+    parser.add_argument("--sesiones", type=int, default=SESIONES, help="Sesiones simultáneas por app, una por proceso")
+    parser.add_argument("--acciones", type=int, default=ACCIONES_POR_SESION, help="Cambios de selector por sesión")
+    parser.add_argument("--escala", type=int, default=1, help="Multiplicador del tamaño de la flota")
+    parser.add_argument("--dias", type=int, default=DIAS_DATOS, help="Días de histórico generado")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    args = parser.parse_args()
+
+    resultado = ejecutar_benchmark(args.apps, args.sesiones, args.acciones, args.escala, args.dias, args.semilla)
+    imprimir_resumen(resultado)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados guardados en {args.salida}")
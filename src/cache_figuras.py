@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+from metricas import contar, span
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+CAPACIDAD_FIGURAS = 256
+
+# ==============================
+# CACHÉ LRU DE FIGURAS
+# ==============================
+class CacheFiguras:
+    """LRU acotado de figuras Plotly ya construidas, compartido por todas las sesiones del proceso.
+
+    La clave es (vista, filtros, versión de datos): al llegar datos nuevos cambia la
+    versión y las entradas viejas dejan de usarse hasta que el LRU las desaloja.
+    Las figuras cacheadas se comparten entre sesiones y no deben modificarse.
+    """
+
+    def __init__(self, capacidad=CAPACIDAD_FIGURAS, nombre="figura"):
+        self.capacidad = capacidad
+        self.nombre = nombre
+        self.aciertos = 0
+        self.fallos = 0
+        self._figuras = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, vista, filtros, version, construir):
+        """Devuelve la figura cacheada o la construye con construir() y la guarda"""
+        clave = (vista, tuple(filtros), version)
+        with self._lock:
+            if clave in self._figuras:
+                self._figuras.move_to_end(clave)
+                self.aciertos += 1
+                contar("flota_cache_total", cache=self.nombre, resultado="acierto")
+                return self._figuras[clave]
+            self.fallos += 1
+        contar("flota_cache_total", cache=self.nombre, resultado="fallo")
+
+        # La construcción ocurre fuera del lock para no serializar sesiones distintas
+        with span(f"{self.nombre}.{vista}"):
+            figura = construir()
+        with self._lock:
+            self._figuras[clave] = figura
+            self._figuras.move_to_end(clave)
+            while len(self._figuras) > self.capacidad:
+                self._figuras.popitem(last=False)
+        return figura
+
+    def estadisticas(self):
+        """Aciertos, fallos, tasa de aciertos y tamaño actual del caché"""
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / total if total else 0.0,
+                "tamano": len(self._figuras)
+            }
+
+    def limpiar(self):
+        with self._lock:
+            self._figuras.clear()
+
+# Instancia única del proceso: los módulos importados persisten entre reruns y sesiones
+CACHE_FIGURAS = CacheFiguras()
+
+def figura_cacheada(vista, filtros, version, construir):
+    """Atajo sobre la instancia compartida del proceso"""
+    return CACHE_FIGURAS.obtener(vista, filtros, version, construir)
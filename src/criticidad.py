@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+from acceso_datos import DATA_PATH, escribir_parquet, instantanea_datos, leer_datos, version_derivado
+from metricas import span
+from motor_sql import SQL_ESTADO, consultar, motor_disponible
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+ESTADO_CRITICIDAD_PATH = "data/estado_criticidad.parquet"
+
+CLAVES_ESTADO = ["Marca", "Modelo", "flota", "Componente"]
+COLUMNAS_ESTADO = ["Fecha"] + CLAVES_ESTADO + ["Criticidad"]
+
+# Códigos de criticidad: se aceptan las etiquetas de los generadores y las de las vistas
+CODIGOS_CRITICIDAD = {
+    "Normal": 0,
+    "Atencion": 1,
+    "Precaución": 1,
+    "Critico": 2,
+    "Crítico": 2
+}
+SIN_DATO = -1
+ETIQUETAS_CODIGO = {SIN_DATO: "Sin dato", 0: "Normal", 1: "Atención", 2: "Crítico"}
+
+# ==============================
+# ESTADO ACTUAL
+# ==============================
+def ultimo_estado(df):
+    """Último código de criticidad por Marca × Modelo × flota × Componente"""
+    df = df[COLUMNAS_ESTADO].assign(Fecha=pd.to_datetime(df["Fecha"]))
+    df["Codigo"] = df["Criticidad"].map(CODIGOS_CRITICIDAD).fillna(0).astype("int8")
+    df = df.sort_values("Fecha", kind="stable").drop_duplicates(CLAVES_ESTADO, keep="last")
+    return df.drop(columns="Criticidad").reset_index(drop=True)
+
+@span("ingesta.criticidad")
+def actualizar_estado_criticidad(df_nuevos, filas_previas, ruta=ESTADO_CRITICIDAD_PATH):
+    """Reemplaza en el estado las celdas que el lote trae con una muestra más reciente.
+
+    Solo si el estado está sellado con los registros publicados antes del lote; si no,
+    cargar_estado_criticidad lo reconstruye completo la próxima vez que se lea.
+    """
+    if version_derivado(ruta) != filas_previas:
+        return
+    estado = pd.read_parquet(ruta)
+    nuevos = ultimo_estado(df_nuevos)
+    combinado = pd.concat([estado, nuevos], ignore_index=True)
+    combinado = combinado.sort_values("Fecha", kind="stable").drop_duplicates(CLAVES_ESTADO, keep="last")
+    escribir_parquet(combinado, ruta, metadatos={"filas_datos": filas_previas + len(df_nuevos)})
+
+@span("criticidad.cargar")
+def cargar_estado_criticidad(ruta=ESTADO_CRITICIDAD_PATH, ruta_datos=DATA_PATH):
+    """Lee el estado de criticidad, reconstruyéndolo desde los datos si falta o está sellado con otra versión"""
+    archivos, filas = instantanea_datos(ruta_datos)
+    if version_derivado(ruta) == filas:
+        return pd.read_parquet(ruta)
+    if motor_disponible():
+        estado = consultar(SQL_ESTADO, archivos)
+    else:
+        estado = ultimo_estado(leer_datos(COLUMNAS_ESTADO, archivos=archivos))
+    escribir_parquet(estado, ruta, metadatos={"filas_datos": filas})
+    return estado
+
+# ==============================
+# MATRICES
+# ==============================
+@span("criticidad.indexar")
+def indexar_matrices(estado):
+    """Matriz int8 flota × Componente por (Marca, Modelo), lista para px.imshow.
+
+    Las celdas sin muestras quedan en SIN_DATO. Devuelve un diccionario
+    {(marca, modelo): (matriz, flotas, componentes)}.
+    """
+    matrices = {}
+    for (marca, modelo), grupo in estado.groupby(["Marca", "Modelo"], sort=False):
+        filas, flotas = pd.factorize(grupo["flota"], sort=True)
+        columnas, componentes = pd.factorize(grupo["Componente"], sort=True)
+        matriz = np.full((len(flotas), len(componentes)), SIN_DATO, dtype=np.int8)
+        matriz[filas, columnas] = grupo["Codigo"].to_numpy(dtype=np.int8)
+        matrices[(marca, modelo)] = (matriz, list(flotas), list(componentes))
+    return matrices
@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+from acceso_datos import DATA_PATH, escribir_parquet, instantanea_datos, leer_datos, version_derivado
+from metricas import span
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+BOCETOS_PATH = "data/bocetos_cuantiles.parquet"
+
+ELEMENTOS_BOCETO = ["Hierro (Fe) ppm", "Cobre (Cu) ppm", "Silicio (Si) ppm", "Aluminio (Al) ppm"]
+CLAVES_BOCETO = ["Dia", "Modelo", "Componente", "Elemento", "Cubeta"]
+COLUMNAS_BOCETO = ["Fecha", "Modelo", "Componente"] + ELEMENTOS_BOCETO
+
+# Boceto de cubetas logarítmicas (como DDSketch): cada valor cae en la cubeta
+# ceil(log_gamma(v)) y cualquier cuantil se recupera con error relativo <= ERROR_RELATIVO.
+# Los conteos por cubeta son aditivos, así que combinar días o lotes es sumarlos
+ERROR_RELATIVO = 0.01
+GAMMA = (1 + ERROR_RELATIVO) / (1 - ERROR_RELATIVO)
+CUBETA_CERO = np.iinfo(np.int16).min  # valores <= 0 (frecuentes en ppm)
+
+CUANTILES = {"p50": 0.50, "p95": 0.95, "p99": 0.99}
+
+# ==============================
+# CONSTRUCCIÓN
+# ==============================
+def cubetas(valores):
+    """Cubeta de cada valor (los valores <= 0 van a CUBETA_CERO)"""
+    valores = np.asarray(valores, dtype=np.float64)
+    positivos = np.where(valores > 0, valores, 1.0)
+    return np.where(valores > 0, np.ceil(np.log(positivos) / np.log(GAMMA)), CUBETA_CERO).astype(np.int16)
+
+def valor_cubeta(cubeta):
+    """Valor representativo de cada cubeta: el que minimiza el error relativo dentro de ella"""
+    cubeta = np.asarray(cubeta, dtype=np.float64)
+    return np.where(cubeta == CUBETA_CERO, 0.0, 2 * GAMMA ** cubeta / (GAMMA + 1))
+
+def agregar_bocetos(df):
+    """Conteos por día × Modelo × Componente × Elemento × cubeta de un lote de registros crudos"""
+    elementos = [c for c in ELEMENTOS_BOCETO if c in df.columns]
+    largo = df.assign(Dia=pd.to_datetime(df["Fecha"]).dt.normalize()).melt(
+        id_vars=["Dia", "Modelo", "Componente"], value_vars=elementos,
+        var_name="Elemento", value_name="Valor").dropna(subset=["Valor"])
+    largo["Cubeta"] = cubetas(largo["Valor"].to_numpy(dtype=np.float64))
+    return largo.groupby(CLAVES_BOCETO, sort=False).size().rename("Conteo").reset_index()
+
+def combinar_bocetos(*bocetos):
+    """Combina bocetos parciales sumando los conteos de cada cubeta"""
+    bocetos = [boceto for boceto in bocetos if boceto is not None and not boceto.empty]
+    if not bocetos:
+        return pd.DataFrame(columns=CLAVES_BOCETO + ["Conteo"])
+    df = pd.concat(bocetos, ignore_index=True)
+    combinado = df.groupby(CLAVES_BOCETO, sort=True)["Conteo"].sum().reset_index()
+    return combinado.astype({"Cubeta": np.int16, "Conteo": np.int64})
+
+@span("ingesta.cuantiles")
+def actualizar_bocetos(df_nuevos, filas_previas, ruta=BOCETOS_PATH):
+    """Suma un lote recién ingerido a los bocetos existentes.
+
+    Igual que el cubo, solo si los bocetos están sellados con los registros publicados
+    antes del lote; si no, cargar_bocetos los reconstruye completos la próxima vez que se lean.
+    """
+    if version_derivado(ruta) != filas_previas:
+        return
+    columnas = [c for c in COLUMNAS_BOCETO if c in df_nuevos.columns]
+    bocetos = combinar_bocetos(pd.read_parquet(ruta), agregar_bocetos(df_nuevos[columnas]))
+    escribir_parquet(bocetos, ruta, orden=CLAVES_BOCETO, metadatos={"filas_datos": filas_previas + len(df_nuevos)})
+
+@span("cuantiles.cargar")
+def cargar_bocetos(ruta=BOCETOS_PATH, ruta_datos=DATA_PATH):
+    """Lee los bocetos, reconstruyéndolos desde los datos si faltan o están sellados con otra versión"""
+    archivos, filas = instantanea_datos(ruta_datos)
+    if version_derivado(ruta) == filas:
+        return pd.read_parquet(ruta)
+    bocetos = combinar_bocetos(agregar_bocetos(leer_datos(COLUMNAS_BOCETO, archivos=archivos)))
+    escribir_parquet(bocetos, ruta, orden=CLAVES_BOCETO, metadatos={"filas_datos": filas})
+    return bocetos
+
+# ==============================
+# CONSULTAS
+# ==============================
+@span("cuantiles.indexar")
+def indexar_bocetos(bocetos, fecha_desde=None):
+    """Un boceto combinado por (Modelo, Componente, Elemento): cubetas ordenadas y conteos acumulados"""
+    if fecha_desde is not None:
+        bocetos = bocetos[bocetos["Dia"] >= pd.Timestamp(fecha_desde).normalize()]
+    totales = bocetos.groupby(["Modelo", "Componente", "Elemento", "Cubeta"], sort=True)["Conteo"].sum()
+    indice = {}
+    for clave, grupo in totales.groupby(level=["Modelo", "Componente", "Elemento"], sort=False):
+        indice[clave] = (grupo.index.get_level_values("Cubeta").to_numpy(), np.cumsum(grupo.to_numpy()))
+    return indice
+
+def cuantiles_boceto(indice, modelo, componente, elemento, cuantiles=CUANTILES):
+    """Cuantiles del elemento para el modelo y componente; costo fijo, sin leer la historia"""
+    if (modelo, componente, elemento) not in indice:
+        return dict.fromkeys(cuantiles, float("nan"))
+    cubeta, acumulado = indice[(modelo, componente, elemento)]
+    # Rango del cuantil q entre n muestras (como la interpolación 'lower' de NumPy)
+    rangos = np.floor(np.array(list(cuantiles.values())) * (acumulado[-1] - 1))
+    posiciones = np.searchsorted(acumulado, rangos, side="right")
+    return dict(zip(cuantiles, valor_cubeta(cubeta[posiciones])))
+
+def lineas_base(indice, modelo, componente, elementos=ELEMENTOS_BOCETO):
+    """Tabla de cuantiles por elemento para un modelo y componente"""
+    filas = []
+    for elemento in elementos:
+        clave = (modelo, componente, elemento)
+        muestras = int(indice[clave][1][-1]) if clave in indice else 0
+        filas.append({"Elemento": elemento, "Muestras": muestras,
+                      **cuantiles_boceto(indice, modelo, componente, elemento)})
+    return pd.DataFrame(filas)
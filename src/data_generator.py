@@ -3,10 +3,15 @@ import numpy as np
 from datetime import datetime, timedelta
 import random
 import os
+from acceso_datos import DATA_PATH, CONFIABILIDAD_PATH, anexar_lote, escribir_parquet
+from ingesta import reconstruir_indices
+from metricas import span
 
 # ==============================
 # CONFIGURACIÓN PRINCIPAL
 # ==============================
+DIAS_BOOTSTRAP = 31
+
 num_komatsu = 68
 num_caterpillar = 39
 num_registros = num_komatsu + num_caterpillar
@@ -67,91 +72,95 @@ def calcular_disponibilidad(marca, criticidad):
     disponibilidad = round((tiempo_total - tiempo_parada) / tiempo_total, 4)
     return disponibilidad, tiempo_parada
 
-def generar_datos_disponibilidad():
-    """Genera datos de disponibilidad para un período"""
-    fecha_fin = datetime.now()
-    fecha_inicio = fecha_fin - timedelta(days=30)
+@span("bootstrap.dia")
+def generar_dia_disponibilidad(fecha_base):
+    """Genera los registros de disponibilidad de un día"""
+    # Generar flotas aleatorias para este día
+    flotas = (
+        random.sample(flota_caterpillar, num_caterpillar) + 
+        random.sample(flota_komatsu, num_komatsu)
+    )
+    random.shuffle(flotas)
+    
+    # Registrar flotas con falla crítica en el día actual
+    flotas_con_falla_critica = set()
     
     datos = []
-    for dia in range(31):
-        fecha_base = fecha_inicio + timedelta(days=dia)
+    for i in range(num_registros):
+        flota = flotas[i]
+        marca = "CATERPILLAR" if 900 <= flota <= 939 else "KOMATSU"
+        modelo = random.choice(modelos_caterpillar if marca == "CATERPILLAR" else modelos_komatsu)
+        
+        # Evitar múltiples fallas críticas por flota por día
+        if flota in flotas_con_falla_critica:
+            criticidad = "Normal"
+            disponibilidad, tiempo_parada = calcular_disponibilidad(marca, "Normal")
+        else:
+            criticidad = generar_criticidad(marca)
+            disponibilidad, tiempo_parada = calcular_disponibilidad(marca, criticidad)
+            if criticidad == "Critico":
+                flotas_con_falla_critica.add(flota)
         
-        # Generar flotas aleatorias para este día
-        flotas = (
-            random.sample(flota_caterpillar, num_caterpillar) + 
-            random.sample(flota_komatsu, num_komatsu)
-        )
-        random.shuffle(flotas)
+        # Seleccionar componente y aceite lubricante
+        componente = random.choice(list(componentes_aceites.keys()))
+        aceite = componentes_aceites[componente]
         
-        # Registrar flotas con falla crítica en el día actual
-        flotas_con_falla_critica = set()
+        # Generar valores según criticidad
+        if criticidad == "Normal":
+            silicio = random.randint(0, 15)
+            hierro = random.randint(0, 100)
+            cobre = random.randint(0, 30)
+            aluminio = random.randint(0, 15)
+        elif criticidad == "Atencion":
+            silicio = random.randint(15, 25)
+            hierro = random.randint(100, 200)
+            cobre = random.randint(30, 45)
+            aluminio = random.randint(15, 25)
+        else:
+            silicio = random.randint(25, 40)
+            hierro = random.randint(200, 300)
+            cobre = random.randint(45, 60)
+            aluminio = random.randint(25, 35)
         
-        for i in range(num_registros):
-            flota = flotas[i]
-            marca = "CATERPILLAR" if 900 <= flota <= 939 else "KOMATSU"
-            modelo = random.choice(modelos_caterpillar if marca == "CATERPILLAR" else modelos_komatsu)
-            
-            # Evitar múltiples fallas críticas por flota por día
-            if flota in flotas_con_falla_critica:
-                criticidad = "Normal"
-                disponibilidad, tiempo_parada = calcular_disponibilidad(marca, "Normal")
-            else:
-                criticidad = generar_criticidad(marca)
-                disponibilidad, tiempo_parada = calcular_disponibilidad(marca, criticidad)
-                if criticidad == "Critico":
-                    flotas_con_falla_critica.add(flota)
-            
-            # Seleccionar componente y aceite lubricante
-            componente = random.choice(list(componentes_aceites.keys()))
-            aceite = componentes_aceites[componente]
-            
-            # Generar valores según criticidad
-            if criticidad == "Normal":
-                silicio = random.randint(0, 15)
-                hierro = random.randint(0, 100)
-                cobre = random.randint(0, 30)
-                aluminio = random.randint(0, 15)
-            elif criticidad == "Atencion":
-                silicio = random.randint(15, 25)
-                hierro = random.randint(100, 200)
-                cobre = random.randint(30, 45)
-                aluminio = random.randint(15, 25)
-            else:
-                silicio = random.randint(25, 40)
-                hierro = random.randint(200, 300)
-                cobre = random.randint(45, 60)
-                aluminio = random.randint(25, 35)
-            
-            # Calcular TBF y confiabilidad
-            tbf = 24 - tiempo_parada if criticidad != "Critico" else 0
-            confiabilidad = 0.0 if criticidad == "Critico" else round(((tbf - random.randint(0, 6)) / tbf) * 100 if tbf > 0 else 100.0, 1)
-            
-            datos.append({
-                'Fecha': fecha_base + timedelta(minutes=5 * i),
-                'flota': f'CAEX_{flota}',
-                'Marca': marca,
-                'Modelo': modelo,
-                'Componente': componente,
-                'Aceite Lubricante': aceite,
-                'Criticidad': criticidad,
-                'Disponibilidad': disponibilidad,
-                'Tiempo Parada': tiempo_parada,
-                'TBF': tbf,
-                'Confiabilidad': confiabilidad,
-                'Hierro (Fe) ppm': hierro,
-                'Cobre (Cu) ppm': cobre,
-                'Silicio (Si) ppm': silicio,
-                'Aluminio (Al) ppm': aluminio,
-                'Viscosidad 100°C cSt(mm2/s)': random.uniform(12, 16),
-                'Contaminación (ppm)': random.uniform(0, 100),
-                'Temperatura (°C)': random.uniform(80, 95)
-            })
+        # Calcular TBF y confiabilidad
+        tbf = 24 - tiempo_parada if criticidad != "Critico" else 0
+        confiabilidad = 0.0 if criticidad == "Critico" else round(((tbf - random.randint(0, 6)) / tbf) * 100 if tbf > 0 else 100.0, 1)
+        
+        datos.append({
+            'Fecha': fecha_base + timedelta(minutes=5 * i),
+            'flota': f'CAEX_{flota}',
+            'Marca': marca,
+            'Modelo': modelo,
+            'Componente': componente,
+            'Aceite Lubricante': aceite,
+            'Criticidad': criticidad,
+            'Disponibilidad': disponibilidad,
+            'Tiempo Parada': tiempo_parada,
+            'TBF': tbf,
+            'Confiabilidad': confiabilidad,
+            'Hierro (Fe) ppm': hierro,
+            'Cobre (Cu) ppm': cobre,
+            'Silicio (Si) ppm': silicio,
+            'Aluminio (Al) ppm': aluminio,
+            'Viscosidad 100°C cSt(mm2/s)': random.uniform(12, 16),
+            'Contaminación (ppm)': random.uniform(0, 100),
+            'Temperatura (°C)': random.uniform(80, 95)
+        })
     
     return pd.DataFrame(datos)
 
-def generar_datos_confiabilidad():
+def generar_datos_disponibilidad():
+    """Genera datos de disponibilidad para un período"""
+    fecha_fin = datetime.now()
+    fecha_inicio = fecha_fin - timedelta(days=30)
+    
+    dias = [generar_dia_disponibilidad(fecha_inicio + timedelta(days=dia)) for dia in range(31)]
+    return pd.concat(dias, ignore_index=True)
+
+def generar_datos_confiabilidad(df_disp=None):
     """Genera datos de confiabilidad para cada equipo"""
-    df_disp = generar_datos_disponibilidad()
+    if df_disp is None:
+        df_disp = generar_datos_disponibilidad()
     equipos = df_disp[['Marca', 'Modelo', 'flota']].drop_duplicates()
     
     data = []
@@ -171,17 +180,39 @@ def generar_datos_confiabilidad():
     
     return pd.DataFrame(data)
 
+# ==============================
+# ARRANQUE INICIAL
+# ==============================
+def bootstrap_datos(dias=DIAS_BOOTSTRAP):
+    """Genera los datos iniciales día a día, publicando cada partición apenas está lista.
+
+    Se genera desde el día más reciente hacia atrás, de modo que la primera
+    partición publicada ya permite mostrar el estado actual de la flota. Cada día
+    se publica como un lote propio, sin reescribir los anteriores. Como los días
+    llegan en orden inverso, las estructuras derivadas (que avanzan en el tiempo)
+    no se actualizan día a día: se reconstruyen una sola vez al final.
+    """
+    os.makedirs(os.path.dirname(DATA_PATH), exist_ok=True)
+    fecha_fin = datetime.now()
+    fecha_inicio = fecha_fin - timedelta(days=dias - 1)
+
+    particiones = []
+    for dia in reversed(range(dias)):
+        particion = generar_dia_disponibilidad(fecha_inicio + timedelta(days=dia))
+
+        # Las métricas de confiabilidad se publican antes que la primera partición
+        # para que ninguna vista encuentre los datos sin sus métricas
+        if not particiones:
+            escribir_parquet(generar_datos_confiabilidad(particion), CONFIABILIDAD_PATH)
+        anexar_lote(particion, DATA_PATH)
+        particiones.append(particion)
+
+    df_disponibilidad = pd.concat(particiones[::-1], ignore_index=True)
+    escribir_parquet(generar_datos_confiabilidad(df_disponibilidad), CONFIABILIDAD_PATH)
+    reconstruir_indices()
+    return df_disponibilidad
+
 if __name__ == "__main__":
-    # Generar datos
-    df_disponibilidad = generar_datos_disponibilidad()
-    df_confiabilidad = generar_datos_confiabilidad()
-    
-    # Crear directorio data si no existe
-    if not os.path.exists('data'):
-        os.makedirs('data')
-    
-    # Guardar datos
-    df_disponibilidad.to_parquet('data/datos_generados_Disponibilidad.parquet')
-    df_confiabilidad.to_parquet('data/metricas_confiabilidad.parquet')
+    bootstrap_datos()
     
-    print("Datos generados exitosamente") 
\ No newline at end of file
+    print("Datos generados exitosamente")
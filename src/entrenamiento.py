@@ -10,6 +10,9 @@ import joblib
 import os
 import numpy as np
 import time
+from acceso_datos import leer_datos, version_datos
+from metricas import span, exportar_metricas
+from explicaciones import puntuar_flota, PREDICCIONES_PATH
 
 # ==============================
 # CONFIGURACIÓN
@@ -20,12 +23,14 @@ FEATURES_PATH = "data/feature_names.joblib"
 METRICS_PATH = "data/metricas_modelo.csv"
 
 # Cargar datos
+@span("entrenamiento.cargar")
 def cargar_datos():
     if not os.path.exists(DATA_PATH):
         raise FileNotFoundError(f"No se encontró el archivo {DATA_PATH}")
-    return pd.read_parquet(DATA_PATH)
+    return leer_datos(ruta=DATA_PATH)
 
 # Preprocesamiento
+@span("entrenamiento.preprocesar")
 def preprocesar_datos(df):
     # Eliminar columnas irrelevantes
     columnas_a_eliminar = [
@@ -55,11 +60,12 @@ def preprocesar_datos(df):
 def debe_reentrenar():
     if not os.path.exists(MODEL_PATH) or not os.path.exists(DATA_PATH):
         return True
-    data_mtime = os.path.getmtime(DATA_PATH)
+    data_mtime = version_datos(DATA_PATH)
     model_mtime = os.path.getmtime(MODEL_PATH)
     return data_mtime > model_mtime
 
 # Entrenar modelo
+@span("entrenamiento.total")
 def entrenar_modelo():
     try:
         df = cargar_datos()
@@ -111,7 +117,8 @@ def entrenar_modelo():
     }
 
     rs = RandomizedSearchCV(model, param_dist, n_iter=30, cv=5, scoring='f1_weighted', n_jobs=-1, verbose=0)
-    rs.fit(X_train, y_train)
+    with span("entrenamiento.busqueda"):
+        rs.fit(X_train, y_train)
 
     # Mejor modelo
     best_model = rs.best_estimator_
@@ -137,11 +144,16 @@ def entrenar_modelo():
     print(feat_importance)
 
     # Guardar modelo y nombres de características
-    joblib.dump(best_model, MODEL_PATH)
-    joblib.dump(feature_names, FEATURES_PATH)
+    with span("entrenamiento.guardar"):
+        joblib.dump(best_model, MODEL_PATH)
+        joblib.dump(feature_names, FEATURES_PATH)
     print(f"💾 Modelo guardado en {MODEL_PATH}")
     print(f"💾 Nombres de características guardados en {FEATURES_PATH}")
 
+    # Puntuar la flota con el nuevo modelo y guardar los factores de cada predicción
+    predicciones = puntuar_flota(best_model, ruta_datos=DATA_PATH)
+    print(f"🤖 {len(predicciones)} predicciones explicadas guardadas en {PREDICCIONES_PATH}")
+
     # Guardar métricas
     metricas = {
         "mejor_params": rs.best_params_,
@@ -163,15 +175,15 @@ def guardar_metricas(metricas):
         metricas_df = pd.concat([metricas_previas, metricas_df], ignore_index=True)
     metricas_df.to_csv(METRICS_PATH, index=False)
 
+# El reentrenamiento periódico lo coordina planificador.py después de cada ingesta;
+# ejecutado solo, este script entrena una vez si hay datos nuevos
 if __name__ == "__main__":
-    while True:
-        print("\n🔄 Iniciando proceso de entrenamiento...")
-        if debe_reentrenar():
-            start = time.time()
-            entrenar_modelo()
-            end = time.time()
-            print(f"⏱️ Entrenamiento completado en {round(end - start, 2)} segundos")
-        else:
-            print("ℹ️ No hay nuevos datos. Saltando reentrenamiento.")
-        print("⏳ Esperando 2 horas antes del próximo ciclo...\n")
-        time.sleep(7200)  # Ahora sí funciona ✅
\ No newline at end of file
+    print("\n🔄 Iniciando proceso de entrenamiento...")
+    if debe_reentrenar():
+        start = time.time()
+        entrenar_modelo()
+        exportar_metricas("entrenamiento")
+        end = time.time()
+        print(f"⏱️ Entrenamiento completado en {round(end - start, 2)} segundos")
+    else:
+        print("ℹ️ No hay nuevos datos. Saltando reentrenamiento.")
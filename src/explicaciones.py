@@ -0,0 +1,150 @@
+import argparse
+import os
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from acceso_datos import DATA_PATH, escribir_parquet, leer_datos, version_datos
+from metricas import exportar_metricas, span
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+MODEL_PATH = "data/modelo_entrenado.joblib"
+PREDICCIONES_PATH = "data/predicciones.parquet"
+
+CLAVES_PREDICCION = ["Marca", "Modelo", "flota", "Componente"]
+
+# Factores que se guardan por predicción: los que más empujan hacia la clase predicha
+TOP_FACTORES = 3
+
+# ==============================
+# CONTRIBUCIONES
+# ==============================
+def _grupos_caracteristicas(preprocesador):
+    """Columna original de cada característica transformada (las columnas one-hot vuelven a su variable)"""
+    originales = []
+    for _, transformador, columnas in preprocesador.transformers_:
+        if transformador == "drop" or len(columnas) == 0:
+            continue
+        if hasattr(transformador, "categories_"):
+            for columna, categorias in zip(columnas, transformador.categories_):
+                originales.extend([columna] * len(categorias))
+        else:
+            originales.extend(columnas)
+    nombres = list(dict.fromkeys(originales))
+    return nombres, np.array([nombres.index(columna) for columna in originales])
+
+def _aportes_arbol(arbol, X, grupos, n_grupos):
+    """Aporte de cada variable a las probabilidades de un árbol, recorriendo los caminos de decisión.
+
+    Cada paso padre -> hijo cambia la distribución de clases del nodo; ese cambio se
+    atribuye a la variable con que divide el padre. Con la matriz dispersa de caminos
+    (muestras × nodos) la suma por muestra es un producto de matrices.
+    """
+    estructura = arbol.tree_
+    valores = estructura.value[:, 0, :]
+    valores = valores / valores.sum(axis=1, keepdims=True)
+    n_nodos, n_clases = valores.shape
+
+    internos = np.flatnonzero(estructura.children_left >= 0)
+    hijos = np.concatenate([estructura.children_left[internos], estructura.children_right[internos]])
+    padres = np.concatenate([internos, internos])
+    cambio = valores[hijos] - valores[padres]
+    columna = grupos[estructura.feature[padres]]
+
+    atribucion = sparse.csr_matrix(
+        (cambio.ravel(), (np.repeat(hijos, n_clases), (columna[:, None] * n_clases + np.arange(n_clases)).ravel())),
+        shape=(n_nodos, n_grupos * n_clases))
+    caminos = arbol.decision_path(X)
+    aportes = (caminos @ atribucion).toarray().reshape(caminos.shape[0], n_grupos, n_clases)
+    return valores[0], aportes
+
+@span("explicaciones.contribuciones")
+def contribuciones(pipeline, X):
+    """Descomposición de predict_proba del RandomForest: base + suma de aportes por variable.
+
+    Devuelve (base, aportes, nombres), con aportes de forma muestras × variables × clases.
+    Para cada muestra, base + aportes.sum(axis=1) reproduce predict_proba.
+    """
+    preprocesador = pipeline.named_steps["preprocessor"]
+    bosque = pipeline.named_steps["classifier"]
+    nombres, grupos = _grupos_caracteristicas(preprocesador)
+    Xt = preprocesador.transform(X)
+    Xt = Xt.astype(np.float32) if not sparse.issparse(Xt) else Xt.astype(np.float32).tocsr()
+
+    base = np.zeros(len(bosque.classes_))
+    aportes = np.zeros((Xt.shape[0], len(nombres), len(bosque.classes_)))
+    for arbol in bosque.estimators_:
+        base_arbol, aportes_arbol = _aportes_arbol(arbol, Xt, grupos, len(nombres))
+        base += base_arbol
+        aportes += aportes_arbol
+    return base / len(bosque.estimators_), aportes / len(bosque.estimators_), nombres
+
+# ==============================
+# PUNTUACIÓN DE LA FLOTA
+# ==============================
+def ultimas_muestras(df):
+    """Última muestra de cada flota × Componente, que es la que se puntúa"""
+    ultimas = df.sort_values("Fecha", kind="stable").drop_duplicates(["flota", "Componente"], keep="last")
+    return ultimas.sort_values(["flota", "Componente"]).reset_index(drop=True)
+
+def principales_factores(aportes, prediccion, nombres, X, top=TOP_FACTORES):
+    """Las `top` variables que más empujan cada muestra hacia su clase predicha, con su aporte y valor"""
+    hacia_prediccion = aportes[np.arange(len(aportes)), :, prediccion]
+    top = min(top, hacia_prediccion.shape[1])
+    orden = np.argsort(-hacia_prediccion, axis=1, kind="stable")[:, :top]
+    filas = np.arange(len(aportes))[:, None]
+    valores = X[nombres].astype(object).to_numpy()
+    columnas = {}
+    for i in range(top):
+        columnas[f"Factor {i + 1}"] = np.array(nombres, dtype=object)[orden[:, i]]
+        columnas[f"Aporte {i + 1}"] = hacia_prediccion[filas[:, 0], orden[:, i]].round(4)
+        columnas[f"Valor {i + 1}"] = [str(valor) for valor in valores[filas[:, 0], orden[:, i]]]
+    return pd.DataFrame(columnas)
+
+@span("explicaciones.puntuar")
+def puntuar_flota(pipeline, ruta_datos=DATA_PATH, ruta=PREDICCIONES_PATH, top=TOP_FACTORES):
+    """Predice la criticidad de la última muestra de toda la flota y guarda, junto a cada
+    predicción, los factores que más la explican. Las vistas solo leen este archivo."""
+    columnas = CLAVES_PREDICCION + ["Fecha"] + list(pipeline.feature_names_in_)
+    ultimas = ultimas_muestras(leer_datos(list(dict.fromkeys(columnas)), ruta=ruta_datos))
+    X = ultimas[pipeline.feature_names_in_]
+
+    base, aportes, nombres = contribuciones(pipeline, X)
+    probabilidades = base + aportes.sum(axis=1)
+    prediccion = np.argmax(probabilidades, axis=1)
+    clases = [str(clase) for clase in pipeline.named_steps["classifier"].classes_]
+
+    predicciones = pd.concat([
+        ultimas[CLAVES_PREDICCION + ["Fecha"]],
+        pd.DataFrame({"Prediccion": np.array(clases, dtype=object)[prediccion]}),
+        pd.DataFrame(probabilidades.round(4), columns=[f"Prob {clase}" for clase in clases]),
+        principales_factores(aportes, prediccion, nombres, X, top)
+    ], axis=1)
+    escribir_parquet(predicciones, ruta, orden=["flota", "Componente"])
+    return predicciones
+
+@span("explicaciones.cargar")
+def cargar_predicciones(ruta=PREDICCIONES_PATH, ruta_datos=DATA_PATH, ruta_modelo=MODEL_PATH, pipeline=None):
+    """Lee las predicciones explicadas, volviendo a puntuar si son más viejas que los datos o el modelo"""
+    vigencia = max(version_datos(ruta_datos), os.path.getmtime(ruta_modelo))
+    if os.path.exists(ruta) and os.path.getmtime(ruta) >= vigencia:
+        return pd.read_parquet(ruta)
+    return puntuar_flota(pipeline if pipeline is not None else joblib.load(ruta_modelo), ruta_datos, ruta)
+
+# ==============================
+# LÍNEA DE COMANDOS
+# ==============================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Puntúa la flota con el modelo entrenado y explica cada predicción")
+    parser.add_argument("--top", type=int, default=TOP_FACTORES, help="Factores a guardar por predicción")
+    args = parser.parse_args()
+
+    inicio = time.time()
+    predicciones = puntuar_flota(joblib.load(MODEL_PATH), top=args.top)
+    print(f"🤖 {len(predicciones)} predicciones explicadas en {round(time.time() - inicio, 2)} segundos")
+    print(predicciones["Prediccion"].value_counts().to_string())
+    print(f"💾 Predicciones guardadas en {PREDICCIONES_PATH}")
+    exportar_metricas("explicaciones")
@@ -3,7 +3,10 @@ import numpy as np
 from datetime import datetime, timedelta
 import random
 import os
-import time
+from acceso_datos import DATA_PATH, CONFIABILIDAD_PATH, enlazar_flota, fecha_maxima, leer_catalogo
+from almacen import TABLA_METRICAS, exportar, ultimo_numero_registro
+from ingesta import ingerir_lote
+from metricas import span, exportar_metricas
 
 # ==============================
 # CONFIGURACIÓN PRINCIPAL
@@ -48,6 +51,9 @@ componentes_aceites = {
     "DIFERENCIAL TRA": "MOBIL MOBILTRANS HD 30"
 }
 
+# Primer día del histórico cuando aún no hay datos publicados
+FECHA_INICIO = datetime(2025, 4, 1)
+
 # Tipos de muestreo
 cambioLubricanate = ["Muestreo", "Cambio Aceite"]
 
@@ -70,13 +76,17 @@ def cargar_estado():
                 NUM_REGISTRO = int(lineas[1].strip())
     except FileNotFoundError:
         pass
+    # Sin archivo de estado se continúa desde el almacén: reiniciar la numeración haría
+    # que muestras nuevas choquen con la clave de muestras ya guardadas y se descarten
+    ultimo = ultimo_numero_registro()
+    NUM_MUESTRA_DIGITOS = max(NUM_MUESTRA_DIGITOS, ultimo)
+    NUM_REGISTRO = max(NUM_REGISTRO, ultimo)
 
 def guardar_estado():
     """Guarda el estado actual de números de muestra y registro en un archivo"""
     os.makedirs("data", exist_ok=True)
     with open("data/estado_generador.txt", "w") as f:
-        #f.write(f"{NUM_MUESTRA_DIGITOS}\n{NUM_REGISTRO}\n")
-        f.write(f"{NUM_MUESTRA_DIGITOS}{NUM_REGISTRO}\n")
+        f.write(f"{NUM_MUESTRA_DIGITOS}\n{NUM_REGISTRO}\n")
 
 def generar_criticidad(marca):
     """Genera criticidad basada en probabilidades ajustadas por marca"""
@@ -127,12 +137,16 @@ def calcular_confiabilidad(df):
 # ==============================
 # GENERACIÓN DE DATOS
 # ==============================
+@span("generador.historicos")
 def generar_datos_historicos(fecha_inicio, fecha_fin):
     """Genera datos históricos entre las fechas especificadas"""
     global NUM_MUESTRA_DIGITOS, NUM_REGISTRO
     cargar_estado()
     datos_totales = []
     delta_dias = (fecha_fin - fecha_inicio).days + 1
+    # Identificadores de flota ya publicados: se leen una vez por corrida, no por día
+    catalogo = leer_catalogo() if os.path.exists(DATA_PATH) else None
+    flotas_caterpillar = set(flota_caterpillar)
     
     for dia in range(delta_dias):
         fecha_base = fecha_inicio + timedelta(days=dia)
@@ -208,7 +222,7 @@ def generar_datos_historicos(fecha_inicio, fecha_fin):
         # Generar datos para cada registro
         for i in range(num_registros):
             flota = flotas[i]
-            marca = "CATERPILLAR" if 900 <= flota <= 939 else "KOMATSU"
+            marca = "CATERPILLAR" if flota in flotas_caterpillar else "KOMATSU"
             modelo = random.choice(modelos_caterpillar if marca == "CATERPILLAR" else modelos_komatsu)
             
             # Evitar múltiples fallas críticas por flota por día
@@ -319,19 +333,24 @@ def generar_datos_historicos(fecha_inicio, fecha_fin):
         # Crear el DataFrame una sola vez por día
         df_dia = pd.DataFrame(datos)
         datos_totales.append(df_dia)
-        guardar_datos(df_dia, fecha_dia=fecha_base.date())
-    
+        guardar_datos(df_dia, fecha_dia=fecha_base.date(), catalogo=catalogo)
+
+    # Las métricas diarias son pocas filas: se republican completas desde el almacén una
+    # vez por corrida, no después de cada día
+    exportar(TABLA_METRICAS, "parquet", CONFIABILIDAD_PATH)
+
     df = pd.concat(datos_totales, ignore_index=True)
     metricas = calcular_confiabilidad(df)
     guardar_estado()
+    exportar_metricas("generador")
     return df, metricas
 
 # ==============================
 # GUARDADO DE DATOS
 # ==============================
-def guardar_datos(df_nuevos, fecha_dia, archivo="data/datos_generados_Disponibilidad.csv"):
-    os.makedirs(os.path.dirname(archivo), exist_ok=True)
-
+@span("generador.guardar")
+def guardar_datos(df_nuevos, fecha_dia, archivo=DATA_PATH, catalogo=None):
+    """Guarda un lote en el almacén transaccional y lo publica como un lote más del Parquet que leen las vistas"""
     # Definir tipos explícitos para evitar errores
     tipos_de_columnas = {
         "Numero Registro": str,
@@ -339,28 +358,24 @@ def guardar_datos(df_nuevos, fecha_dia, archivo="data/datos_generados_Disponibil
         "Numero Serie Equipo": str,
     }
 
-    # Guardar datos principales
-    try:
-        df_existente = pd.read_csv(archivo)
-        df_final = pd.concat([df_existente, df_nuevos], ignore_index=True)
-    except FileNotFoundError:
-        df_final = df_nuevos
-
-    # Convertir columnas específicas a string
+    df_nuevos = df_nuevos.copy()
     for col, dtype in tipos_de_columnas.items():
-        if col in df_final.columns:
-            df_final[col] = df_final[col].astype(dtype)
+        if col in df_nuevos.columns:
+            df_nuevos[col] = df_nuevos[col].astype(dtype)
 
-    # Guardar en CSV
-    df_final.to_csv(archivo, index=False)
+    # Fecha se almacena como datetime para que el Parquet quede indexable por rango
+    df_nuevos["Fecha"] = pd.to_datetime(df_nuevos["Fecha"])
 
-    # Opcional: Guardar en Parquet
-    archivo_parquet = archivo.replace(".csv", ".parquet")
-    df_final.to_parquet(archivo_parquet, engine='pyarrow', index=False)
+    # Si el histórico lo creó el arranque de las vistas las unidades son 'CAEX_905':
+    # se usa el mismo identificador para no mezclar tipos en la columna flota
+    if catalogo is None and os.path.exists(archivo):
+        catalogo = leer_catalogo(archivo)
+    if catalogo is not None:
+        df_nuevos["flota"] = enlazar_flota(df_nuevos["flota"].astype(str), catalogo).to_numpy()
 
     # Calcular métricas usando solo datos del día actual
     metricas_hoy = calcular_confiabilidad(df_nuevos)
-    metricas_diarias = {
+    df_metricas = pd.DataFrame({
         "Fecha": [str(fecha_dia)],
         "Fallas Totales": [int(metricas_hoy["Total Fallas"])],
         "Camiones Disponibles": [int(metricas_hoy["Camiones Disponibles"])],
@@ -369,56 +384,43 @@ def guardar_datos(df_nuevos, fecha_dia, archivo="data/datos_generados_Disponibil
         "TBF Total (horas)": [int(metricas_hoy["TBF Total (horas)"])],
         "MTBF (horas)": [float(metricas_hoy["MTBF (horas)"])],
         "Confiabilidad (%)": [float(metricas_hoy["Confiabilidad (%)"])]
-    }
+    })
 
-    df_metricas = pd.DataFrame(metricas_diarias)
-    try:
-        df_metricas_ant = pd.read_csv("data/metricas_confiabilidad.csv")
-        df_metricas_ant = df_metricas_ant.astype(str)
-        df_metricas = pd.concat([df_metricas_ant, df_metricas], ignore_index=True)
-    except FileNotFoundError:
-        pass
+    # Registros y métricas del día se confirman en una sola transacción; los registros
+    # ya guardados se descartan, así que reintentar un lote no duplica el histórico
+    if ingerir_lote(df_nuevos, df_metricas, archivo).empty:
+        print(f"⏭️ Lote del {fecha_dia} ya estaba guardado")
 
-    df_metricas = df_metricas.drop_duplicates()
-    df_metricas.to_csv("data/metricas_confiabilidad.csv", index=False)
+def generar_pendientes(hasta=None, archivo=DATA_PATH):
+    """Genera los días que faltan entre el último publicado (o FECHA_INICIO) y `hasta` (hoy).
+
+    Devuelve la cantidad de días generados; si el histórico ya está al día no hace nada.
+    """
+    hasta = (hasta or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    if os.path.exists(archivo):
+        desde = fecha_maxima(archivo).normalize().to_pydatetime() + timedelta(days=1)
+    else:
+        desde = FECHA_INICIO
+    if desde > hasta:
+        return 0
+    generar_datos_historicos(desde, hasta)
+    return (hasta - desde).days + 1
 
-    # Guardar métricas en parquet también (opcional)
-    archivo_metricas_parquet = "data/metricas_confiabilidad.parquet"
-    df_metricas.astype({
-        "Fallas Totales": "int64",
-        "Camiones Disponibles": "int64",
-        "MTTR (horas)": "float64",
-        "Tasa Fallas": "float64",
-        "TBF Total (horas)": "int64",
-        "MTBF (horas)": "float64",
-        "Confiabilidad (%)": "float64"
-    }).to_parquet(archivo_metricas_parquet, engine='pyarrow', index=False)
 # ==============================
-# BUCLE PRINCIPAL
+# EJECUCIÓN
 # ==============================
+# La generación periódica la coordina planificador.py junto con el resto del pipeline;
+# ejecutado solo, este script completa el histórico hasta hoy y termina
 if __name__ == "__main__":
-    # Generar datos históricos desde 2025-01-01 hasta hoy
-    fecha_inicio = datetime(2025, 4, 1)
-    fecha_fin = datetime.now()
-    
-    print(f"Generando datos históricos desde {fecha_inicio.date()} hasta {fecha_fin.date()}...")
-    
+    print(f"Generando datos pendientes hasta {datetime.now().date()}...")
+
     try:
-        df_historicos, metricas_nuevas = generar_datos_historicos(fecha_inicio, fecha_fin)
-        guardar_datos(df_historicos, metricas_nuevas)
-        print("Datos históricos generados y guardados.")
-        
-        # Bucle diario (opcional)
-        while True:
-            print("Generando nuevos registros diarios...")
-            fecha_inicio = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            fecha_fin = fecha_inicio + timedelta(days=1)
-            df_diarios, metricas_diarias = generar_datos_historicos(fecha_inicio, fecha_fin)
-            guardar_datos(df_diarios, metricas_diarias)
-            print("Datos diarios guardados. Esperando 24 horas...")
-            time.sleep(86400)
-            
+        dias = generar_pendientes()
+        if dias:
+            print(f"Datos de {dias} días generados y guardados.")
+        else:
+            print("ℹ️ El histórico ya está al día.")
     except KeyboardInterrupt:
         print("\nGeneración de datos interrumpida por el usuario.")
     except Exception as e:
-        print(f"\nError en la generación de datos: {str(e)}")
\ No newline at end of file
+        print(f"\nError en la generación de datos: {str(e)}")
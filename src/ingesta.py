@@ -0,0 +1,113 @@
+import argparse
+import os
+import time
+import pandas as pd
+from acceso_datos import (DATA_PATH, anexar_lote, archivos_datos, compactar_datos, consolidar, esquema_datos,
+                          filas_datos)
+from almacen import contar_registros, importar_parquet, insertar_lote, leer_tabla
+from rollups import actualizar_cubo, cargar_cubo
+from criticidad import actualizar_estado_criticidad, cargar_estado_criticidad
+from alertas_activas import actualizar_indice_alertas, cargar_indice_alertas
+from series_tiempo import actualizar_series, cargar_series
+from anomalias import actualizar_anomalias, cargar_anomalias
+from cuantiles import actualizar_bocetos, cargar_bocetos
+from metricas import span
+
+# ==============================
+# INGESTA
+# ==============================
+def ingerir_lote(df_registros, df_metricas=None, archivo=DATA_PATH):
+    """Guarda un lote en el almacén y publica lo nuevo para las vistas.
+
+    Es el camino de todas las entradas (generador, informes de laboratorio): primero se
+    adopta lo ya publicado, así el almacén nunca queda con menos historia que el Parquet.
+    Devuelve los registros insertados.
+    """
+    previos = adoptar_publicado(archivo)
+    nuevos = insertar_lote(df_registros, df_metricas)
+    publicar_lote(nuevos, previos, archivo)
+    return nuevos
+
+@span("ingesta.adoptar")
+def adoptar_publicado(archivo=DATA_PATH):
+    """Migra al almacén los registros publicados que aún no tiene y devuelve cuántos registros guarda.
+
+    El arranque de las vistas publica el histórico inicial sin pasar por el almacén. Si
+    tras migrarlo el almacén sigue con menos registros, lo que sobra en la publicación
+    son repeticiones de una clave natural y se republica desde el almacén.
+    """
+    registros = contar_registros()
+    if not os.path.exists(archivo):
+        return registros
+    publicadas = filas_datos(archivo)
+    if registros < publicadas:
+        importar_parquet(archivo)
+        registros = contar_registros()
+        if registros < publicadas:
+            consolidar(leer_tabla(), archivo)
+    return registros
+
+# ==============================
+# PUBLICACIÓN
+# ==============================
+@span("ingesta.publicar")
+def publicar_lote(df_nuevos, previos, archivo=DATA_PATH):
+    """Publica para las vistas los registros recién insertados en el almacén.
+
+    `previos` es la cantidad de registros del almacén antes del lote: si la publicación
+    la refleja, el lote se agrega como un archivo propio y se propaga a los índices. Si
+    no (un lote anterior quedó sin publicar) se republica completa desde el almacén, pero
+    nunca con menos registros que los ya publicados. Devuelve False si no había nada nuevo.
+    """
+    publicadas = filas_datos(archivo) if os.path.exists(archivo) else 0
+    if publicadas == previos:
+        if df_nuevos.empty:
+            return False
+        # Un lote parcial (p. ej. un informe de laboratorio) llega sin las columnas operacionales
+        columnas = pd.Index(esquema_datos(archivos_datos(archivo)).names if publicadas else [])
+        anexar_lote(df_nuevos, archivo)
+        actualizar_indices(df_nuevos.reindex(columns=columnas.union(df_nuevos.columns, sort=False)), publicadas)
+        return True
+
+    registros = contar_registros()
+    if registros < publicadas:
+        raise RuntimeError(f"El almacén tiene {registros} registros y la publicación {publicadas}: "
+                           "no se republica para no perder historia (ver adoptar_publicado)")
+    # Las estructuras derivadas quedan de otra versión y se reconstruyen al leerse
+    consolidar(leer_tabla(), archivo)
+    return True
+
+# ==============================
+# ÍNDICES DERIVADOS
+# ==============================
+@span("ingesta.indices")
+def actualizar_indices(df_nuevos, filas_previas):
+    """Propaga un lote recién guardado a las estructuras derivadas que leen los dashboards.
+
+    `filas_previas` son los registros publicados antes del lote: cada estructura solo se
+    actualiza si está sellada con esa versión de los datos.
+    """
+    actualizar_cubo(df_nuevos, filas_previas)
+    actualizar_estado_criticidad(df_nuevos, filas_previas)
+    actualizar_indice_alertas(df_nuevos, filas_previas)
+    actualizar_series(df_nuevos, filas_previas)
+    actualizar_anomalias(df_nuevos, filas_previas)
+    actualizar_bocetos(df_nuevos, filas_previas)
+
+@span("ingesta.reconstruir")
+def reconstruir_indices(ruta_datos=DATA_PATH):
+    """Reconstruye desde los datos las estructuras derivadas que no estén al día con ellos"""
+    for cargar in (cargar_cubo, cargar_estado_criticidad, cargar_indice_alertas, cargar_series,
+                   cargar_anomalias, cargar_bocetos):
+        cargar(ruta_datos=ruta_datos)
+
+# ==============================
+# LÍNEA DE COMANDOS
+# ==============================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consolida en el Parquet base los lotes publicados uno a uno")
+    parser.parse_args()
+
+    inicio = time.time()
+    lotes = compactar_datos()
+    print(f"🗜️ {lotes} lotes consolidados en {DATA_PATH} en {round(time.time() - inicio, 2)} segundos")
@@ -0,0 +1,298 @@
+import argparse
+import os
+import re
+import time
+import unicodedata
+import numpy as np
+import pandas as pd
+from acceso_datos import DATA_PATH, enlazar_flota, leer_catalogo
+from ingesta import ingerir_lote
+from metricas import contar, exportar_metricas, span
+
+try:
+    import openpyxl
+except ImportError:  # solo se necesita para importar planillas Excel
+    openpyxl = None
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+# Filas por bloque: el archivo se procesa de a bloques, así que la memoria no depende de su tamaño
+FILAS_POR_BLOQUE = 50_000
+
+# Sin estas columnas un registro no puede ubicarse en la flota y se descarta
+COLUMNAS_OBLIGATORIAS = ["Fecha", "flota", "Componente"]
+
+COLUMNAS_TEXTO = ["Marca", "Modelo", "flota", "Componente", "Criticidad", "Aceite Lubricante",
+                  "Numero Muestra", "Numero Registro", "Numero Serie Equipo", "Código ISO 4406",
+                  "cambioLubricanate"]
+
+COLUMNAS_NUMERICAS = [
+    "Contenido de agua %", "Punto de inflamacion °C", "Glicol %", "Nitracion A/cm", "Oxidación A/cm",
+    "Hollín %", "Sulfatacion A/cm", "Diesel %", "N de part >4µm", "N° de part >6µm", "N° de part>14µm",
+    "Viscosidad 100°C cSt(mm2/s)", "Viscosidad 40°C cSt(mm2/s)", "TAN mg KOH/g", "TBN mg KOH/g",
+    "Residuo Ferroso Total mg/kg"
+]
+
+# Elementos por espectrometría: símbolo -> (nombre en español, nombre en inglés)
+ELEMENTOS = {
+    "Ag": ("Plata", "Silver"), "Al": ("Aluminio", "Aluminum"), "Ba": ("Bario", "Barium"),
+    "B": ("Boro", "Boron"), "Ca": ("Calcio", "Calcium"), "Cr": ("Cromo", "Chromium"),
+    "Cu": ("Cobre", "Copper"), "K": ("Potasio", "Potassium"), "Mg": ("Magnesio", "Magnesium"),
+    "Mo": ("Molibdeno", "Molybdenum"), "Na": ("Sodio", "Sodium"), "Ni": ("Níquel", "Nickel"),
+    "Pb": ("Plomo", "Lead"), "P": ("Fósforo", "Phosphorus"), "Si": ("Silicio", "Silicon"),
+    "Sn": ("Estaño", "Tin"), "Ti": ("Titanio", "Titanium"), "V": ("Vanadio", "Vanadium"),
+    "Zn": ("Zinc", "Zinc"), "Fe": ("Hierro", "Iron")
+}
+COLUMNAS_ELEMENTOS = [f"{nombre} ({simbolo}) ppm" for simbolo, (nombre, _) in ELEMENTOS.items()]
+
+# El código ISO 4406 "19/17/14" se guarda además separado en sus tres rangos de tamaño
+COLUMNAS_ISO = ["ISO 4406 >4µm", "ISO 4406 >6µm", "ISO 4406 >14µm"]
+PATRON_ISO = r"^\s*(?:(\d+|-)\s*/\s*)?(\d+|-)\s*/\s*(\d+|-)\s*$"
+
+# Conversiones de unidad: se aplican cuando el encabezado indica una unidad distinta a la del almacén
+def _ppm_a_porcentaje(serie):
+    return serie / 10_000
+
+def _fahrenheit_a_celsius(serie):
+    return (serie - 32) * 5 / 9
+
+# Encabezados conocidos de los informes de laboratorio -> (columna del almacén, conversión de unidad o None).
+# Se comparan normalizados (ver _normalizar_encabezado), así que mayúsculas, tildes y símbolos no importan
+ALIAS_COLUMNAS = {
+    "Fecha muestreo": ("Fecha", None), "Fecha de muestreo": ("Fecha", None), "Fecha muestra": ("Fecha", None),
+    "Sample date": ("Fecha", None), "Date sampled": ("Fecha", None),
+    "Equipo": ("flota", None), "Unidad": ("flota", None), "Camión": ("flota", None), "Unit": ("flota", None),
+    "Unit ID": ("flota", None), "Equipment": ("flota", None),
+    "Fabricante": ("Marca", None), "Make": ("Marca", None), "Manufacturer": ("Marca", None),
+    "Model": ("Modelo", None),
+    "Compartimiento": ("Componente", None), "Component": ("Componente", None),
+    "Compartment": ("Componente", None),
+    "Estado": ("Criticidad", None), "Condición": ("Criticidad", None), "Diagnóstico": ("Criticidad", None),
+    "Status": ("Criticidad", None), "Severity": ("Criticidad", None),
+    "Lubricante": ("Aceite Lubricante", None), "Aceite": ("Aceite Lubricante", None),
+    "Oil": ("Aceite Lubricante", None), "Lubricant": ("Aceite Lubricante", None),
+    "N° Muestra": ("Numero Muestra", None), "Número de muestra": ("Numero Muestra", None),
+    "Sample number": ("Numero Muestra", None), "Sample No": ("Numero Muestra", None),
+    "Sample ID": ("Numero Muestra", None),
+    "N° Registro": ("Numero Registro", None), "Lab number": ("Numero Registro", None),
+    "Lab No": ("Numero Registro", None),
+    "Serie": ("Numero Serie Equipo", None), "Número de serie": ("Numero Serie Equipo", None),
+    "Serial number": ("Numero Serie Equipo", None),
+    "ISO 4406": ("Código ISO 4406", None), "Código ISO": ("Código ISO 4406", None),
+    "ISO code": ("Código ISO 4406", None), "ISO": ("Código ISO 4406", None),
+    "Agua %": ("Contenido de agua %", None), "Water %": ("Contenido de agua %", None),
+    "Agua": ("Contenido de agua %", None), "Water": ("Contenido de agua %", None),
+    "Agua ppm": ("Contenido de agua %", _ppm_a_porcentaje),
+    "Water ppm": ("Contenido de agua %", _ppm_a_porcentaje),
+    "Water KF ppm": ("Contenido de agua %", _ppm_a_porcentaje),
+    "Punto de inflamación": ("Punto de inflamacion °C", None), "Flash point": ("Punto de inflamacion °C", None),
+    "Flash point °C": ("Punto de inflamacion °C", None),
+    "Punto de inflamación °F": ("Punto de inflamacion °C", _fahrenheit_a_celsius),
+    "Flash point °F": ("Punto de inflamacion °C", _fahrenheit_a_celsius),
+    "Glycol %": ("Glicol %", None), "Nitration": ("Nitracion A/cm", None),
+    "Oxidation": ("Oxidación A/cm", None), "Soot %": ("Hollín %", None), "Sulfation": ("Sulfatacion A/cm", None),
+    "Fuel %": ("Diesel %", None), "Fuel dilution": ("Diesel %", None),
+    "Dilución por combustible": ("Diesel %", None),
+    ">4µm": ("N de part >4µm", None), ">6µm": ("N° de part >6µm", None), ">14µm": ("N° de part>14µm", None),
+    "V40": ("Viscosidad 40°C cSt(mm2/s)", None), "Visc 40°C": ("Viscosidad 40°C cSt(mm2/s)", None),
+    "Viscosity 40°C": ("Viscosidad 40°C cSt(mm2/s)", None), "Viscosity @40°C cSt": ("Viscosidad 40°C cSt(mm2/s)", None),
+    "Viscosidad 40°C": ("Viscosidad 40°C cSt(mm2/s)", None),
+    "V100": ("Viscosidad 100°C cSt(mm2/s)", None), "Visc 100°C": ("Viscosidad 100°C cSt(mm2/s)", None),
+    "Viscosity 100°C": ("Viscosidad 100°C cSt(mm2/s)", None),
+    "Viscosity @100°C cSt": ("Viscosidad 100°C cSt(mm2/s)", None),
+    "Viscosidad 100°C": ("Viscosidad 100°C cSt(mm2/s)", None),
+    "TAN": ("TAN mg KOH/g", None), "TBN": ("TBN mg KOH/g", None),
+    "PQ": ("Residuo Ferroso Total mg/kg", None), "PQ index": ("Residuo Ferroso Total mg/kg", None)
+}
+
+# Valores de diagnóstico de los laboratorios -> criticidad del almacén
+ALIAS_CRITICIDAD = {
+    "critico": "Critico", "critical": "Critico", "alarma": "Critico", "severo": "Critico", "severe": "Critico",
+    "atencion": "Atencion", "precaucion": "Atencion", "alerta": "Atencion", "caution": "Atencion",
+    "marginal": "Atencion", "abnormal": "Atencion",
+    "normal": "Normal", "ok": "Normal", "satisfactorio": "Normal", "satisfactory": "Normal"
+}
+
+# ==============================
+# ENCABEZADOS
+# ==============================
+def _normalizar_encabezado(texto):
+    """Minúsculas, sin tildes ni símbolos: 'Viscosidad 40°C (cSt)' -> 'viscosidad 40 c cst'"""
+    texto = str(texto).replace("µ", "u").replace("μ", "u")
+    texto = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", " ", texto.lower()).strip()
+
+def _alias():
+    """Alias explícitos más los nombres del propio almacén y las variantes de cada elemento"""
+    alias = {_normalizar_encabezado(c): (c, None) for c in COLUMNAS_TEXTO + COLUMNAS_NUMERICAS + COLUMNAS_ELEMENTOS}
+    alias[_normalizar_encabezado("Fecha")] = ("Fecha", None)
+    for simbolo, (nombre, ingles) in ELEMENTOS.items():
+        columna = f"{nombre} ({simbolo}) ppm"
+        for base in (simbolo, nombre, ingles, f"{nombre} {simbolo}", f"{ingles} {simbolo}"):
+            for unidad in ("", " ppm", " mg kg"):
+                alias[_normalizar_encabezado(base + unidad)] = (columna, None)
+    alias.update({_normalizar_encabezado(encabezado): destino for encabezado, destino in ALIAS_COLUMNAS.items()})
+    return alias
+
+def mapear_columnas(encabezados):
+    """Columna del almacén y conversión de unidad de cada encabezado reconocido, más los ignorados"""
+    alias = _alias()
+    mapeo, ignoradas = {}, []
+    for encabezado in encabezados:
+        destino = alias.get(_normalizar_encabezado(encabezado))
+        # Si dos encabezados apuntan a la misma columna se usa el primero
+        if destino is None or destino[0] in {columna for columna, _ in mapeo.values()}:
+            ignoradas.append(encabezado)
+        else:
+            mapeo[encabezado] = destino
+    return mapeo, ignoradas
+
+# ==============================
+# CONVERSIÓN DE TIPOS
+# ==============================
+def _numerico(serie):
+    """A número sin recorrer fila por fila: acepta coma decimal y límites de detección ('<1')"""
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie.astype(np.float64)
+    texto = serie.astype("string").str.strip().str.lstrip("<>").str.replace(",", ".", regex=False)
+    return pd.to_numeric(texto, errors="coerce")
+
+def _texto(serie):
+    """A texto conservando los nulos; los números enteros leídos como float no ganan un '.0'"""
+    if pd.api.types.is_float_dtype(serie) and (serie.dropna() % 1 == 0).all():
+        serie = serie.astype("Int64")
+    texto = serie.astype("string").str.strip()
+    return texto.where(texto.notna() & (texto != ""), None).astype(object)
+
+def separar_iso(codigos):
+    """Separa '19/17/14' en los tres rangos (>4, >6 y >14 µm); '17/14' y '-' quedan como nulos"""
+    partes = codigos.astype("string").str.extract(PATRON_ISO)
+    partes.columns = COLUMNAS_ISO
+    return partes.apply(pd.to_numeric, errors="coerce").astype(np.float64)
+
+@span("laboratorio.convertir")
+def convertir_bloque(bloque, mapeo, catalogo=None, formato_fecha=None, dia_primero=True):
+    """Lleva un bloque del informe al esquema del almacén; devuelve el bloque y las filas descartadas.
+
+    Se descartan las filas sin fecha, unidad o componente y las de unidades sin Marca y Modelo
+    (ni en el informe ni en el catálogo): en el almacén y en las vistas toda fila tiene modelo.
+    """
+    df = pd.DataFrame(index=bloque.index)
+    for encabezado, (columna, conversion) in mapeo.items():
+        serie = bloque[encabezado]
+        if columna == "Fecha":
+            if not pd.api.types.is_datetime64_any_dtype(serie):
+                serie = pd.to_datetime(serie, format=formato_fecha, dayfirst=dia_primero, errors="coerce")
+        elif columna in COLUMNAS_TEXTO:
+            serie = _texto(serie)
+        else:
+            serie = _numerico(serie)
+            if conversion is not None:
+                serie = conversion(serie)
+        df[columna] = serie
+
+    if "Criticidad" in df.columns:
+        clave = df["Criticidad"].map(_normalizar_encabezado, na_action="ignore")
+        df["Criticidad"] = clave.map(ALIAS_CRITICIDAD).where(clave.isin(ALIAS_CRITICIDAD.keys()), df["Criticidad"])
+    if "Código ISO 4406" in df.columns:
+        df[COLUMNAS_ISO] = separar_iso(df["Código ISO 4406"])
+
+    df["flota"] = enlazar_flota(df["flota"], catalogo)
+    completas = df.reindex(columns=COLUMNAS_OBLIGATORIAS).notna().all(axis=1)
+    df = df[completas].reset_index(drop=True)
+    if pd.api.types.is_float_dtype(df["flota"]):
+        df["flota"] = df["flota"].astype(catalogo["flota"].dtype)
+
+    # Marca y Modelo se completan desde el catálogo cuando el informe no los trae
+    if catalogo is not None:
+        equipos = catalogo.drop_duplicates("flota").set_index("flota")
+        for columna in ("Marca", "Modelo"):
+            desde_catalogo = df["flota"].map(equipos[columna])
+            df[columna] = df[columna].where(df[columna].notna(), desde_catalogo) if columna in df.columns \
+                else desde_catalogo
+    identificadas = df.reindex(columns=["Marca", "Modelo"]).notna().all(axis=1)
+    df = df[identificadas].reset_index(drop=True)
+    return df, int((~completas).sum() + (~identificadas).sum())
+
+# ==============================
+# LECTURA POR BLOQUES
+# ==============================
+def _bloques_csv(ruta, filas, separador, decimal, codificacion):
+    yield from pd.read_csv(ruta, chunksize=filas, sep=separador, decimal=decimal,
+                           encoding=codificacion, skipinitialspace=True)
+
+def _bloques_excel(ruta, filas, hoja):
+    """Recorre la planilla en modo solo lectura: nunca se carga el libro completo"""
+    if openpyxl is None:
+        raise ImportError("Para importar planillas Excel instale openpyxl (pip install openpyxl)")
+    libro = openpyxl.load_workbook(ruta, read_only=True, data_only=True)
+    try:
+        filas_hoja = (libro[hoja] if hoja else libro.active).iter_rows(values_only=True)
+        encabezados = [str(c) if c is not None else f"columna_{i}" for i, c in enumerate(next(filas_hoja, ()))]
+        bloque = []
+        for fila in filas_hoja:
+            bloque.append(fila)
+            if len(bloque) == filas:
+                yield pd.DataFrame(bloque, columns=encabezados)
+                bloque = []
+        if bloque:
+            yield pd.DataFrame(bloque, columns=encabezados)
+    finally:
+        libro.close()
+
+def leer_bloques(ruta, filas=FILAS_POR_BLOQUE, hoja=None, separador=",", decimal=".", codificacion="utf-8-sig"):
+    """Bloques de `filas` registros del informe (CSV o Excel, según la extensión)"""
+    if os.path.splitext(ruta)[1].lower() in (".xlsx", ".xlsm"):
+        return _bloques_excel(ruta, filas, hoja)
+    return _bloques_csv(ruta, filas, separador, decimal, codificacion)
+
+# ==============================
+# IMPORTACIÓN
+# ==============================
+@span("laboratorio.importar")
+def importar_informe(ruta, filas=FILAS_POR_BLOQUE, hoja=None, separador=",", decimal=".",
+                     codificacion="utf-8-sig", formato_fecha=None, dia_primero=True, archivo=DATA_PATH):
+    """Importa un informe de análisis de aceite al almacén y publica lo nuevo para las vistas.
+
+    Cada bloque se confirma en su propia transacción y se publica como un lote apenas
+    se inserta, así la memoria queda acotada por el bloque. Como la ingesta es idempotente,
+    reimportar un informe (o retomarlo tras un corte) no duplica registros.
+    """
+    catalogo = leer_catalogo(archivo) if os.path.exists(archivo) else None
+    resumen = {"leidas": 0, "descartadas": 0, "insertadas": 0, "ignoradas": []}
+    mapeo = None
+    for bloque in leer_bloques(ruta, filas, hoja, separador, decimal, codificacion):
+        if mapeo is None:
+            mapeo, resumen["ignoradas"] = mapear_columnas(bloque.columns)
+            faltantes = set(COLUMNAS_OBLIGATORIAS) - {columna for columna, _ in mapeo.values()}
+            if faltantes:
+                raise ValueError(f"El informe no tiene las columnas {sorted(faltantes)}")
+        df, descartadas = convertir_bloque(bloque, mapeo, catalogo, formato_fecha, dia_primero)
+        resumen["leidas"] += len(bloque)
+        resumen["descartadas"] += descartadas
+        resumen["insertadas"] += len(ingerir_lote(df, archivo=archivo))
+
+    contar("flota_laboratorio_filas_total", resumen["leidas"])
+    return resumen
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa informes de laboratorio de análisis de aceite")
+    parser.add_argument("archivo", help="Informe exportado por el laboratorio (.csv, .xlsx)")
+    parser.add_argument("--filas", type=int, default=FILAS_POR_BLOQUE, help="Filas por bloque")
+    parser.add_argument("--hoja", default=None, help="Hoja de la planilla (por defecto la activa)")
+    parser.add_argument("--separador", default=",")
+    parser.add_argument("--decimal", default=".")
+    parser.add_argument("--codificacion", default="utf-8-sig")
+    parser.add_argument("--formato-fecha", default=None, help="Formato strftime de las fechas, p. ej. %%d-%%m-%%Y")
+    parser.add_argument("--mes-primero", action="store_true", help="Fechas ambiguas en formato mes/día")
+    args = parser.parse_args()
+
+    inicio = time.time()
+    resumen = importar_informe(args.archivo, args.filas, args.hoja, args.separador, args.decimal,
+                               args.codificacion, args.formato_fecha, not args.mes_primero)
+    if resumen["ignoradas"]:
+        print(f"⚠️ Columnas no reconocidas: {', '.join(map(str, resumen['ignoradas']))}")
+    print(f"🧪 {resumen['leidas']} filas leídas, {resumen['insertadas']} nuevas y "
+          f"{resumen['descartadas']} sin fecha, unidad, componente o modelo en {round(time.time() - inicio, 2)} segundos")
+    exportar_metricas("laboratorio")
@@ -0,0 +1,199 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+# Un archivo .prom por proceso, en el formato del colector textfile de node_exporter
+DIRECTORIO_METRICAS = "data/metricas"
+
+# Límites superiores (segundos) de los buckets del histograma de duración
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Las páginas exportan como máximo cada este intervalo, no en cada rerun
+INTERVALO_EXPORTACION = 5.0
+
+# Tope de spans guardados para el desglose de un rerun (los fragments no lo reinician)
+MAX_SPANS_RERUN = 500
+
+# ==============================
+# REGISTRO
+# ==============================
+class RegistroMetricas:
+    """Histogramas de duración por span y contadores con etiquetas, compartidos por todo el proceso"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._histogramas = {}
+        self._contadores = {}
+        self._lock = threading.Lock()
+
+    def observar(self, nombre, segundos, error=False):
+        """Registra la duración de una ejecución del span `nombre`"""
+        with self._lock:
+            histograma = self._histogramas.get(nombre)
+            if histograma is None:
+                histograma = self._histogramas[nombre] = {
+                    "buckets": [0] * (len(self.buckets) + 1), "suma": 0.0, "conteo": 0, "errores": 0
+                }
+            histograma["buckets"][bisect_left(self.buckets, segundos)] += 1
+            histograma["suma"] += segundos
+            histograma["conteo"] += 1
+            histograma["errores"] += int(error)
+
+    def contar(self, nombre, valor=1, **etiquetas):
+        """Incrementa el contador `nombre` con las etiquetas dadas"""
+        clave = (nombre, tuple(sorted(etiquetas.items())))
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + valor
+
+    def valores(self, nombre):
+        """Valor de cada serie del contador `nombre`, indexado por sus etiquetas ordenadas"""
+        with self._lock:
+            return {etiquetas: valor for (contador, etiquetas), valor in self._contadores.items()
+                    if contador == nombre}
+
+    def texto_prometheus(self, proceso):
+        """Exposición en formato de texto de Prometheus, con la etiqueta proceso en todas las series"""
+        with self._lock:
+            histogramas = {nombre: dict(h, buckets=list(h["buckets"])) for nombre, h in self._histogramas.items()}
+            contadores = dict(self._contadores)
+
+        lineas = [
+            "# HELP flota_span_duracion_segundos Duración de los spans instrumentados",
+            "# TYPE flota_span_duracion_segundos histogram"
+        ]
+        for nombre in sorted(histogramas):
+            h = histogramas[nombre]
+            etiquetas = f'proceso="{_escapar(proceso)}",span="{_escapar(nombre)}"'
+            acumulado = 0
+            for limite, cantidad in zip(self.buckets + (float("inf"),), h["buckets"]):
+                acumulado += cantidad
+                le = "+Inf" if limite == float("inf") else repr(limite)
+                lineas.append(f'flota_span_duracion_segundos_bucket{{{etiquetas},le="{le}"}} {acumulado}')
+            lineas.append(f"flota_span_duracion_segundos_sum{{{etiquetas}}} {h['suma']:.6f}")
+            lineas.append(f"flota_span_duracion_segundos_count{{{etiquetas}}} {h['conteo']}")
+
+        lineas += [
+            "# HELP flota_span_errores_total Spans que terminaron con una excepción",
+            "# TYPE flota_span_errores_total counter"
+        ]
+        for nombre in sorted(histogramas):
+            lineas.append(f'flota_span_errores_total{{proceso="{_escapar(proceso)}",span="{_escapar(nombre)}"}} '
+                          f'{histogramas[nombre]["errores"]}')
+
+        for metrica in sorted({nombre for nombre, _ in contadores}):
+            lineas += [f"# HELP {metrica} Contador de eventos", f"# TYPE {metrica} counter"]
+            for (nombre, etiquetas), valor in sorted(contadores.items()):
+                if nombre == metrica:
+                    pares = [("proceso", proceso)] + list(etiquetas)
+                    texto = ",".join(f'{clave}="{_escapar(v)}"' for clave, v in pares)
+                    lineas.append(f"{metrica}{{{texto}}} {valor}")
+        return "\n".join(lineas) + "\n"
+
+    def limpiar(self):
+        with self._lock:
+            self._histogramas.clear()
+            self._contadores.clear()
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Instancia única del proceso
+REGISTRO = RegistroMetricas()
+
+# ==============================
+# SPANS
+# ==============================
+# Desglose del rerun en curso: cada sesión de Streamlit ejecuta su script en su propio hilo
+_rerun = threading.local()
+
+def _spans_rerun():
+    if not hasattr(_rerun, "spans"):
+        _rerun.spans = []
+        _rerun.profundidad = 0
+    return _rerun.spans
+
+@contextmanager
+def span(nombre):
+    """Mide un bloque (o una función, usado como decorador) y lo registra en el histograma `nombre`"""
+    spans = _spans_rerun()
+    registro = None
+    if len(spans) < MAX_SPANS_RERUN:
+        registro = {"span": nombre, "profundidad": _rerun.profundidad, "segundos": None}
+        spans.append(registro)
+    _rerun.profundidad += 1
+    error = False
+    inicio = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        segundos = time.perf_counter() - inicio
+        _rerun.profundidad -= 1
+        if registro is not None:
+            registro["segundos"] = segundos
+        REGISTRO.observar(nombre, segundos, error)
+
+def contar(nombre, valor=1, **etiquetas):
+    REGISTRO.contar(nombre, valor, **etiquetas)
+
+def iniciar_rerun():
+    """Reinicia el desglose del hilo actual; cada página lo llama al comenzar su script"""
+    _rerun.spans = []
+    _rerun.profundidad = 0
+
+def desglose_rerun():
+    """Spans del rerun en curso en orden de inicio: [{span, profundidad, segundos}]"""
+    return [dict(registro) for registro in _spans_rerun()]
+
+# ==============================
+# EXPORTACIÓN
+# ==============================
+_ultima_exportacion = {}
+
+def exportar_metricas(proceso, directorio=DIRECTORIO_METRICAS, intervalo=0.0):
+    """Escribe las métricas del proceso en <directorio>/<proceso>.prom con un rename atómico.
+
+    Con `intervalo` > 0 no vuelve a escribir si la última exportación es más reciente.
+    """
+    ahora = time.monotonic()
+    if intervalo and ahora - _ultima_exportacion.get(proceso, float("-inf")) < intervalo:
+        return None
+    _ultima_exportacion[proceso] = ahora
+
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, f"{proceso}.prom")
+    ruta_tmp = f"{ruta}.{os.getpid()}.tmp"
+    with open(ruta_tmp, "w", encoding="utf-8") as f:
+        f.write(REGISTRO.texto_prometheus(proceso))
+    os.replace(ruta_tmp, ruta)
+    return ruta
+
+# ==============================
+# PANEL DE DEPURACIÓN
+# ==============================
+def cerrar_rerun(pagina):
+    """Exporta las métricas de la página y, con ?debug=1 o FLOTA_DEBUG=1, muestra el desglose en la barra lateral"""
+    exportar_metricas(pagina, intervalo=INTERVALO_EXPORTACION)
+
+    # Streamlit se importa aquí: el generador y el entrenamiento usan este módulo sin él
+    import streamlit as st
+    if st.query_params.get("debug") != "1" and os.environ.get("FLOTA_DEBUG") != "1":
+        return
+    spans = [s for s in desglose_rerun() if s["segundos"] is not None]
+    with st.sidebar.expander("⏱️ Tiempos de este rerun", expanded=True):
+        if not spans:
+            st.caption("Sin spans registrados")
+            return
+        st.dataframe(
+            [{"Span": "· " * s["profundidad"] + s["span"], "ms": round(s["segundos"] * 1000, 1)} for s in spans],
+            hide_index=True, use_container_width=True
+        )
+        total = sum(s["segundos"] for s in spans if s["profundidad"] == 0)
+        st.caption(f"Total instrumentado: {total * 1000:.1f} ms")
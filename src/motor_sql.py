@@ -0,0 +1,120 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from acceso_datos import DATA_PATH, archivos_datos
+from metricas import span
+
+try:
+    import duckdb
+except ImportError:  # motor opcional: sin duckdb cada consulta usa su ruta en pandas
+    duckdb = None
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+# FLOTA_MOTOR_SQL=0 fuerza las rutas en pandas aunque duckdb esté instalado (útil para comparar)
+VARIABLE_MOTOR = "FLOTA_MOTOR_SQL"
+
+# Las consultas leen el Parquet directamente: la proyección de columnas y los filtros
+# llegan al lector, y las agregaciones corren en paralelo sin pasar la tabla por pandas.
+# {datos} se reemplaza por el read_parquet de los archivos consultados (el base y sus lotes).
+
+# Sumas y conteos por día × Marca × Modelo × Componente (ver rollups.agregar_cubo)
+SQL_CUBO = """
+SELECT CAST(CAST("Fecha" AS DATE) AS TIMESTAMP) AS "Dia", "Marca", "Modelo", "Componente",
+       count(*) AS "Registros",
+       count(*) FILTER (WHERE "Criticidad" = 'Critico') AS "Fallas",
+       sum("Disponibilidad") AS "Suma Disponibilidad",
+       CAST(sum("Tiempo Parada") AS BIGINT) AS "Suma Tiempo Parada",
+       CAST(sum("TBF") AS BIGINT) AS "Suma TBF",
+       sum("Confiabilidad") AS "Suma Confiabilidad"
+FROM {datos}
+GROUP BY ALL
+ORDER BY "Dia", "Marca", "Modelo", "Componente"
+"""
+
+# Último código de criticidad por Marca × Modelo × flota × Componente (ver criticidad.ultimo_estado)
+SQL_ESTADO = """
+SELECT CAST("Fecha" AS TIMESTAMP) AS "Fecha", "Marca", "Modelo", "flota", "Componente",
+       CAST(CASE WHEN "Criticidad" IN ('Critico', 'Crítico') THEN 2
+                 WHEN "Criticidad" IN ('Atencion', 'Precaución') THEN 1
+                 ELSE 0 END AS TINYINT) AS "Codigo"
+FROM {datos}
+QUALIFY row_number() OVER (PARTITION BY "Marca", "Modelo", "flota", "Componente"
+                           ORDER BY "Fecha" DESC) = 1
+ORDER BY "Fecha"
+"""
+
+# Alertas más recientes por (Marca, Modelo), acotadas (ver alertas_activas.seleccionar_alertas)
+SQL_ALERTAS = """
+SELECT CAST("Fecha" AS TIMESTAMP) AS "Fecha", "Marca", "Modelo", "flota", "Componente", "Criticidad"
+FROM {datos}
+WHERE "Criticidad" <> 'Normal'
+QUALIFY row_number() OVER (PARTITION BY "Marca", "Modelo" ORDER BY "Fecha" DESC) <= $limite
+ORDER BY "Fecha" DESC
+"""
+
+# Estadísticas del filtro económico (ver proyeccion_costos.estadisticas_fallas)
+SQL_ECONOMICO = """
+SELECT count(*) AS registros,
+       count(*) FILTER (WHERE "Criticidad" = 'Critico') AS fallas,
+       count(DISTINCT CAST("Fecha" AS DATE)) AS dias,
+       coalesce(sum("Tiempo Parada"), 0) AS horas_parada,
+       avg("Tiempo Parada") FILTER (WHERE "Criticidad" <> 'Critico') AS parada_normal_media,
+       list("Tiempo Parada") FILTER (WHERE "Criticidad" = 'Critico') AS paradas_falla,
+       max(CAST("Fecha" AS TIMESTAMP)) AS fecha_fin
+FROM {datos}
+WHERE "Marca" = $marca AND "Modelo" = $modelo AND "Fecha" BETWEEN $desde AND $hasta
+"""
+
+# ==============================
+# EJECUCIÓN
+# ==============================
+# Una conexión en memoria por hilo: las sesiones de Streamlit y la API consultan en paralelo
+_conexiones = threading.local()
+
+def motor_disponible():
+    """True si las consultas pueden resolverse con el motor SQL embebido"""
+    return duckdb is not None and os.environ.get(VARIABLE_MOTOR, "1") != "0"
+
+def _conexion():
+    if not hasattr(_conexiones, "conexion"):
+        _conexiones.conexion = duckdb.connect()
+    return _conexiones.conexion
+
+def _tabla(ruta):
+    """read_parquet de la publicación `ruta` o de una lista fija de archivos; los lotes parciales
+    no traen todas las columnas, así que se unen por nombre"""
+    archivos = ruta if isinstance(ruta, list) else archivos_datos(ruta)
+    lista = ", ".join("'{}'".format(str(archivo).replace("'", "''")) for archivo in archivos)
+    return f"read_parquet([{lista}], union_by_name = true)"
+
+@span("sql.consultar")
+def consultar(sql, ruta=DATA_PATH, **parametros):
+    """Ejecuta una consulta del catálogo sobre la publicación `ruta` (o una lista de archivos) y devuelve un DataFrame"""
+    df = _conexion().execute(sql.format(datos=_tabla(ruta)), parametros or None).df()
+    # Las fechas se devuelven en microsegundos; se igualan al nanosegundo con que pandas lee el Parquet
+    for columna in df.select_dtypes("datetime64").columns:
+        df[columna] = df[columna].astype("datetime64[ns]")
+    return df
+
+# ==============================
+# CONSULTAS
+# ==============================
+def estadisticas_economicas(marca, modelo, fecha_desde, fecha_hasta, ruta=DATA_PATH):
+    """Mismo resultado que proyeccion_costos.estadisticas_fallas sin cargar los registros del filtro"""
+    fila = consultar(SQL_ECONOMICO, ruta, marca=marca, modelo=modelo,
+                     desde=pd.Timestamp(fecha_desde), hasta=pd.Timestamp(fecha_hasta)).iloc[0]
+    registros, dias = int(fila["registros"]), int(fila["dias"])
+    # list() sin filas con falla devuelve NULL
+    paradas = fila["paradas_falla"] if isinstance(fila["paradas_falla"], (list, np.ndarray)) else []
+    return {
+        "muestras_por_dia": int(round(registros / dias)) if dias else 0,
+        "fallas": int(fila["fallas"]),
+        "registros": registros,
+        "horas_parada": float(fila["horas_parada"]),
+        "paradas_falla": np.asarray(paradas, dtype=np.float64),
+        "parada_normal_media": 0.0 if pd.isna(fila["parada_normal_media"]) else float(fila["parada_normal_media"]),
+        "fecha_fin": pd.Timestamp(fila["fecha_fin"])
+    }
@@ -0,0 +1,173 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.express as px
+from datetime import datetime, timedelta
+from acceso_datos import rango_periodo, PERIODOS
+from rollups import kpis_cubo, tendencia_cubo
+from criticidad import ETIQUETAS_CODIGO, SIN_DATO
+from cache_figuras import figura_cacheada
+from alertas_activas import contar_alertas, pagina_alertas
+from recursos import (versiones, cargar_catalogo, cargar_cubo_kpi, cargar_matrices_criticidad, cargar_alertas,
+                      cargar_indice_anomalias)
+from metricas import span
+
+with span("ejecutivo.carga"):
+    version, _ = versiones()
+    df_catalogo = cargar_catalogo(version)
+    cubo_kpi = cargar_cubo_kpi(version)
+    matrices_criticidad = cargar_matrices_criticidad(version)
+    indice_alertas = cargar_alertas(version)
+    indice_anomalias = cargar_indice_anomalias(version)
+
+# Título principal
+st.title("🎯 Dashboard Ejecutivo de Mantenimiento")
+st.markdown("### Vista General de la Flota CAEX")
+
+# Filtros superiores
+col1, col2, col3 = st.columns(3)
+with col1:
+    marca_sel = st.selectbox("Marca", df_catalogo["Marca"].unique())
+with col2:
+    modelo_sel = st.selectbox("Modelo", df_catalogo[df_catalogo["Marca"] == marca_sel]["Modelo"].unique())
+with col3:
+    periodo = st.selectbox("Período", list(PERIODOS))
+
+# Los KPIs y la tendencia se leen del cubo pre-agregado, no de los registros crudos
+fecha_desde, fecha_hasta = rango_periodo(periodo)
+filtros_cubo = dict(marca=marca_sel, modelo=modelo_sel, fecha_desde=fecha_desde, fecha_hasta=fecha_hasta)
+kpis = kpis_cubo(cubo_kpi, **filtros_cubo)
+
+# KPIs Principales
+st.markdown("### 📊 KPIs Principales")
+col1, col2, col3, col4 = st.columns(4)
+
+# Disponibilidad promedio
+disponibilidad = kpis["Disponibilidad"] * 100
+with col1:
+    st.metric(
+        "Disponibilidad Flota",
+        f"{disponibilidad:.1f}%",
+        delta=f"{(disponibilidad - 85):.1f}%" if disponibilidad > 85 else f"{(disponibilidad - 85):.1f}%",
+        delta_color="normal" if disponibilidad > 85 else "inverse"
+    )
+
+# MTTR promedio
+mttr = kpis["MTTR"]
+with col2:
+    st.metric(
+        "MTTR Promedio",
+        f"{mttr:.1f} hrs",
+        delta=f"{(24 - mttr):.1f} hrs",
+        delta_color="normal" if mttr < 24 else "inverse"
+    )
+
+# MTBF promedio
+mtbf = kpis["MTBF"]
+with col3:
+    st.metric(
+        "MTBF Promedio",
+        f"{mtbf:.1f} hrs",
+        delta=f"{(mtbf - 168):.1f} hrs",
+        delta_color="normal" if mtbf > 168 else "inverse"
+    )
+
+# Confiabilidad promedio (la columna ya está expresada en %)
+confiabilidad = kpis["Confiabilidad"]
+with col4:
+    st.metric(
+        "Confiabilidad",
+        f"{confiabilidad:.1f}%",
+        delta=f"{(confiabilidad - 90):.1f}%",
+        delta_color="normal" if confiabilidad > 90 else "inverse"
+    )
+
+# Mapa de calor de criticidad
+st.markdown("### 🔥 Mapa de Criticidad por Unidad")
+if (marca_sel, modelo_sel) in matrices_criticidad:
+    # Matriz int8 precalculada con el último estado de cada unidad y componente
+    def construir_heatmap():
+        matriz, flotas, componentes = matrices_criticidad[(marca_sel, modelo_sel)]
+        fig_heatmap = px.imshow(
+            matriz,
+            x=componentes,
+            y=flotas,
+            zmin=SIN_DATO,
+            zmax=2,
+            color_continuous_scale=["lightgray", "green", "yellow", "red"],
+            aspect="auto"
+        )
+        fig_heatmap.update_layout(
+            title="Estado de Componentes por Unidad",
+            xaxis_title="Componente",
+            yaxis_title="Número de Flota",
+            height=400
+        )
+        fig_heatmap.update_coloraxes(colorbar=dict(
+            tickvals=list(ETIQUETAS_CODIGO),
+            ticktext=list(ETIQUETAS_CODIGO.values())
+        ))
+        return fig_heatmap
+
+    fig_heatmap = figura_cacheada("ejecutivo.heatmap", (marca_sel, modelo_sel), version, construir_heatmap)
+    st.plotly_chart(fig_heatmap, use_container_width=True)
+else:
+    st.info("No hay registros de criticidad para este modelo")
+
+# Tendencias de disponibilidad
+st.markdown("### 📈 Tendencias de Disponibilidad")
+def construir_tendencia():
+    df_tendencia = tendencia_cubo(cubo_kpi, "Disponibilidad", **filtros_cubo)
+    fig_tendencia = px.line(
+        df_tendencia,
+        x="Fecha",
+        y="Disponibilidad",
+        title="Evolución de Disponibilidad"
+    )
+    fig_tendencia.update_layout(height=400)
+    return fig_tendencia
+
+fig_tendencia = figura_cacheada("ejecutivo.tendencia", (marca_sel, modelo_sel, periodo), version, construir_tendencia)
+st.plotly_chart(fig_tendencia, use_container_width=True)
+
+# Alertas Activas
+st.markdown("### ⚠️ Alertas Activas")
+ALERTAS_POR_PAGINA = 5
+total_alertas = contar_alertas(indice_alertas, marca_sel, modelo_sel, fecha_desde)
+
+if total_alertas:
+    paginas = (total_alertas - 1) // ALERTAS_POR_PAGINA + 1
+    # La clave depende del filtro para que el paginado vuelva a 1 al cambiarlo
+    pagina = st.number_input("Página", min_value=1, max_value=paginas, value=1,
+                             key=f"pagina_alertas_{marca_sel}_{modelo_sel}_{periodo}") if paginas > 1 else 1
+    alertas = pagina_alertas(indice_alertas, marca_sel, modelo_sel, pagina - 1, ALERTAS_POR_PAGINA, fecha_desde)
+    alertas = alertas.assign(Fecha=alertas["Fecha"].dt.strftime('%Y-%m-%d %H:%M'))
+
+    for alerta in alertas.to_dict("records"):
+        with st.container():
+            st.markdown(f"""
+            <div class="metric-container">
+                <h4>Alerta en {alerta['flota']} - {alerta['Componente']}</h4>
+                <p class="{alerta['Criticidad'].lower()}">{alerta['Criticidad']}</p>
+                <p>Fecha: {alerta['Fecha']}</p>
+            </div>
+            """, unsafe_allow_html=True)
+    st.caption(f"{total_alertas} alertas en el período | Página {pagina} de {paginas}")
+else:
+    st.info("No hay alertas activas en este momento")
+
+# Cambios respecto de la historia propia de cada unidad, antes de cruzar los límites fijos
+st.markdown("### 🧭 Cambios de Tendencia")
+total_anomalias = contar_alertas(indice_anomalias, marca_sel, modelo_sel, fecha_desde)
+if total_anomalias:
+    anomalias = pagina_alertas(indice_anomalias, marca_sel, modelo_sel, 0, ALERTAS_POR_PAGINA, fecha_desde)
+    anomalias = anomalias.assign(Fecha=anomalias["Fecha"].dt.strftime('%Y-%m-%d %H:%M'))
+    st.dataframe(anomalias[["Fecha", "flota", "Componente", "Elemento", "Valor", "Media", "Tipo"]],
+                 hide_index=True, use_container_width=True)
+    st.caption(f"{total_anomalias} cambios de tendencia en el período")
+else:
+    st.info("No se detectaron cambios de tendencia en el período")
+
+# Footer
+st.markdown("---")
+st.caption("Dashboard actualizado en tiempo real | Última actualización: " + datetime.now().strftime("%Y-%m-%d %H:%M:%S")) 
@@ -2,184 +2,36 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import joblib
-import os
 from datetime import datetime, timedelta
-from data_generator import generar_datos_disponibilidad, generar_datos_confiabilidad
+from acceso_datos import leer_datos
+from alertas_predictivas import calcular_alertas, get_safe_value
+from explicaciones import TOP_FACTORES
+from recursos import versiones, cargar_catalogo, cargar_modelo, cargar_explicaciones
+from metricas import span
 
-# Asegurarse de que el directorio data existe y generar datos si es necesario
-if not os.path.exists('data'):
-    os.makedirs('data')
-    
-if not os.path.exists('data/datos_generados_Disponibilidad.parquet'):
-    df_disponibilidad = generar_datos_disponibilidad()
-    df_confiabilidad = generar_datos_confiabilidad()
-    df_disponibilidad.to_parquet('data/datos_generados_Disponibilidad.parquet')
-    df_confiabilidad.to_parquet('data/metricas_confiabilidad.parquet')
-
-# Rutas de datos
-DATA_PATH = "data/datos_generados_Disponibilidad.parquet"
-MODEL_PATH = "data/modelo_entrenado.joblib"
-FEATURES_PATH = "data/feature_names.joblib"
+# Columnas que usa el dashboard principal: solo estas se leen del Parquet
+COLUMNAS_PRINCIPAL = [
+    "Fecha", "flota", "Marca", "Modelo", "Criticidad", "Disponibilidad",
+    "Tiempo Parada", "TBF", "Confiabilidad", "Hierro (Fe) ppm",
+    "Silicio (Si) ppm", "Cobre (Cu) ppm", "Viscosidad 100°C cSt(mm2/s)"
+]
 
-# Función para calcular alertas predictivas
-def calcular_alertas(registro):
-    alertas = []
-    
-    # Verificar niveles de partículas
-    fe_ppm = get_safe_value(registro, "Hierro (Fe) ppm")
-    si_ppm = get_safe_value(registro, "Silicio (Si) ppm")
-    cu_ppm = get_safe_value(registro, "Cobre (Cu) ppm")
-    visc = get_safe_value(registro, "Viscosidad 100°C cSt(mm2/s)")
-    
-    # Predicción de días hasta falla basado en niveles
-    dias_estimados = None
-    nivel_critico = False
-    componente_afectado = None
-    
-    if fe_ppm > 120:
-        dias_estimados = max(1, int(15 - (fe_ppm - 120)/10))
-        nivel_critico = True
-        alertas.append({
-            'componente': 'Motor',
-            'nivel': fe_ppm,
-            'limite': 120,
-            'tipo': 'Crítico',
-            'mensaje': f'Nivel crítico de hierro: {fe_ppm:.1f} ppm',
-            'dias': dias_estimados
-        })
-        componente_afectado = "Motor"
-    elif fe_ppm > 80:
-        alertas.append({
-            'componente': 'Motor',
-            'nivel': fe_ppm,
-            'limite': 80,
-            'tipo': 'Advertencia',
-            'mensaje': f'Nivel elevado de hierro: {fe_ppm:.1f} ppm',
-            'dias': None
-        })
-    
-    if si_ppm > 30:
-        dias_temp = max(1, int(10 - (si_ppm - 30)/5))
-        if dias_estimados is None or dias_temp < dias_estimados:
-            dias_estimados = dias_temp
-            componente_afectado = "Sistema de Filtración"
-        alertas.append({
-            'componente': 'Sistema de Filtración',
-            'nivel': si_ppm,
-            'limite': 30,
-            'tipo': 'Crítico',
-            'mensaje': f'Nivel crítico de silicio: {si_ppm:.1f} ppm',
-            'dias': dias_temp
-        })
-    
-    if cu_ppm > 40:
-        dias_temp = max(1, int(12 - (cu_ppm - 40)/5))
-        if dias_estimados is None or dias_temp < dias_estimados:
-            dias_estimados = dias_temp
-            componente_afectado = "Cojinetes"
-        alertas.append({
-            'componente': 'Cojinetes',
-            'nivel': cu_ppm,
-            'limite': 40,
-            'tipo': 'Crítico',
-            'mensaje': f'Nivel crítico de cobre: {cu_ppm:.1f} ppm',
-            'dias': dias_temp
-        })
-    
-    if visc < 12:
-        dias_temp = max(1, int(5 + visc/2))
-        if dias_estimados is None or dias_temp < dias_estimados:
-            dias_estimados = dias_temp
-            componente_afectado = "Sistema de Lubricación"
-        alertas.append({
-            'componente': 'Sistema de Lubricación',
-            'nivel': visc,
-            'limite': 12,
-            'tipo': 'Crítico',
-            'mensaje': f'Viscosidad crítica: {visc:.1f} cSt',
-            'dias': dias_temp
-        })
-    
-    return alertas, dias_estimados, componente_afectado
-
-# Función auxiliar para obtener valor seguro del registro
-def get_safe_value(registro, key, default=0):
-    try:
-        return float(registro[key]) if key in registro else default
-    except (ValueError, TypeError):
-        return default
-
-# Función para asegurar que exista el directorio data
-def asegurar_directorio_data():
-    if not os.path.exists('data'):
-        os.makedirs('data')
-
-# Carga de datos
+# Carga de datos (la versión invalida la caché cuando llega una nueva partición)
 @st.cache_data(ttl=300)
-def cargar_datos():
-    try:
-        # Intentar cargar datos existentes
-        df = pd.read_parquet("data/datos_generados_Disponibilidad.parquet")
-        if df.empty:
-            raise FileNotFoundError
-        return df
-    except Exception as e:
-        st.warning("Generando nuevos datos de ejemplo...")
-        try:
-            return generar_y_guardar_datos()
-        except Exception as e:
-            st.error(f"Error al generar datos: {str(e)}")
-            return pd.DataFrame({
-                'Marca': ['CATERPILLAR', 'KOMATSU'],
-                'Modelo': ['797F', '930E-4'],
-                'flota': ['CAEX_001', 'CAEX_002'],
-                'Disponibilidad': [0.9, 0.85],
-                'Tiempo Parada': [2, 3],
-                'Criticidad': ['Normal', 'Normal'],
-                'Fecha': [datetime.now(), datetime.now()]
-            })
-
-# Carga del modelo
-@st.cache_resource
-def cargar_modelo():
-    if os.path.exists(MODEL_PATH) and os.path.exists(FEATURES_PATH):
-        try:
-            modelo = joblib.load(MODEL_PATH)
-            feature_names = joblib.load(FEATURES_PATH)
-            return modelo, feature_names
-        except Exception as e:
-            st.warning(f"No se pudo cargar el modelo: {e}")
-    return None, None
-
-modelo, feature_names = cargar_modelo()
+def cargar_datos(version, marca, modelo, flota):
+    return leer_datos(COLUMNAS_PRINCIPAL, marca=marca, modelo=modelo, flota=flota)
 
 # Título y descripción
 st.title("Sistema de Mantenimiento Predictivo")
 
-# Contenedor para filtros
-with st.container():
-    st.markdown("### 🔍 Selección de Equipo")
-    col1, col2, col3 = st.columns(3)
-    with col1:
-        marca_options = sorted(df['Marca'].unique())
-        marca_sel = st.selectbox("Marca", marca_options)
-    with col2:
-        modelos_options = sorted(df[df['Marca'] == marca_sel]['Modelo'].unique())
-        modelo_sel = st.selectbox("Modelo", modelos_options)
-    with col3:
-        camiones_filtrados = sorted(df[(df['Marca'] == marca_sel) & (df['Modelo'] == modelo_sel)]['flota'].unique())
-        camion_sel = st.selectbox("Número de Camión", camiones_filtrados, format_func=lambda x: f"Camión {x}")
-
-# Filtrar datos para el camión seleccionado
-df_camion = df[(df['flota'] == camion_sel) & 
-               (df['Marca'] == marca_sel) & 
-               (df['Modelo'] == modelo_sel)].sort_values('Fecha', ascending=False)
-registro = df_camion.iloc[0]
-
-# Contenedor principal
-with st.container():
-    # Sección 1: KPIs Principales
+# ==============================
+# SECCIONES
+# ==============================
+# Cada sección recibe explícitamente sus entradas; solo las que dependen del
+# equipo seleccionado se re-ejecutan al cambiar los selectores
+@span("principal.kpis")
+def seccion_kpis(df_camion):
+    """Indicadores clave del camión"""
     st.markdown("### 📊 Indicadores Clave")
     col1, col2, col3, col4 = st.columns(4)
     with col1:
@@ -199,7 +51,9 @@ with st.container():
                  f"{round(df_camion['Confiabilidad'].mean(), 2)}%",
                  delta="del sistema")
 
-    # Alerta Predictiva
+@span("principal.alerta")
+def seccion_alerta(registro):
+    """Alertas predictivas del último análisis"""
     alertas, dias_estimados, componente_afectado = calcular_alertas(registro)
     
     if alertas:
@@ -239,7 +93,9 @@ with st.container():
                 </div>
                 """, unsafe_allow_html=True)
 
-    # Sección 2: Estado Tribológico
+@span("principal.tribologia")
+def seccion_tribologia(registro):
+    """Estado tribológico del último análisis"""
     st.markdown("### 🔬 Estado Tribológico")
     col1, col2 = st.columns([3, 2])
     
@@ -290,7 +146,9 @@ with st.container():
                 color = "status-critical" if valor < 12 else "status-warning" if valor < 14 else "status-normal"
             st.markdown(f"<div class='custom-metric'><b>{nombre}</b>: <span class='{color}'>{estado}</span></div>", unsafe_allow_html=True)
 
-    # Sección 3: Componentes Críticos
+@span("principal.componentes")
+def seccion_componentes():
+    """Estado de los componentes críticos"""
     st.markdown("### ⚙️ Componentes Críticos")
     componentes = {
         "Motor": 0.85,
@@ -309,7 +167,27 @@ with st.container():
                      delta=f"{'Óptimo' if valor > 0.8 else 'Atención'}",
                      delta_color=delta_color)
 
-    # Sección 4: Impacto Económico
+@span("principal.prediccion")
+def seccion_prediccion(predicciones):
+    """Criticidad predicha por componente y los factores que más la explican"""
+    st.markdown("### 🤖 Predicción del Modelo")
+    if predicciones is None or predicciones.empty:
+        st.info("No hay un modelo entrenado para predecir la criticidad")
+        return
+    probabilidades = [c for c in predicciones.columns if c.startswith("Prob ")]
+    tabla = predicciones[["Componente", "Fecha", "Prediccion"]].copy()
+    tabla["Probabilidad"] = predicciones[probabilidades].max(axis=1).round(3)
+    factores = [f"Factor {i}" for i in range(1, TOP_FACTORES + 1) if f"Factor {i}" in predicciones.columns]
+    tabla["Factores"] = [
+        ", ".join(f"{fila[f'Factor {i}']} = {fila[f'Valor {i}']} ({fila[f'Aporte {i}']:+.2f})"
+                  for i in range(1, len(factores) + 1))
+        for _, fila in predicciones.iterrows()
+    ]
+    st.dataframe(tabla, use_container_width=True, hide_index=True)
+
+@span("principal.impacto")
+def seccion_impacto(registro):
+    """Impacto económico del camión"""
     st.markdown("### 💰 Impacto Económico")
     tiempo_operacion = get_safe_value(registro, "TBF", 24)
     costo_hora_operacion = 850
@@ -325,7 +203,9 @@ with st.container():
                  f"${costo_evitado//1000}k",
                  delta="ahorros")
 
-    # Sección 5: Información Detallada
+@span("principal.detalle")
+def seccion_detalle(registro):
+    """Información detallada del último análisis"""
     st.markdown("### ℹ️ Información Detallada")
     detalles = {
         "Fecha del último análisis": registro['Fecha'],
@@ -339,6 +219,52 @@ with st.container():
         with col1 if i < len(detalles)//2 else col2:
             st.markdown(f"<div class='custom-metric'><b>{key}</b>: {value}</div>", unsafe_allow_html=True)
 
-    # Footer
-    st.markdown("---")
-    st.caption("Dashboard de mantenimiento predictivo - Actualizado en tiempo real") 
\ No newline at end of file
+@st.fragment
+@span("principal.equipo")
+def seccion_equipo():
+    """Selección de equipo y secciones que dependen de él.
+
+    Al ser un fragmento, un cambio en los selectores vuelve a ejecutar y enviar
+    solo este bloque, no el resto del script. Por eso toma las versiones vigentes en
+    cada ejecución: un rerun de solo este bloque también ve los datos y el modelo nuevos.
+    """
+    version, version_modelo = versiones()
+    df = cargar_catalogo(version)
+    modelo = cargar_modelo(version_modelo)
+
+    # Contenedor para filtros
+    with st.container():
+        st.markdown("### 🔍 Selección de Equipo")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            marca_options = sorted(df['Marca'].unique())
+            marca_sel = st.selectbox("Marca", marca_options)
+        with col2:
+            modelos_options = sorted(df[df['Marca'] == marca_sel]['Modelo'].unique())
+            modelo_sel = st.selectbox("Modelo", modelos_options)
+        with col3:
+            camiones_filtrados = sorted(df[(df['Marca'] == marca_sel) & (df['Modelo'] == modelo_sel)]['flota'].unique())
+            camion_sel = st.selectbox("Número de Camión", camiones_filtrados)
+
+    # Filtrar datos para el camión seleccionado (el filtro se aplica en la lectura del Parquet)
+    df_camion = cargar_datos(version, marca_sel, modelo_sel, camion_sel).sort_values('Fecha', ascending=False)
+    registro = df_camion.iloc[0]
+
+    seccion_kpis(df_camion)
+    seccion_alerta(registro)
+    seccion_tribologia(registro)
+    if modelo is not None:
+        predicciones = cargar_explicaciones(version, version_modelo)
+        seccion_prediccion(predicciones[predicciones["flota"] == camion_sel])
+    else:
+        seccion_prediccion(None)
+    seccion_impacto(registro)
+    seccion_detalle(registro)
+
+# Contenedor principal
+seccion_equipo()
+seccion_componentes()
+
+# Footer
+st.markdown("---")
+st.caption("Dashboard de mantenimiento predictivo - Actualizado en tiempo real")
@@ -0,0 +1,244 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+import plotly.express as px
+import numpy as np
+from datetime import datetime, timedelta
+from series_tiempo import historial_unidad
+from cuantiles import CUANTILES, lineas_base
+from recursos import (versiones, cargar_catalogo, cargar_indice_series, cargar_anomalias_detectadas,
+                      cargar_indice_cuantiles)
+from cache_figuras import figura_cacheada
+from metricas import span
+
+# Columnas que usa esta vista: se leen del almacén de series por camión
+COLUMNAS_TECNICO = [
+    "Fecha", "Componente", "Criticidad",
+    "Hierro (Fe) ppm", "Cobre (Cu) ppm", "Silicio (Si) ppm", "Aluminio (Al) ppm"
+]
+
+# El índice de series se comparte sin copiar entre sesiones y páginas: cada consulta
+# lo lee sin modificarlo y solo materializa el slice de la unidad
+def cargar_datos(version, marca, modelo, flota):
+    return historial_unidad(cargar_indice_series(version), flota, marca=marca, modelo=modelo,
+                            columnas=COLUMNAS_TECNICO)
+
+COMPONENTES = ["Motor", "Transmisión", "Diferencial", "Sistema Hidráulico"]
+
+# Las horas restantes son valores de referencia: se fijan por versión de datos
+# para que la tabla y el gráfico cacheado muestren lo mismo
+@st.cache_data
+def generar_predicciones(version):
+    return pd.DataFrame({
+        "Componente": COMPONENTES,
+        "Horas Restantes": np.random.randint(100, 5000, size=len(COMPONENTES)),
+        "Estado": ["Normal", "Precaución", "Normal", "Crítico"]
+    })
+
+# Versión de las secciones fuera del fragmento de la unidad
+version, _ = versiones()
+
+# Título principal
+st.title("⚙️ Dashboard Técnico de Mantenimiento")
+
+# ==============================
+# SECCIONES
+# ==============================
+# Cada sección recibe explícitamente sus entradas; solo las que dependen de la
+# unidad seleccionada se re-ejecutan al cambiar los selectores
+@span("tecnico.tribologia")
+def seccion_tribologia(df_unidad, filtros, version):
+    """Análisis tribológico de la última muestra de la unidad"""
+    st.markdown("### 🔬 Análisis Tribológico")
+
+    # Partículas metálicas
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("#### Concentración de Partículas Metálicas")
+        particulas = {
+            "Hierro (Fe)": {"valor": df_unidad["Hierro (Fe) ppm"].iloc[-1], "limite": 120},
+            "Cobre (Cu)": {"valor": df_unidad["Cobre (Cu) ppm"].iloc[-1], "limite": 40},
+            "Silicio (Si)": {"valor": df_unidad["Silicio (Si) ppm"].iloc[-1], "limite": 30}
+        }
+
+        # Agregar Aluminio solo si existe en el DataFrame
+        if "Aluminio (Al) ppm" in df_unidad.columns:
+            particulas["Aluminio (Al)"] = {"valor": df_unidad["Aluminio (Al) ppm"].iloc[-1], "limite": 25}
+
+        for elemento, datos in particulas.items():
+            valor = datos["valor"]
+            limite = datos["limite"]
+            estado = "normal" if valor < limite*0.7 else "warning" if valor < limite else "critical"
+
+            st.markdown(f"""
+            <div class="technical-container">
+                <h4>{elemento}</h4>
+                <p class="parameter-{estado}">{valor:.1f} ppm</p>
+                <p>Límite: {limite} ppm</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+    with col2:
+        # Gráfico de radar para partículas
+        categorias = list(particulas.keys())
+        valores = [datos["valor"]/datos["limite"]*100 for datos in particulas.values()]
+
+        def construir_radar():
+            fig_radar = go.Figure()
+            fig_radar.add_trace(go.Scatterpolar(
+                r=valores,
+                theta=categorias,
+                fill='toself',
+                name='Actual'
+            ))
+            fig_radar.update_layout(
+                polar=dict(
+                    radialaxis=dict(
+                        visible=True,
+                        range=[0, 150]
+                    )),
+                showlegend=False,
+                title="Análisis de Partículas (% del límite)"
+            )
+            return fig_radar
+
+        st.plotly_chart(figura_cacheada("tecnico.radar", filtros, version, construir_radar))
+
+@span("tecnico.tendencias")
+def seccion_tendencias(df_unidad, filtros, version):
+    """Tendencias de desgaste de la unidad"""
+    st.markdown("### 📈 Tendencias de Desgaste")
+    col1, col2 = st.columns(2)
+
+    def construir_tendencia(columna, titulo, limite):
+        fig = px.line(df_unidad, x="Fecha", y=columna, title=titulo)
+        fig.add_hline(y=limite, line_dash="dash", line_color="red",
+                      annotation_text="Límite crítico")
+        return fig
+
+    with col1:
+        # Gráfico de tendencia Fe
+        fig_fe = figura_cacheada("tecnico.fe", filtros, version, lambda: construir_tendencia(
+            "Hierro (Fe) ppm", "Tendencia de Hierro (Fe)", 120))
+        st.plotly_chart(fig_fe)
+
+    with col2:
+        # Gráfico de tendencia Cu
+        fig_cu = figura_cacheada("tecnico.cu", filtros, version, lambda: construir_tendencia(
+            "Cobre (Cu) ppm", "Tendencia de Cobre (Cu)", 40))
+        st.plotly_chart(fig_cu)
+
+@span("tecnico.anomalias")
+def seccion_anomalias(anomalias_unidad):
+    """Cambios bruscos o derivas de la unidad respecto de su propia historia"""
+    st.markdown("### 🧭 Cambios de Tendencia")
+    if anomalias_unidad.empty:
+        st.info("No se detectaron cambios de tendencia en esta unidad")
+        return
+    recientes = anomalias_unidad.head(10)
+    recientes = recientes.assign(Fecha=recientes["Fecha"].dt.strftime('%Y-%m-%d %H:%M'))
+    st.dataframe(recientes[["Fecha", "Componente", "Elemento", "Valor", "Media", "Desvios", "Tipo"]],
+                 hide_index=True, use_container_width=True)
+
+@span("tecnico.lineas_base")
+def seccion_lineas_base(df_unidad, modelo, version):
+    """Última muestra de la unidad frente a la distribución de su modelo y componente"""
+    componente = df_unidad["Componente"].iloc[-1]
+    st.markdown(f"### 📊 Línea Base de {modelo} - {componente}")
+    tabla = lineas_base(cargar_indice_cuantiles(version), modelo, componente)
+    tabla.insert(1, "Actual", [df_unidad[elemento].iloc[-1] if elemento in df_unidad.columns else np.nan
+                               for elemento in tabla["Elemento"]])
+    # Límites por percentil: propios del modelo y componente en vez de uno fijo para toda la flota
+    tabla["Estado"] = np.select([tabla["Actual"] > tabla["p99"], tabla["Actual"] > tabla["p95"]],
+                                ["Sobre p99", "Sobre p95"], "Normal")
+    st.dataframe(tabla.round({columna: 1 for columna in ["Actual", *CUANTILES]}),
+                 hide_index=True, use_container_width=True)
+
+@span("tecnico.estado_componentes")
+def seccion_estado_componentes(df_unidad):
+    """Estado de los componentes críticos de la unidad"""
+    st.markdown("### 🛠️ Estado de Componentes Críticos")
+    col1, col2, col3, col4 = st.columns(4)
+
+    for comp, col in zip(COMPONENTES, [col1, col2, col3, col4]):
+        with col:
+            # Calcular estado del componente basado en partículas y otros parámetros
+            estado = df_unidad[df_unidad["Componente"] == comp]["Criticidad"].iloc[-1] if not df_unidad[df_unidad["Componente"] == comp].empty else "Normal"
+            color = "normal" if estado == "Normal" else "warning" if estado == "Precaución" else "critical"
+
+            st.markdown(f"""
+            <div class="technical-container">
+                <h4>{comp}</h4>
+                <p class="parameter-{color.lower()}">{estado}</p>
+            </div>
+            """, unsafe_allow_html=True)
+
+@span("tecnico.prediccion")
+def seccion_prediccion():
+    """Predicción de vida útil de los componentes"""
+    st.markdown("### ⏳ Predicción de Vida Útil")
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Tabla de predicciones
+        predicciones = generar_predicciones(version)
+
+        st.dataframe(predicciones.style.apply(lambda x: [
+            f"background-color: {'#1e2530' if i%2==0 else '#2d3748'}; color: white" 
+            for i in range(len(x))
+        ], axis=0))
+
+    with col2:
+        # Gráfico de barras para horas restantes
+        fig_horas = figura_cacheada("tecnico.horas", (), version, lambda: px.bar(
+            predicciones, x="Componente", y="Horas Restantes",
+            color="Estado",
+            color_discrete_map={
+                "Normal": "#00cc66",
+                "Precaución": "#ffa600",
+                "Crítico": "#ff4b4b"
+            }))
+        st.plotly_chart(fig_horas)
+
+@st.fragment
+@span("tecnico.unidad")
+def seccion_unidad():
+    """Selección de unidad y secciones que dependen de ella.
+
+    Al ser un fragmento, un cambio en los selectores vuelve a ejecutar y enviar
+    solo este bloque, no el resto del script. Por eso toma la versión vigente en cada
+    ejecución: un rerun de solo este bloque también ve los datos nuevos.
+    """
+    version, _ = versiones()
+    df_catalogo = cargar_catalogo(version)
+
+    # Filtros superiores
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        marca_sel = st.selectbox("Marca", df_catalogo["Marca"].unique())
+    with col2:
+        modelo_sel = st.selectbox("Modelo", df_catalogo[df_catalogo["Marca"] == marca_sel]["Modelo"].unique())
+    with col3:
+        flota_sel = st.selectbox("Unidad", df_catalogo[(df_catalogo["Marca"] == marca_sel) & 
+                                                      (df_catalogo["Modelo"] == modelo_sel)]["flota"].unique())
+
+    # Historial de la unidad: un slice del almacén de series, no un filtro sobre la flota
+    df_unidad = cargar_datos(version, marca=marca_sel, modelo=modelo_sel, flota=flota_sel)
+
+    # Las figuras se cachean por (vista, filtro, versión de datos) entre sesiones
+    filtros = (marca_sel, modelo_sel, flota_sel)
+    seccion_tribologia(df_unidad, filtros, version)
+    seccion_tendencias(df_unidad, filtros, version)
+    seccion_lineas_base(df_unidad, modelo_sel, version)
+    anomalias = cargar_anomalias_detectadas(version)
+    seccion_anomalias(anomalias[(anomalias["flota"] == flota_sel) & (anomalias["Marca"] == marca_sel)
+                                & (anomalias["Modelo"] == modelo_sel)])
+    seccion_estado_componentes(df_unidad)
+
+seccion_unidad()
+seccion_prediccion()
+
+# Footer
+st.markdown("---")
+st.caption(f"Última actualización: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}") 
@@ -0,0 +1,302 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from acceso_datos import (DATA_PATH, CONFIABILIDAD_PATH, directorio_lotes, fecha_maxima, filas_datos,
+                          ruta_temporal, version_datos)
+from rollups import CUBO_PATH
+from criticidad import ESTADO_CRITICIDAD_PATH
+from alertas_activas import ALERTAS_PATH
+from series_tiempo import SERIES_PATH
+from anomalias import ANOMALIAS_PATH
+from cuantiles import BOCETOS_PATH
+from explicaciones import MODEL_PATH, PREDICCIONES_PATH, cargar_predicciones
+from entrenamiento import debe_reentrenar, entrenar_modelo
+from generdor import generar_pendientes
+from ingesta import reconstruir_indices
+from metricas import REGISTRO, contar, exportar_metricas
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+ESTADO_PLANIFICADOR_PATH = "data/estado_planificador.json"
+SNAPSHOT_PATH = "data/snapshot.json"
+
+# Grafo de trabajos. Un trabajo corre en cuanto todas sus dependencias terminaron con una
+# versión que aún no procesó; los trabajos raíz se disparan cada `cada` segundos o al
+# cambiar un archivo de `vigilar` (p. ej. un informe de laboratorio importado a mano, que
+# agrega un lote al directorio de lotes).
+# `proceso` manda los pasos intensivos en CPU al pool de procesos; `parametros` se pasan al paso
+TRABAJOS = {
+    "ingesta": {"depende": [], "cada": 3600, "vigilar": [DATA_PATH, directorio_lotes(DATA_PATH)],
+                "proceso": True},
+    "rollups": {"depende": ["ingesta"], "proceso": True},
+    "entrenamiento": {"depende": ["rollups"], "proceso": True, "parametros": {"intervalo_minimo": 7200}},
+    "puntuacion": {"depende": ["entrenamiento"], "proceso": True},
+    "snapshot": {"depende": ["puntuacion"], "proceso": False}
+}
+
+PROCESOS = 2            # tamaño del pool de procesos
+MAX_CONCURRENCIA = 2    # trabajos ejecutándose a la vez
+SONDEO = 30             # segundos entre revisiones de disparadores por tiempo y archivos
+REINTENTO = 300         # segundos antes de reintentar un trabajo que falló
+
+# Artefactos cuya versión queda registrada en cada snapshot publicado
+ARTEFACTOS = [DATA_PATH, CONFIABILIDAD_PATH, CUBO_PATH, ESTADO_CRITICIDAD_PATH, ALERTAS_PATH,
+              SERIES_PATH, ANOMALIAS_PATH, BOCETOS_PATH, MODEL_PATH, PREDICCIONES_PATH]
+
+# ==============================
+# PASOS
+# ==============================
+# Funciones de nivel de módulo: se ejecutan en los procesos del pool y devuelven un
+# resumen serializable. Si el resumen trae "cambios": False los dependientes no se disparan
+def ingerir():
+    """Genera los días pendientes; hay cambios si los datos difieren del último snapshot.
+
+    Cada día pasa por ingesta.ingerir_lote, que ya adopta en el almacén lo publicado que le falte.
+    """
+    dias = generar_pendientes()
+    publicado = leer_snapshot().get("version_datos")
+    return {"dias": dias, "cambios": os.path.exists(DATA_PATH) and version_datos() != publicado}
+
+def actualizar_derivados():
+    """Reconstruye las estructuras derivadas que no estén al día con los datos"""
+    reconstruir_indices()
+    return {"version_datos": version_datos()}
+
+def reentrenar(intervalo_minimo=0):
+    """Reentrena si hay datos más nuevos que el modelo y este tiene al menos `intervalo_minimo` segundos"""
+    if not debe_reentrenar():
+        return {"reentrenado": False}
+    if os.path.exists(MODEL_PATH) and time.time() - os.path.getmtime(MODEL_PATH) < intervalo_minimo:
+        return {"reentrenado": False}
+    entrenar_modelo()
+    if debe_reentrenar():
+        raise RuntimeError("El entrenamiento no produjo un modelo vigente")
+    return {"reentrenado": True}
+
+def puntuar():
+    """Predicciones explicadas de la flota, vueltas a calcular solo si son más viejas que datos o modelo"""
+    if not os.path.exists(MODEL_PATH):
+        return {"predicciones": 0}
+    return {"predicciones": len(cargar_predicciones())}
+
+def publicar_snapshot(ruta=SNAPSHOT_PATH):
+    """Registra la versión de cada artefacto de una corrida completa del pipeline"""
+    snapshot = {
+        "publicado": datetime.now().isoformat(timespec="seconds"),
+        "version_datos": version_datos(),
+        "registros": filas_datos(),
+        "fecha_maxima": str(fecha_maxima()),
+        "artefactos": {artefacto: version_datos(artefacto) for artefacto in ARTEFACTOS
+                       if os.path.exists(artefacto)}
+    }
+    _escribir_json(snapshot, ruta)
+    return {"registros": snapshot["registros"]}
+
+PASOS = {
+    "ingesta": ingerir,
+    "rollups": actualizar_derivados,
+    "entrenamiento": reentrenar,
+    "puntuacion": puntuar,
+    "snapshot": publicar_snapshot
+}
+
+def ejecutar_paso(nombre, parametros):
+    return PASOS[nombre](**parametros) or {}
+
+# ==============================
+# PERSISTENCIA
+# ==============================
+def _escribir_json(datos, ruta):
+    # Temporal propio del proceso e hilo, como escribir_parquet: dos escrituras no se pisan
+    ruta_tmp = ruta_temporal(ruta)
+    with open(ruta_tmp, "w", encoding="utf-8") as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+    os.replace(ruta_tmp, ruta)
+
+def _leer_json(ruta):
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+def leer_snapshot(ruta=SNAPSHOT_PATH):
+    return _leer_json(ruta)
+
+# ==============================
+# PLANIFICADOR
+# ==============================
+def validar_grafo(trabajos):
+    """Orden topológico de los trabajos; falla si hay dependencias desconocidas o ciclos"""
+    orden, visitados = [], {}
+
+    def visitar(nombre, camino):
+        if visitados.get(nombre) == "listo":
+            return
+        if visitados.get(nombre) == "visitando":
+            raise ValueError(f"Ciclo en el grafo de trabajos: {' -> '.join(camino + [nombre])}")
+        if nombre not in trabajos:
+            raise ValueError(f"Dependencia desconocida: {nombre}")
+        visitados[nombre] = "visitando"
+        for dependencia in trabajos[nombre].get("depende", []):
+            visitar(dependencia, camino + [nombre])
+        visitados[nombre] = "listo"
+        orden.append(nombre)
+
+    for nombre in trabajos:
+        visitar(nombre, [])
+    return orden
+
+class Planificador:
+    """Ejecuta el grafo de trabajos dentro de un único bucle asyncio.
+
+    Cada trabajo guarda una versión que aumenta al terminar con cambios y las versiones
+    de sus dependencias que ya procesó; el estado se persiste en cada transición, así que
+    un reinicio retoma el pipeline donde quedó. Un trabajo no arranca mientras corre una
+    de sus dependencias o de sus dependientes: el entrenamiento nunca lee datos a medio
+    escribir y la ingesta no compite con la reconstrucción de los índices.
+    """
+
+    def __init__(self, trabajos=TRABAJOS, procesos=PROCESOS, max_concurrencia=MAX_CONCURRENCIA,
+                 ruta_estado=ESTADO_PLANIFICADOR_PATH):
+        self.trabajos = trabajos
+        self.orden = validar_grafo(trabajos)
+        self.procesos = procesos
+        self.max_concurrencia = max_concurrencia
+        self.ruta_estado = ruta_estado
+        self.en_curso = set()
+
+        previo = _leer_json(ruta_estado).get("trabajos", {})
+        self.estado = {nombre: {"version": 0, "entradas": {}, **previo.get(nombre, {})} for nombre in trabajos}
+        for estado in self.estado.values():
+            if estado.get("resultado") == "en curso":
+                estado["resultado"] = "interrumpido"
+
+    def _guardar_estado(self):
+        os.makedirs(os.path.dirname(self.ruta_estado) or ".", exist_ok=True)
+        _escribir_json({"trabajos": self.estado}, self.ruta_estado)
+
+    def _vecinos(self, nombre):
+        dependientes = [otro for otro, trabajo in self.trabajos.items() if nombre in trabajo.get("depende", [])]
+        return set(self.trabajos[nombre].get("depende", [])) | set(dependientes)
+
+    def _disparado(self, nombre, ahora):
+        """Indica si un trabajo tiene entradas nuevas o le tocó por tiempo o por archivo"""
+        trabajo, estado = self.trabajos[nombre], self.estado[nombre]
+        fin = datetime.fromisoformat(estado["fin"]).timestamp() if estado.get("fin") else None
+        if fin is not None and estado.get("resultado") == "error" and ahora - fin < REINTENTO:
+            return False
+
+        dependencias = trabajo.get("depende", [])
+        if dependencias:
+            return all(self.estado[d]["version"] > 0 for d in dependencias) and \
+                any(self.estado[d]["version"] != estado["entradas"].get(d) for d in dependencias)
+        if fin is None or estado.get("resultado") in ("error", "interrumpido"):
+            return True
+        if trabajo.get("cada") is not None and ahora - fin >= trabajo["cada"]:
+            return True
+        return any(os.path.exists(ruta) and os.path.getmtime(ruta) > fin for ruta in trabajo.get("vigilar", []))
+
+    def listos(self, ahora=None, forzados=(), raices=True):
+        """Trabajos disparados (o forzados) que no chocan con uno en curso, en orden topológico"""
+        ahora = time.time() if ahora is None else ahora
+        return [
+            nombre for nombre in self.orden
+            if nombre not in self.en_curso and not self._vecinos(nombre) & self.en_curso
+            and (nombre in forzados or ((raices or self.trabajos[nombre].get("depende"))
+                                        and self._disparado(nombre, ahora)))
+        ]
+
+    async def _correr(self, nombre, pool, semaforo):
+        trabajo, estado = self.trabajos[nombre], self.estado[nombre]
+        # Versiones de las dependencias tal como estaban al lanzar el trabajo
+        entradas = {d: self.estado[d]["version"] for d in trabajo.get("depende", [])}
+        try:
+            async with semaforo:
+                estado.update(resultado="en curso", inicio=datetime.now().isoformat(timespec="seconds"))
+                self._guardar_estado()
+                print(f"▶️ {nombre}")
+                inicio = time.perf_counter()
+                parametros = trabajo.get("parametros", {})
+                error = None
+                try:
+                    if trabajo.get("proceso"):
+                        detalle = await asyncio.get_running_loop().run_in_executor(
+                            pool, ejecutar_paso, nombre, parametros)
+                    else:
+                        detalle = await asyncio.to_thread(ejecutar_paso, nombre, parametros)
+                except Exception as e:
+                    error = e
+                segundos = time.perf_counter() - inicio
+                REGISTRO.observar(f"planificador.{nombre}", segundos, error is not None)
+
+                if error is None:
+                    if detalle.get("cambios", True):
+                        estado["version"] += 1
+                    estado.update(resultado="ok", error=None, entradas=entradas, detalle=detalle)
+                    print(f"✅ {nombre} en {round(segundos, 2)} segundos: {detalle}")
+                else:
+                    estado.update(resultado="error", error=str(error))
+                    contar("flota_planificador_errores_total", trabajo=nombre)
+                    print(f"❌ {nombre}: {error}")
+                estado.update(fin=datetime.now().isoformat(timespec="seconds"), duracion=round(segundos, 3))
+                self._guardar_estado()
+                exportar_metricas("planificador")
+        finally:
+            self.en_curso.discard(nombre)
+
+    async def ejecutar(self, una_vez=False):
+        """Bucle del demonio. Con `una_vez` corre los trabajos raíz y lo que disparen, y termina"""
+        semaforo = asyncio.Semaphore(self.max_concurrencia)
+        # Con una_vez los trabajos raíz corren una sola vez, sin esperar a sus disparadores
+        forzados = {nombre for nombre in self.orden if una_vez and not self.trabajos[nombre].get("depende")}
+        # spawn: los procesos del pool no heredan el bucle de eventos ni los hilos del padre
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.procesos, mp_context=contexto) as pool:
+            tareas = set()
+            while True:
+                for nombre in self.listos(forzados=forzados, raices=not una_vez):
+                    # Uno lanzado en esta misma vuelta puede bloquear a otro de la lista
+                    if self._vecinos(nombre) & self.en_curso:
+                        continue
+                    forzados.discard(nombre)
+                    self.en_curso.add(nombre)
+                    tareas.add(asyncio.create_task(self._correr(nombre, pool, semaforo)))
+                if una_vez and not tareas:
+                    return
+                if tareas:
+                    _, tareas = await asyncio.wait(tareas, timeout=SONDEO, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    await asyncio.sleep(SONDEO)
+
+def _configuracion(ruta):
+    """TRABAJOS con los cambios de un archivo JSON, p. ej. {"ingesta": {"cada": 600}}"""
+    trabajos = {nombre: dict(trabajo) for nombre, trabajo in TRABAJOS.items()}
+    for nombre, cambios in _leer_json(ruta).items() if ruta else []:
+        trabajos.setdefault(nombre, {"depende": []}).update(cambios)
+    return trabajos
+
+# ==============================
+# LÍNEA DE COMANDOS
+# ==============================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Demonio que coordina ingesta, índices, entrenamiento, "
+                                                 "puntuación y publicación de la flota")
+    parser.add_argument("--config", default=None, help="JSON con cambios a los disparadores y parámetros")
+    parser.add_argument("--procesos", type=int, default=PROCESOS, help="Procesos para los pasos intensivos en CPU")
+    parser.add_argument("--concurrencia", type=int, default=MAX_CONCURRENCIA, help="Trabajos simultáneos")
+    parser.add_argument("--una-vez", action="store_true", help="Corre el pipeline una vez y termina")
+    args = parser.parse_args()
+
+    os.makedirs("data", exist_ok=True)
+    planificador = Planificador(_configuracion(args.config), args.procesos, args.concurrencia)
+    print(f"🗓️ Trabajos: {' -> '.join(planificador.orden)}")
+    try:
+        asyncio.run(planificador.ejecutar(una_vez=args.una_vez))
+    except KeyboardInterrupt:
+        print("\nPlanificador detenido por el usuario.")
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+from metricas import span
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+TRAYECTORIAS = 20000
+HORIZONTE_DIAS = 90
+PERCENTILES = [10, 50, 90]
+
+# ==============================
+# ESTADÍSTICAS OBSERVADAS
+# ==============================
+def estadisticas_fallas(df):
+    """Resume el histórico filtrado en las distribuciones que alimentan la simulación"""
+    fallas = df["Criticidad"] == "Critico"
+    fechas = pd.to_datetime(df["Fecha"])
+    dias = fechas.dt.normalize().nunique()
+    return {
+        "muestras_por_dia": int(round(len(df) / dias)) if dias else 0,
+        "fallas": int(fallas.sum()),
+        "registros": int(len(df)),
+        "horas_parada": float(df["Tiempo Parada"].sum()),
+        "paradas_falla": df.loc[fallas, "Tiempo Parada"].to_numpy(dtype=np.float64),
+        "parada_normal_media": float(df.loc[~fallas, "Tiempo Parada"].mean()) if (~fallas).any() else 0.0,
+        "fecha_fin": fechas.max()
+    }
+
+# ==============================
+# SIMULACIÓN
+# ==============================
+def simular_costos(estadisticas, costo_hora, costo_correctivo, dias=HORIZONTE_DIAS,
+                   trayectorias=TRAYECTORIAS, semilla=42):
+    """Simula el costo diario de todas las trayectorias a la vez y devuelve el costo acumulado.
+
+    Por trayectoria se muestrea una tasa de falla de su distribución Beta posterior
+    (capturando la incertidumbre de la estimación), luego las fallas diarias con una
+    binomial y la duración de cada falla remuestreando los tiempos de parada observados.
+    Las paradas no críticas se valoran con su promedio. Devuelve una matriz
+    trayectorias × días con el costo acumulado en USD.
+    """
+    rng = np.random.default_rng(semilla)
+    muestras = estadisticas["muestras_por_dia"]
+    paradas = estadisticas["paradas_falla"]
+    if muestras == 0:
+        return np.zeros((trayectorias, dias))
+
+    tasa = rng.beta(1 + estadisticas["fallas"],
+                    1 + estadisticas["registros"] - estadisticas["fallas"],
+                    size=(trayectorias, 1))
+    fallas = rng.binomial(muestras, tasa, size=(trayectorias, dias))
+
+    # Las duraciones de todas las fallas se muestrean en un solo vector y se suman
+    # por celda (trayectoria, día) con reduceat sobre los desplazamientos acumulados
+    horas_falla = np.zeros(fallas.size)
+    total_fallas = int(fallas.sum())
+    if total_fallas and len(paradas):
+        duraciones = rng.choice(paradas, size=total_fallas)
+        conteos = fallas.ravel()
+        con_fallas = conteos > 0
+        inicios = np.concatenate([[0], np.cumsum(conteos)[:-1]])
+        horas_falla[con_fallas] = np.add.reduceat(duraciones, inicios[con_fallas])
+    horas_falla = horas_falla.reshape(fallas.shape)
+
+    horas_normales = (muestras - fallas) * estadisticas["parada_normal_media"]
+    costo_diario = (horas_falla + horas_normales) * costo_hora + fallas * costo_correctivo
+    return np.cumsum(costo_diario, axis=1)
+
+def bandas_costos(costo_acumulado, fecha_inicio, percentiles=PERCENTILES):
+    """Percentiles diarios del costo acumulado, como DataFrame listo para graficar"""
+    bandas = np.percentile(costo_acumulado, percentiles, axis=0)
+    fechas = pd.date_range(pd.Timestamp(fecha_inicio).normalize() + pd.Timedelta(days=1),
+                           periods=costo_acumulado.shape[1], freq="D")
+    return pd.DataFrame({"Fecha": fechas, **{f"P{p}": banda for p, banda in zip(percentiles, bandas)}})
+
+def proyectar_costos(df, costo_hora, costo_correctivo, dias=HORIZONTE_DIAS,
+                     trayectorias=TRAYECTORIAS, semilla=42):
+    """Proyección de costos del filtro: bandas diarias y percentiles a 30 y 90 días"""
+    return proyectar_estadisticas(estadisticas_fallas(df), costo_hora, costo_correctivo,
+                                  dias, trayectorias, semilla)
+
+@span("costos.proyectar")
+def proyectar_estadisticas(estadisticas, costo_hora, costo_correctivo, dias=HORIZONTE_DIAS,
+                           trayectorias=TRAYECTORIAS, semilla=42):
+    """Proyección a partir de estadísticas ya resumidas (por pandas o por el motor SQL)"""
+    costo_acumulado = simular_costos(estadisticas, costo_hora, costo_correctivo,
+                                     dias, trayectorias, semilla)
+    bandas = bandas_costos(costo_acumulado, estadisticas["fecha_fin"])
+    resumen = {
+        horizonte: bandas.iloc[horizonte - 1][[f"P{p}" for p in PERCENTILES]].to_dict()
+        for horizonte in (30, 90) if horizonte <= dias
+    }
+    return bandas, resumen
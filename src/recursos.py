@@ -0,0 +1,130 @@
+import functools
+import os
+import threading
+import joblib
+import streamlit as st
+from acceso_datos import leer_catalogo, version_datos
+from rollups import cargar_cubo, indexar_cubo
+from criticidad import cargar_estado_criticidad, indexar_matrices
+from alertas_activas import cargar_indice_alertas, indexar_alertas
+from series_tiempo import cargar_series, indexar_series
+from anomalias import cargar_anomalias
+from cuantiles import cargar_bocetos, indexar_bocetos
+from explicaciones import MODEL_PATH, cargar_predicciones
+from cache_figuras import CACHE_FIGURAS
+from metricas import contar, span
+
+# ==============================
+# RECURSOS COMPARTIDOS
+# ==============================
+def recurso(cache):
+    """Cachea un cargador con `cache` (st.cache_data o st.cache_resource) y cuenta su uso.
+
+    Cada llamada suma a flota_recursos_pedidos_total y cada ejecución real del cargador
+    a flota_recursos_cargas_total: los pedidos que no cargan son aciertos del caché.
+    """
+    def decorador(cargador):
+        nombre = cargador.__name__
+
+        @functools.wraps(cargador)
+        def cargar(*args):
+            contar("flota_recursos_cargas_total", recurso=nombre)
+            return cargador(*args)
+
+        cacheado = cache(cargar)
+
+        @functools.wraps(cargador)
+        def pedir(*args):
+            contar("flota_recursos_pedidos_total", recurso=nombre)
+            return cacheado(*args)
+
+        pedir.clear = cacheado.clear
+        return pedir
+    return decorador
+
+# Todas las páginas corren en el mismo proceso y leen datos, índices y modelo de
+# estas funciones: cada estructura se carga una sola vez por versión, sin importar
+# cuántas páginas o sesiones la usen. Los índices que solo se consultan se comparten
+# sin copiar (cache_resource)
+@recurso(st.cache_data(ttl=300))
+def cargar_catalogo(version):
+    return leer_catalogo()
+
+@recurso(st.cache_data(ttl=300))
+def cargar_cubo_kpi(version):
+    return indexar_cubo(cargar_cubo())
+
+@recurso(st.cache_data(ttl=300))
+def cargar_matrices_criticidad(version):
+    return indexar_matrices(cargar_estado_criticidad())
+
+@recurso(st.cache_data(ttl=300))
+def cargar_alertas(version):
+    return indexar_alertas(cargar_indice_alertas())
+
+@recurso(st.cache_resource(ttl=300))
+def cargar_indice_series(version):
+    return indexar_series(cargar_series())
+
+# Anomalías ya detectadas al ingerir cada lote: la vista técnica filtra la unidad y la
+# ejecutiva las indexa igual que las alertas, por (Marca, Modelo)
+@recurso(st.cache_data(ttl=300))
+def cargar_anomalias_detectadas(version):
+    return cargar_anomalias()
+
+@recurso(st.cache_data(ttl=300))
+def cargar_indice_anomalias(version):
+    return indexar_alertas(cargar_anomalias_detectadas(version))
+
+@recurso(st.cache_resource(ttl=300))
+def cargar_indice_cuantiles(version):
+    return indexar_bocetos(cargar_bocetos())
+
+@recurso(st.cache_resource(ttl=300))
+def cargar_modelo(version_modelo):
+    """Modelo de criticidad entrenado, o None si no hay uno que se pueda cargar"""
+    if version_modelo is None:
+        return None
+    try:
+        with span("modelo.cargar"):
+            return joblib.load(MODEL_PATH)
+    except Exception as e:
+        st.warning(f"No se pudo cargar el modelo: {e}")
+        return None
+
+# Predicciones de toda la flota con sus factores, calculadas en lote tras cada entrenamiento
+@recurso(st.cache_data(ttl=300))
+def cargar_explicaciones(version, version_modelo):
+    return cargar_predicciones(pipeline=cargar_modelo(version_modelo))
+
+# Recursos indexados por versión. No se vacía todo cache_resource: ahí vive también
+# la tarea de generación inicial de arranque.py
+RECURSOS_VERSIONADOS = [cargar_indice_series, cargar_indice_cuantiles, cargar_modelo]
+
+# ==============================
+# INVALIDACIÓN
+# ==============================
+_vigentes = {"versiones": None}
+_lock = threading.Lock()
+
+def version_modelo():
+    return os.path.getmtime(MODEL_PATH) if os.path.exists(MODEL_PATH) else None
+
+def versiones():
+    """(versión de datos, versión del modelo) vigentes, las claves de todos los cachés.
+
+    Es el único punto de invalidación: cuando cambia alguna se descartan de una vez
+    las entradas de la versión anterior (datos de todas las páginas, índices, modelo y
+    figuras), en lugar de dejarlas ocupando memoria hasta que venza su TTL.
+    """
+    actuales = (version_datos(), version_modelo())
+    with _lock:
+        if _vigentes["versiones"] not in (None, actuales):
+            # Todas las entradas de st.cache_data están indexadas por versión
+            st.cache_data.clear()
+            for cargador in RECURSOS_VERSIONADOS:
+                cargador.clear()
+            CACHE_FIGURAS.limpiar()
+            contar("flota_invalidaciones_total")
+        _vigentes["versiones"] = actuales
+    return actuales
@@ -3,8 +3,5 @@
 # Crear directorio data dentro de src si no existe
 mkdir -p src/data
 
-# Generar datos iniciales
-python data_generator.py
-
-# Iniciar la aplicación
-streamlit run app.py 
\ No newline at end of file
+# Iniciar la aplicación (si no hay datos, se generan en segundo plano al arrancar)
+streamlit run app.py 
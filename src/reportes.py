@@ -0,0 +1,239 @@
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from html import escape
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs
+from acceso_datos import leer_datos
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+DIRECTORIO_REPORTES = "reportes"
+PLOTLY_JS = "plotly.min.js"
+
+COLUMNAS_REPORTE = [
+    "Fecha", "flota", "Marca", "Modelo", "Componente", "Aceite Lubricante", "Criticidad",
+    "Disponibilidad", "Tiempo Parada", "Hierro (Fe) ppm", "Cobre (Cu) ppm", "Silicio (Si) ppm"
+]
+
+COLORES_CRITICIDAD = {"Normal": "#2ca02c", "Atencion": "#ffbb78", "Critico": "#d62728"}
+
+# Etiqueta de los registros sin Marca o Modelo (p. ej. importados antes de validarlos)
+SIN_IDENTIFICAR = "Sin identificar"
+
+PLANTILLA = """<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <title>{titulo}</title>
+    <script src="{plotly_js}"></script>
+    <style>
+        body {{ font-family: Arial, sans-serif; padding: 20px; background-color: #f9f9f9; }}
+        h1, h2 {{ color: #333; text-align: center; }}
+        .plotly-graph-div {{ margin-bottom: 50px; }}
+        nav {{ text-align: center; margin-bottom: 20px; }}
+        table {{ margin: 0 auto 40px auto; border-collapse: collapse; }}
+        td, th {{ padding: 4px 10px; border-bottom: 1px solid #ddd; }}
+    </style>
+</head>
+<body>
+<nav>{navegacion}</nav>
+<h1>{titulo}</h1>
+<p style="text-align: center;">Generado el {generado}</p>
+{contenido}
+</body>
+</html>
+"""
+
+# ==============================
+# UTILIDADES
+# ==============================
+def nombre_archivo(prefijo, nombre):
+    """Nombre de archivo seguro para un modelo o camión"""
+    return f"{prefijo}_{re.sub(r'[^A-Za-z0-9]+', '_', str(nombre)).strip('_')}.html"
+
+def identificar_modelos(df):
+    """Rotula Marca y Modelo faltantes: los reportes agrupan y enlazan por esas columnas.
+
+    El modelo faltante lleva la marca, así cada marca tiene su propio reporte sin modelo.
+    """
+    marca = df["Marca"].fillna(SIN_IDENTIFICAR)
+    return df.assign(Marca=marca, Modelo=df["Modelo"].fillna(marca + " (sin modelo)"))
+
+def _html_figura(fig):
+    # plotly.js no se incrusta en cada figura: todas las páginas usan el archivo compartido
+    return fig.to_html(full_html=False, include_plotlyjs=False)
+
+def _pagina(titulo, secciones, navegacion):
+    contenido = "\n".join(f"<h2>{escape(subtitulo)}</h2>\n{html}" for subtitulo, html in secciones)
+    return PLANTILLA.format(titulo=escape(titulo), plotly_js=PLOTLY_JS, navegacion=navegacion,
+                            generado=datetime.now().strftime("%Y-%m-%d %H:%M"), contenido=contenido)
+
+def _tabla_enlaces(filas, encabezados):
+    cuerpo = "\n".join(
+        "<tr>" + "".join(f"<td>{celda}</td>" for celda in fila) + "</tr>" for fila in filas
+    )
+    cabecera = "".join(f"<th>{escape(h)}</th>" for h in encabezados)
+    return f"<table><tr>{cabecera}</tr>\n{cuerpo}</table>"
+
+# ==============================
+# REPORTES
+# ==============================
+def reporte_flota(df):
+    """Resumen general de la flota, con los gráficos del antiguo graficos.html calculados desde los datos"""
+    df = identificar_modelos(df)
+    dia = df["Fecha"].dt.normalize()
+    criticos = df["Criticidad"] == "Critico"
+    secciones = [
+        ("1. Disponibilidad promedio por marca", px.bar(
+            df.groupby("Marca", as_index=False)["Disponibilidad"].mean().assign(
+                Disponibilidad=lambda d: d["Disponibilidad"] * 100),
+            x="Marca", y="Disponibilidad", title="Disponibilidad Promedio por Marca (%)")),
+        ("2. Distribución de criticidad", px.bar(
+            df["Criticidad"].value_counts().rename_axis("Criticidad").reset_index(name="Registros"),
+            x="Criticidad", y="Registros", color="Criticidad",
+            color_discrete_map=COLORES_CRITICIDAD, title="Distribución de Criticidad")),
+        ("3. Tiempo promedio de parada por marca", px.bar(
+            df.groupby("Marca", as_index=False)["Tiempo Parada"].mean(),
+            x="Marca", y="Tiempo Parada", title="Tiempo Promedio de Parada por Marca (horas)")),
+        ("4. Componentes más frecuentes con falla", px.bar(
+            df.loc[criticos, "Componente"].value_counts().head(5).rename_axis("Componente")
+            .reset_index(name="Fallas"),
+            x="Fallas", y="Componente", orientation="h",
+            title="Top 5 Componentes con Mayor Incidencia de Falla")),
+        ("5. Tendencia diaria de disponibilidad", px.line(
+            df.groupby(dia)["Disponibilidad"].mean().mul(100).rename_axis("Fecha").reset_index(),
+            x="Fecha", y="Disponibilidad", title="Tendencia Diaria de Disponibilidad (%)")),
+        ("6. Relación criticidad vs disponibilidad", px.bar(
+            df.groupby("Criticidad", as_index=False)["Disponibilidad"].mean().assign(
+                Disponibilidad=lambda d: d["Disponibilidad"] * 100),
+            x="Criticidad", y="Disponibilidad", color="Criticidad",
+            color_discrete_map=COLORES_CRITICIDAD, title="Disponibilidad según Nivel de Criticidad")),
+        ("7. Uso de aceites por componente", px.bar(
+            df.groupby(["Componente", "Aceite Lubricante"]).size().reset_index(name="Registros"),
+            x="Componente", y="Registros", color="Aceite Lubricante", barmode="stack",
+            title="Uso de Aceites por Componente")),
+        ("8. Porcentaje de camiones críticos por marca", px.bar(
+            criticos.groupby(df["Marca"]).mean().mul(100).rename_axis("Marca").reset_index(name="Críticos (%)"),
+            x="Marca", y="Críticos (%)", title="Porcentaje de Registros Críticos por Marca (%)"))
+    ]
+    secciones = [(titulo, _html_figura(fig)) for titulo, fig in secciones]
+
+    modelos = df[["Marca", "Modelo"]].drop_duplicates().sort_values(["Marca", "Modelo"])
+    enlaces = [
+        (escape(marca), f'<a href="{nombre_archivo("modelo", modelo)}">{escape(modelo)}</a>')
+        for marca, modelo in modelos.itertuples(index=False)
+    ]
+    secciones.append(("Reportes por modelo", _tabla_enlaces(enlaces, ["Marca", "Modelo"])))
+    return _pagina("Reporte de Disponibilidad - Flota de Camiones", secciones, "")
+
+def reporte_modelo(marca, modelo, df):
+    """Reporte de un modelo: KPIs, tendencia, criticidad por unidad y enlaces a cada camión"""
+    dia = df["Fecha"].dt.normalize()
+    tendencia = df.groupby(dia)["Disponibilidad"].mean().rename_axis("Fecha").reset_index()
+    estado = df.sort_values("Fecha").drop_duplicates(["flota", "Componente"], keep="last")
+    matriz = estado.pivot(index="flota", columns="Componente", values="Criticidad")
+
+    fig_tendencia = px.line(tendencia, x="Fecha", y="Disponibilidad", title="Evolución de Disponibilidad")
+    fig_matriz = go.Figure(go.Heatmap(
+        z=matriz.replace({"Normal": 0, "Atencion": 1, "Critico": 2}).astype(float).to_numpy(),
+        x=list(matriz.columns), y=list(matriz.index), zmin=0, zmax=2,
+        colorscale=[[0, "green"], [0.5, "yellow"], [1, "red"]]))
+    fig_matriz.update_layout(title="Estado de Componentes por Unidad", height=max(400, 18 * len(matriz)))
+
+    resumen = df.groupby("flota").agg(**{
+        "Registros": ("Fecha", "size"),
+        "Disponibilidad": ("Disponibilidad", "mean"),
+        "Fallas": ("Criticidad", lambda c: int((c == "Critico").sum()))
+    })
+    filas = [
+        (f'<a href="{nombre_archivo("camion", flota)}">{escape(str(flota))}</a>',
+         fila.Registros, f"{fila.Disponibilidad * 100:.1f}%", fila.Fallas)
+        for flota, fila in resumen.iterrows()
+    ]
+    secciones = [
+        ("Tendencia de disponibilidad", _html_figura(fig_tendencia)),
+        ("Mapa de criticidad", _html_figura(fig_matriz)),
+        ("Unidades", _tabla_enlaces(filas, ["Camión", "Registros", "Disponibilidad", "Fallas"]))
+    ]
+    return _pagina(f"{marca} - {modelo}", secciones, '<a href="index.html">Flota</a>')
+
+def reporte_camion(flota, modelo, df):
+    """Reporte de un camión: tendencias de desgaste, disponibilidad y criticidad por componente"""
+    df = df.sort_values("Fecha")
+    secciones = []
+    for columna, limite in (("Hierro (Fe) ppm", 120), ("Cobre (Cu) ppm", 40), ("Silicio (Si) ppm", 30)):
+        if columna in df.columns:
+            fig = px.line(df, x="Fecha", y=columna, title=f"Tendencia de {columna}")
+            fig.add_hline(y=limite, line_dash="dash", line_color="red", annotation_text="Límite crítico")
+            secciones.append((columna, _html_figura(fig)))
+    secciones.append(("Disponibilidad", _html_figura(
+        px.line(df, x="Fecha", y="Disponibilidad", title="Disponibilidad por muestra"))))
+    secciones.append(("Criticidad por componente", _html_figura(px.scatter(
+        df, x="Fecha", y="Componente", color="Criticidad",
+        color_discrete_map=COLORES_CRITICIDAD, title="Historial de Criticidad"))))
+    navegacion = f'<a href="index.html">Flota</a> | <a href="{nombre_archivo("modelo", modelo)}">{escape(modelo)}</a>'
+    return _pagina(f"Camión {flota}", secciones, navegacion)
+
+# ==============================
+# GENERACIÓN EN PARALELO
+# ==============================
+def _renderizar(tarea):
+    """Trabajo de un proceso del pool: construye una página y la escribe en disco.
+
+    Devuelve (ruta, error): una página que falla se informa sin cortar el resto del lote.
+    """
+    ruta, funcion, argumentos = tarea
+    try:
+        html = funcion(*argumentos)
+    except Exception as e:
+        return ruta, f"{type(e).__name__}: {e}"
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(html)
+    return ruta, None
+
+def generar_reportes(directorio=DIRECTORIO_REPORTES, procesos=None, camiones=True):
+    """Lee los datos una vez y genera el índice de flota, un reporte por modelo y uno por camión"""
+    inicio = time.time()
+    os.makedirs(directorio, exist_ok=True)
+
+    # plotly.js se escribe una sola vez y todas las páginas lo referencian de forma relativa,
+    # así el paquete funciona sin acceso a la red
+    with open(os.path.join(directorio, PLOTLY_JS), "w", encoding="utf-8") as f:
+        f.write(get_plotlyjs())
+
+    df = identificar_modelos(leer_datos(COLUMNAS_REPORTE))
+    tareas = [(os.path.join(directorio, "index.html"), reporte_flota, (df,))]
+    for (marca, modelo), grupo in df.groupby(["Marca", "Modelo"]):
+        tareas.append((os.path.join(directorio, nombre_archivo("modelo", modelo)),
+                       reporte_modelo, (marca, modelo, grupo)))
+    if camiones:
+        # Cada camión tiene un único reporte con todo su historial, enlazado a su modelo más reciente
+        for flota, grupo in df.groupby("flota"):
+            modelo = grupo["Modelo"].iloc[grupo["Fecha"].argmax()]
+            tareas.append((os.path.join(directorio, nombre_archivo("camion", flota)),
+                           reporte_camion, (flota, modelo, grupo)))
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        resultados = list(pool.map(_renderizar, tareas, chunksize=8))
+
+    rutas = [ruta for ruta, error in resultados if error is None]
+    for ruta, error in resultados:
+        if error is not None:
+            print(f"❌ No se pudo generar {ruta}: {error}")
+    print(f"📄 {len(rutas)} reportes generados en {directorio} en {round(time.time() - inicio, 2)} segundos")
+    return rutas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera reportes HTML offline de la flota")
+    parser.add_argument("--salida", default=DIRECTORIO_REPORTES, help="Directorio de salida")
+    parser.add_argument("--procesos", type=int, default=None, help="Procesos del pool (por defecto, uno por CPU)")
+    parser.add_argument("--sin-camiones", action="store_true", help="Omitir los reportes por camión")
+    args = parser.parse_args()
+    generar_reportes(args.salida, args.procesos, camiones=not args.sin_camiones)
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+from acceso_datos import DATA_PATH, escribir_parquet, instantanea_datos, leer_datos, version_derivado
+from metricas import span
+from motor_sql import SQL_CUBO, consultar, motor_disponible
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+CUBO_PATH = "data/cubo_kpi.parquet"
+
+CLAVES_CUBO = ["Dia", "Marca", "Modelo", "Componente"]
+COLUMNAS_CUBO = ["Fecha", "Marca", "Modelo", "Componente", "Criticidad",
+                 "Disponibilidad", "Tiempo Parada", "TBF", "Confiabilidad"]
+
+# Medidas aditivas del cubo: los promedios se recomponen como suma / conteo,
+# por lo que combinar días o cubos parciales da el mismo resultado que el dato crudo
+MEDIDAS_CUBO = ["Registros", "Fallas", "Suma Disponibilidad", "Suma Tiempo Parada",
+                "Suma TBF", "Suma Confiabilidad"]
+
+# ==============================
+# CONSTRUCCIÓN
+# ==============================
+def agregar_cubo(df):
+    """Agrega registros crudos a sumas y conteos por día × Marca × Modelo × Componente"""
+    df = df.assign(
+        Dia=pd.to_datetime(df["Fecha"]).dt.normalize(),
+        Falla=(df["Criticidad"] == "Critico").astype("int64")
+    )
+    return df.groupby(CLAVES_CUBO, sort=False).agg(**{
+        "Registros": ("Fecha", "size"),
+        "Fallas": ("Falla", "sum"),
+        "Suma Disponibilidad": ("Disponibilidad", "sum"),
+        "Suma Tiempo Parada": ("Tiempo Parada", "sum"),
+        "Suma TBF": ("TBF", "sum"),
+        "Suma Confiabilidad": ("Confiabilidad", "sum")
+    }).reset_index()
+
+def combinar_cubos(*cubos):
+    """Combina cubos parciales sumando sus medidas por clave"""
+    cubos = [cubo for cubo in cubos if cubo is not None and not cubo.empty]
+    if not cubos:
+        return pd.DataFrame(columns=CLAVES_CUBO + MEDIDAS_CUBO)
+    df = pd.concat(cubos, ignore_index=True)
+    return df.groupby(CLAVES_CUBO, sort=True)[MEDIDAS_CUBO].sum().reset_index()
+
+@span("ingesta.cubo")
+def actualizar_cubo(df_nuevos, filas_previas, ruta=CUBO_PATH):
+    """Suma un lote recién ingerido al cubo existente.
+
+    Solo si el cubo está sellado con los registros publicados antes del lote. Si falta
+    (quedaría sin el histórico) o es de otra versión (p. ej. una reconstrucción que ya
+    incluye el lote, que lo contaría dos veces) no se toca: cargar_cubo lo reconstruye
+    completo la próxima vez que se lea.
+    """
+    if version_derivado(ruta) != filas_previas:
+        return
+    cubo = combinar_cubos(pd.read_parquet(ruta), agregar_cubo(df_nuevos[COLUMNAS_CUBO]))
+    escribir_parquet(cubo, ruta, metadatos={"filas_datos": filas_previas + len(df_nuevos)})
+
+@span("cubo.cargar")
+def cargar_cubo(ruta=CUBO_PATH, ruta_datos=DATA_PATH):
+    """Lee el cubo de KPIs, reconstruyéndolo desde los datos si falta o está sellado con otra versión"""
+    archivos, filas = instantanea_datos(ruta_datos)
+    if version_derivado(ruta) == filas:
+        return pd.read_parquet(ruta)
+    if motor_disponible():
+        cubo = consultar(SQL_CUBO, archivos)
+    else:
+        cubo = combinar_cubos(agregar_cubo(leer_datos(COLUMNAS_CUBO, archivos=archivos)))
+    escribir_parquet(cubo, ruta, metadatos={"filas_datos": filas})
+    return cubo
+
+# ==============================
+# CONSULTAS
+# ==============================
+@span("cubo.indexar")
+def indexar_cubo(cubo):
+    """Acumulados diarios por (Marca, Modelo): cualquier ventana se resuelve con dos búsquedas binarias"""
+    diario = cubo.groupby(["Marca", "Modelo", "Dia"], sort=True)[MEDIDAS_CUBO].sum()
+    indice = {}
+    for (marca, modelo), grupo in diario.groupby(level=["Marca", "Modelo"], sort=False):
+        valores = grupo.to_numpy(dtype="float64")
+        acumulados = np.vstack([np.zeros((1, len(MEDIDAS_CUBO))), np.cumsum(valores, axis=0)])
+        indice[(marca, modelo)] = (grupo.index.get_level_values("Dia").to_numpy(), valores, acumulados)
+    return indice
+
+def _ventana(dias, fecha_desde, fecha_hasta):
+    """Posiciones [inicio, fin) de los días del cubo que caen en la ventana"""
+    inicio = 0 if fecha_desde is None else np.searchsorted(dias, pd.Timestamp(fecha_desde).normalize().to_datetime64(), "left")
+    fin = len(dias) if fecha_hasta is None else np.searchsorted(dias, pd.Timestamp(fecha_hasta).normalize().to_datetime64(), "right")
+    return inicio, max(inicio, fin)
+
+def kpis_cubo(indice, marca, modelo, fecha_desde=None, fecha_hasta=None):
+    """Disponibilidad, MTTR, MTBF y confiabilidad promedio del filtro, recompuestos desde las sumas"""
+    if (marca, modelo) in indice:
+        dias, _, acumulados = indice[(marca, modelo)]
+        inicio, fin = _ventana(dias, fecha_desde, fecha_hasta)
+        totales = dict(zip(MEDIDAS_CUBO, acumulados[fin] - acumulados[inicio]))
+    else:
+        totales = dict.fromkeys(MEDIDAS_CUBO, 0.0)
+
+    registros = totales["Registros"]
+    if registros == 0:
+        return {"Disponibilidad": float("nan"), "MTTR": float("nan"), "MTBF": float("nan"),
+                "Confiabilidad": float("nan"), "Fallas": 0, "Registros": 0}
+    return {
+        "Disponibilidad": totales["Suma Disponibilidad"] / registros,
+        "MTTR": totales["Suma Tiempo Parada"] / registros,
+        "MTBF": totales["Suma TBF"] / registros,
+        "Confiabilidad": totales["Suma Confiabilidad"] / registros,
+        "Fallas": int(totales["Fallas"]),
+        "Registros": int(registros)
+    }
+
+def tendencia_cubo(indice, medida, marca, modelo, fecha_desde=None, fecha_hasta=None):
+    """Serie diaria del promedio de una medida para el filtro"""
+    if (marca, modelo) not in indice:
+        return pd.DataFrame({"Fecha": pd.Series(dtype="datetime64[ns]"), medida: pd.Series(dtype="float64")})
+    dias, valores, _ = indice[(marca, modelo)]
+    inicio, fin = _ventana(dias, fecha_desde, fecha_hasta)
+    registros = valores[inicio:fin, MEDIDAS_CUBO.index("Registros")]
+    sumas = valores[inicio:fin, MEDIDAS_CUBO.index(f"Suma {medida}")]
+    return pd.DataFrame({"Fecha": dias[inicio:fin], medida: sumas / registros})
@@ -0,0 +1,191 @@
+from contextlib import suppress
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from acceso_datos import (DATA_PATH, archivos_datos, anexar_lote, consolidar, instantanea_datos,
+                          leer_datos, leer_metadatos, metadatos_esquema)
+from metricas import span
+
+# ==============================
+# CONFIGURACIÓN
+# ==============================
+SERIES_PATH = "data/series_camion.parquet"
+
+# Cada serie (flota, Componente) ocupa un bloque contiguo y ordenado por fecha dentro
+# de cada segmento (el base y un archivo por lote); como la flota es la primera clave,
+# el historial de una unidad también es contiguo dentro de cada segmento
+CLAVES_SERIE = ["flota", "Componente"]
+ORDEN_SERIES = CLAVES_SERIE + ["Fecha"]
+COLUMNAS_SERIE = ["Fecha", "flota", "Marca", "Modelo", "Componente", "Criticidad",
+                  "Hierro (Fe) ppm", "Cobre (Cu) ppm", "Silicio (Si) ppm", "Aluminio (Al) ppm"]
+
+# Segmentos que se acumulan antes de intercalarlos en el base
+MAX_SEGMENTOS = 16
+
+# ==============================
+# CONSTRUCCIÓN
+# ==============================
+def ordenar_series(df):
+    """Registros ordenados por (flota, Componente, Fecha); el orden de llegada desempata.
+
+    Las columnas que los datos no traen (p. ej. Aluminio) quedan vacías.
+    """
+    df = df.reindex(columns=COLUMNAS_SERIE).assign(Fecha=pd.to_datetime(df["Fecha"]))
+    return df.sort_values(ORDEN_SERIES, kind="stable", ignore_index=True)
+
+def unir_series(segmentos):
+    """Un solo DataFrame ordenado por (flota, Componente, Fecha) a partir de los segmentos"""
+    if not segmentos:
+        return pd.DataFrame(columns=COLUMNAS_SERIE)
+    if len(segmentos) == 1:
+        return segmentos[0]
+    return pd.concat(segmentos, ignore_index=True).sort_values(ORDEN_SERIES, kind="stable", ignore_index=True)
+
+def _cadena(sellos):
+    """Posiciones de los segmentos válidos (el base primero) y los registros de datos que cubren.
+
+    El base está sellado con {"filas_datos": n} y cada segmento con la versión sobre la que
+    se agregó, {"desde": n, "filas_datos": n + lote}. Un segmento que no continúa la cadena
+    (agregado mientras una reconstrucción reescribía el base) se ignora.
+    """
+    filas = sellos[0].get("filas_datos")
+    validos = [0]
+    for posicion, sello in enumerate(sellos[1:], start=1):
+        if filas is not None and sello.get("desde") == filas:
+            validos.append(posicion)
+            filas = sello["filas_datos"]
+    return validos, filas
+
+def archivos_series(ruta=SERIES_PATH):
+    """Archivos válidos del almacén de series y los registros de datos que cubren (None si no hay base)"""
+    archivos = archivos_datos(ruta)
+    if not archivos or archivos[0] != ruta:
+        return [], None
+    validos, filas = _cadena([leer_metadatos(archivo) for archivo in archivos])
+    return [archivos[posicion] for posicion in validos], filas
+
+def leer_series(ruta=SERIES_PATH, archivos=None):
+    """Segmentos válidos del almacén, ya leídos, y los registros de datos que cubren.
+
+    La cadena se valida con los sellos de las mismas tablas leídas: si el base cambia
+    durante la lectura, los segmentos y la versión devueltos siguen siendo coherentes.
+    """
+    archivos = archivos_datos(ruta) if archivos is None else archivos
+    if not archivos or archivos[0] != ruta:
+        return [], None
+    tablas = [pq.read_table(archivo) for archivo in archivos]
+    validos, filas = _cadena([metadatos_esquema(tabla.schema) for tabla in tablas])
+    return [tablas[posicion].to_pandas() for posicion in validos], filas
+
+@span("series.compactar")
+def compactar_series(ruta=SERIES_PATH):
+    """Intercala los segmentos en el base; los que no continúan la cadena se descartan"""
+    archivos = archivos_datos(ruta)
+    segmentos, filas = leer_series(ruta, archivos)
+    consolidar(unir_series(segmentos), ruta, archivos, orden=ORDEN_SERIES, metadatos={"filas_datos": filas})
+
+@span("ingesta.series")
+def actualizar_series(df_nuevos, filas_previas, ruta=SERIES_PATH):
+    """Agrega un lote recién ingerido como un segmento propio, ya ordenado por serie.
+
+    Cuesta lo que el lote, no lo que el histórico: solo cada MAX_SEGMENTOS lotes se
+    intercalan en el base. Igual que el cubo, solo se agrega si el almacén cubre los
+    registros publicados antes del lote; si no, cargar_series lo reconstruye completo.
+    """
+    archivos, filas = archivos_series(ruta)
+    if filas != filas_previas:
+        return
+    anexar_lote(ordenar_series(df_nuevos), ruta, orden=ORDEN_SERIES,
+                metadatos={"desde": filas_previas, "filas_datos": filas_previas + len(df_nuevos)})
+    if len(archivos) >= MAX_SEGMENTOS:
+        compactar_series(ruta)
+
+@span("series.cargar")
+def instantanea_series(ruta=SERIES_PATH, ruta_datos=DATA_PATH):
+    """Segmentos del almacén de series y los registros de datos que cubren.
+
+    Si el almacén falta o cubre otra versión de los datos, se reconstruye como un solo
+    base desde los archivos publicados, fijados al empezar.
+    """
+    archivos_fuente, filas = instantanea_datos(ruta_datos)
+    if archivos_series(ruta)[1] == filas:
+        # Una compactación puede borrar un segmento durante la lectura: se reconstruye
+        with suppress(FileNotFoundError):
+            segmentos, version = leer_series(ruta)
+            if version == filas:
+                return segmentos, filas
+    previos = archivos_datos(ruta)
+    series = ordenar_series(leer_datos(COLUMNAS_SERIE, archivos=archivos_fuente))
+    consolidar(series, ruta, previos, orden=ORDEN_SERIES, metadatos={"filas_datos": filas})
+    return [series], filas
+
+def cargar_series(ruta=SERIES_PATH, ruta_datos=DATA_PATH):
+    """Segmentos del almacén de series, reconstruyéndolo desde los datos si falta o está sellado con otra versión"""
+    return instantanea_series(ruta, ruta_datos)[0]
+
+# ==============================
+# ÍNDICE DE OFFSETS
+# ==============================
+def _rangos(claves, desplazamiento, rangos):
+    """Agrega a `rangos` las posiciones [inicio, fin) de cada bloque de claves iguales consecutivas"""
+    if len(claves) == 0:
+        return rangos
+    cambios = np.flatnonzero(claves[1:] != claves[:-1]) + 1
+    inicios = np.concatenate([[0], cambios])
+    fines = np.concatenate([cambios, [len(claves)]])
+    for i, f in zip(inicios, fines):
+        rangos.setdefault(claves[i], []).append((desplazamiento + int(i), desplazamiento + int(f)))
+    return rangos
+
+@span("series.indexar")
+def indexar_series(segmentos):
+    """Columnas de todos los segmentos como arrays contiguos más los rangos de cada serie y de cada unidad.
+
+    Cada segmento está ordenado por serie: sus offsets se calculan por separado y se
+    combinan, así que una serie queda en a lo sumo un rango por segmento.
+    """
+    series = pd.concat(segmentos, ignore_index=True) if len(segmentos) > 1 else unir_series(segmentos)
+    flota = series["flota"].astype(str).to_numpy(dtype=object)
+    componente = series["Componente"].astype(str).to_numpy(dtype=object)
+    claves = np.empty(len(series), dtype=object)
+    claves[:] = list(zip(flota, componente))
+    indice = {"columnas": {columna: series[columna].to_numpy() for columna in COLUMNAS_SERIE},
+              "series": {}, "unidades": {}}
+    inicio = 0
+    for segmento in segmentos:
+        fin = inicio + len(segmento)
+        _rangos(claves[inicio:fin], inicio, indice["series"])
+        _rangos(flota[inicio:fin], inicio, indice["unidades"])
+        inicio = fin
+    return indice
+
+def _cronologico(rangos, fechas):
+    """Posiciones de los rangos en orden cronológico; el segmento y luego la posición desempatan"""
+    if not rangos:
+        return np.zeros(0, dtype=np.int64)
+    posiciones = np.concatenate([np.arange(i, f) for i, f in rangos])
+    return posiciones[np.argsort(fechas[posiciones], kind="stable")]
+
+# ==============================
+# CONSULTAS
+# ==============================
+def historial_serie(indice, flota, componente, columnas=COLUMNAS_SERIE):
+    """Serie de un componente de la unidad, ordenada por fecha: un slice de los arrays por segmento"""
+    arrays = indice["columnas"]
+    rangos = indice["series"].get((str(flota), str(componente)), [])
+    # En un solo segmento la serie ya está ordenada por fecha
+    posiciones = slice(*rangos[0]) if len(rangos) == 1 else _cronologico(rangos, arrays["Fecha"])
+    return pd.DataFrame({columna: arrays[columna][posiciones] for columna in columnas})
+
+def historial_unidad(indice, flota, marca=None, modelo=None, columnas=COLUMNAS_SERIE):
+    """Historial completo de la unidad en orden cronológico, opcionalmente acotado a una marca y modelo.
+
+    Solo se recorren las filas de la unidad: el costo no depende del tamaño de la flota.
+    """
+    arrays = indice["columnas"]
+    posiciones = _cronologico(indice["unidades"].get(str(flota), []), arrays["Fecha"])
+    if marca is not None:
+        posiciones = posiciones[arrays["Marca"][posiciones] == marca]
+    if modelo is not None:
+        posiciones = posiciones[arrays["Modelo"][posiciones] == modelo]
+    return pd.DataFrame({columna: arrays[columna][posiciones] for columna in columnas})
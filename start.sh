@@ -1,8 +1,5 @@
 #!/bin/bash
 export PATH="/usr/local/bin:$PATH"
 
-# Generar datos de ejemplo
-python src/data_generator.py
-
-# Iniciar la aplicación
-streamlit run src/app.py --server.port=$PORT --server.address=127.0.0.1 
\ No newline at end of file
+# Iniciar la aplicación (si no hay datos, se generan en segundo plano al arrancar)
+streamlit run src/app.py --server.port=$PORT --server.address=127.0.0.1 